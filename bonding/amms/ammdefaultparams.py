@@ -1 +1,2 @@
-QUANTA = 1e-8
\ No newline at end of file
+QUANTA = 1e-8
+RTOL = 4 * 2.0 ** -52  # a few ulps
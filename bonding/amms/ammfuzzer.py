@@ -0,0 +1,243 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+from bonding.amms.bondingcurveamm import BondingCurveAMM, TRADE_OPERATIONS
+
+# Relative tolerance on the cash invariant, per unit of currency traded so far
+CASH_RTOL = 1e-9
+
+
+def all_amm_factories(scale: float = 100.0, fee_rate: float = 0.001, **kwargs) -> list:
+    """
+    One factory per class in all_amm_cls(), each making a fresh AMM with these parameters.
+    """
+    from bonding.amms.allamms import all_amm_cls
+    return [partial(amm_cls, scale=scale, fee_rate=fee_rate, **kwargs) for amm_cls in all_amm_cls()]
+
+
+def all_curve_amm_factories(scale: float = 100.0, fee_rate: float = 0.001, **kwargs) -> list:
+    """
+    One factory per class in all_curves_cls(), each making a fresh BondingCurveAMM on that curve.
+    """
+    from bonding.curves.allcurves import all_curves_cls
+    return [partial(BondingCurveAMM, curve_cls(scale=scale), fee_rate=fee_rate, **kwargs)
+            for curve_cls in all_curves_cls()]
+
+
+def random_orders(seed: int, n_steps: int, unit: float = 1.0) -> list:
+    """
+    A reproducible list of (operation, amount) orders. Amounts are heavy tailed around `unit`,
+    spanning many orders of magnitude, and buys are slightly more likely than sells so that
+    the supply wanders upward. Orders that turn out to be infeasible are part of the test:
+    the AMM must reject them without side effects.
+    """
+    rng = np.random.default_rng(seed)
+    operations = rng.choice(len(TRADE_OPERATIONS), size=n_steps, p=[0.3, 0.25, 0.25, 0.2])
+    amounts = unit * np.exp(rng.normal(0.0, 3.0, size=n_steps))
+    # A few zero-sized orders
+    amounts[rng.random(n_steps) < 0.01] = 0.0
+    return [(TRADE_OPERATIONS[k], float(a)) for k, a in zip(operations, amounts)]
+
+
+def _round_trip_gains(amm, size: float) -> dict:
+    # Largest gain of each round trip of `size` from the current supply, skipping infeasible ones
+    x = amm.x
+    gains = {
+        "buy_value_then_sell_shares": amm.simulate_buy_value_then_sell_shares(size, x=x)["net_delta"],
+        "buy_shares_then_sell_shares": amm.simulate_buy_shares_then_sell_shares(size, x=x)["net_delta"],
+    }
+    if amm.get_maximum_sell_value(x=x) >= size:
+        gains["sell_value_then_buy_shares"] = amm.simulate_sell_value_then_buy_shares(size, x=x)["shares_delta"]
+    if size <= x:
+        gains["sell_shares_then_buy_value"] = amm.simulate_sell_shares_then_buy_value(size, x=x)["shares_delta"]
+    return gains
+
+
+def check_orders(amm, orders, tolerance: float = 1e-9):
+    """
+    Execute `orders` against `amm` one at a time, checking after every step that
+
+        supply          the supply is a non-negative number
+        rejection       a rejected (ValueError) trade left the state untouched
+        cash            price_integral(x) <= total_cash_collected <= price_integral(x) + total_fees_collected,
+                        up to CASH_RTOL per unit of currency traded
+        price           the price moved up on buys and down on sells
+        round_trip      no round trip of the order's size gains more than `tolerance` (times the size, if larger than 1)
+
+    and that no trade raised anything other than ValueError.
+
+    Returns
+    -------
+    None if every invariant held, else
+        {
+            'step': int,          # index of the order after which the check failed
+            'order': tuple,
+            'invariant': str,     # one of the names above, or 'exception'
+            'message': str,
+        }
+    """
+    volume = 0.0
+    for step, (operation, amount) in enumerate(orders):
+        def failure(invariant, message):
+            return {"step": step, "order": (operation, amount), "invariant": invariant, "message": message}
+
+        before = amm.snapshot()
+        price_before = amm.current_price()
+        try:
+            getattr(amm, operation)(amount)
+        except ValueError:
+            if amm.snapshot() != before:
+                return failure("rejection", f"State changed by a rejected trade: {before} -> {amm.snapshot()}")
+            continue
+        except Exception as e:
+            return failure("exception", f"{type(e).__name__}: {e}")
+
+        if not amm.x >= 0:
+            return failure("supply", f"Supply is {amm.x}")
+
+        volume += abs(amm.total_cash_collected - before["total_cash_collected"]) + \
+            abs(amm.total_fees_collected - before["total_fees_collected"])
+        integral = amm.curve.price_integral(amm.x)
+        slack = CASH_RTOL * (1.0 + volume + integral)
+        if not (integral - slack <= amm.total_cash_collected <= integral + amm.total_fees_collected + slack):
+            return failure("cash", f"total_cash_collected={amm.total_cash_collected}, price_integral(x)={integral}, "
+                                   f"total_fees_collected={amm.total_fees_collected}")
+
+        price_after = amm.current_price()
+        if operation.startswith("buy") and not price_after >= price_before or \
+                operation.startswith("sell") and not price_after <= price_before:
+            return failure("price", f"Price moved from {price_before} to {price_after} on {operation}")
+
+        try:
+            gains = _round_trip_gains(amm, amount)
+        except ValueError:
+            gains = {}
+        except Exception as e:
+            return failure("exception", f"Round trip simulation raised {type(e).__name__}: {e}")
+        for name, gain in gains.items():
+            if not gain <= tolerance * max(1.0, amount):
+                return failure("round_trip", f"{name} of size {amount} gains {gain}")
+    return None
+
+
+def _fails(amm_factory, orders, invariant, tolerance) -> bool:
+    result = check_orders(amm_factory(), orders, tolerance=tolerance)
+    return result is not None and result["invariant"] == invariant
+
+
+def shrink_orders(amm_factory, orders, invariant: str, tolerance: float = 1e-9, max_checks: int = 2000) -> list:
+    """
+    Reduce a failing list of orders to a (locally) minimal one that still fails `invariant`
+    on a fresh AMM: first by dropping runs of orders, halving the run length down to single
+    orders, then by replacing each amount with a rounder, smaller one.
+    """
+    orders = list(orders)
+    checks = 0
+
+    # Everything after the failing step is irrelevant
+    result = check_orders(amm_factory(), orders, tolerance=tolerance)
+    if result is not None:
+        orders = orders[:result["step"] + 1]
+
+    # Many failures only need the supply the earlier orders reached: try getting there in one buy
+    for k in range(len(orders) - 1, 0, -1):
+        amm = amm_factory()
+        for operation, amount in orders[:k]:
+            try:
+                getattr(amm, operation)(amount)
+            except ValueError:
+                pass
+        candidate = [("buy_shares", amm.x)] + orders[k:]
+        checks += 1
+        if _fails(amm_factory, candidate, invariant, tolerance):
+            orders = candidate
+            break
+        if checks >= max_checks // 10:
+            break
+
+    chunk = max(len(orders) // 2, 1)
+    while chunk >= 1 and checks < max_checks:
+        start, removed = 0, False
+        while start < len(orders) and checks < max_checks:
+            candidate = orders[:start] + orders[start + chunk:]
+            checks += 1
+            if candidate and _fails(amm_factory, candidate, invariant, tolerance):
+                orders, removed = candidate, True
+            else:
+                start += chunk
+        if not removed:
+            chunk //= 2
+
+    for i in range(len(orders)):
+        operation, amount = orders[i]
+        simpler = [0.0, 1.0] + [float(f"{amount:.{digits}g}") for digits in (1, 2, 3)] + [amount / 2]
+        for candidate_amount in sorted(set(a for a in simpler if a < amount)):
+            if checks >= max_checks:
+                break
+            candidate = orders[:i] + [(operation, candidate_amount)] + orders[i + 1:]
+            checks += 1
+            if _fails(amm_factory, candidate, invariant, tolerance):
+                orders = candidate
+                break
+    return orders
+
+
+def _fuzz_task(amm_factory, seed: int, n_steps: int, unit: float, tolerance: float, shrink: bool):
+    orders = random_orders(seed, n_steps, unit=unit)
+    amm = amm_factory()
+    result = check_orders(amm, orders, tolerance=tolerance)
+    if result is None:
+        return None
+    result["amm"] = f"{amm.__class__.__name__}({amm.curve.__class__.__name__})"
+    result["seed"] = seed
+    result["n_steps"] = n_steps
+    result["orders"] = shrink_orders(amm_factory, orders, result["invariant"], tolerance=tolerance) \
+        if shrink else orders[:result["step"] + 1]
+    return result
+
+
+def fuzz(amm_factories=None, n_sequences: int = 8, n_steps: int = 1000, seed: int = 0, unit: float = 1.0,
+         tolerance: float = 1e-9, shrink: bool = True, max_workers: int = None) -> list:
+    """
+    Run `n_sequences` random order sequences of `n_steps` each against a fresh AMM from every
+    factory, checking the invariants of check_orders() after every step.
+
+    Parameters
+    ----------
+    amm_factories : list of callables, optional
+        Each returns a fresh BondingCurveAMM. Defaults to all_amm_factories(), one per class in
+        all_amm_cls(). See also all_curve_amm_factories(). Factories must be picklable (e.g.
+        functools.partial of a class) when max_workers is given.
+    n_sequences : int
+        Sequences per factory. Sequence i uses seed `seed + i`.
+    n_steps : int
+        Orders per sequence.
+    seed : int
+        Base seed.
+    unit : float
+        Typical order size.
+    tolerance : float
+        Largest round trip gain tolerated, per unit of size above 1.
+    shrink : bool
+        Whether to shrink each failing sequence with shrink_orders().
+    max_workers : int, optional
+        If given, sequences are sharded across a pool of this many processes. Otherwise
+        they run in this process.
+
+    Returns
+    -------
+    list of dict
+        One report per failing sequence, as returned by check_orders(), with also 'amm',
+        'seed', 'n_steps' and 'orders' (the shrunk reproducer). Replay a failure with
+        check_orders(factory(), report['orders']).
+    """
+    if amm_factories is None:
+        amm_factories = all_amm_factories()
+    tasks = [(factory, seed + i, n_steps, unit, tolerance, shrink)
+             for factory in amm_factories for i in range(n_sequences)]
+    if max_workers is None:
+        results = [_fuzz_task(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_fuzz_task, *zip(*tasks)))
+    return [result for result in results if result is not None]
@@ -0,0 +1,112 @@
+import time
+
+# Solver counters kept by AMMMetrics
+SOLVER_COUNTERS = (
+    "solves",               # calls to _solve_for_dx with a non-zero target
+    "closed_form_solves",   # ... answered by the curve's supply_after_cost
+    "newton_solves",        # ... that fell back to the Newton solver
+    "bracket_expansions",   # doublings of the initial guess before the root was bracketed
+    "newton_steps",         # Newton steps taken
+    "bisection_steps",      # steps that left the bracket and were replaced by bisection
+    "stalls",               # solves stopped because a Newton step no longer reduced the residual
+    "max_iter_hits",        # solves that used up max_iter without converging
+)
+
+
+class LatencyHistogram:
+    """
+    Counts of latencies in power-of-two nanosecond buckets: bucket b holds latencies in
+    [2**(b-1), 2**b) ns.
+    """
+
+    __slots__ = ("buckets", "count", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int):
+        self.buckets[min(ns.bit_length(), 63)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def quantile_ns(self, q: float) -> int:
+        """
+        Upper bound of the bucket holding the q-quantile (0 if empty).
+        """
+        rank = q * self.count
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return 2 ** b
+        return 0
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ns": self.total_ns / self.count if self.count else 0.0,
+            "max_ns": self.max_ns,
+            "p50_ns": self.quantile_ns(0.5),
+            "p99_ns": self.quantile_ns(0.99),
+            "buckets": {2 ** b: n for b, n in enumerate(self.buckets) if n},
+        }
+
+
+class AMMMetrics:
+    """
+    Solver counters and per-operation latency histograms for one BondingCurveAMM.
+    See BondingCurveAMM.enable_metrics().
+
+    Updates are not locked, so counts from concurrent threads on a thread_safe AMM
+    are approximate.
+
+    Attributes
+    ----------
+    counters : dict
+        Counter name -> count, for each of SOLVER_COUNTERS.
+    latency : dict
+        Operation name -> LatencyHistogram.
+    """
+
+    __slots__ = ("counters", "latency")
+
+    def __init__(self):
+        self.counters = dict.fromkeys(SOLVER_COUNTERS, 0)
+        self.latency = {}
+
+    def timed(self, operation: str, fn, *args):
+        """
+        Call fn(*args), recording its latency under `operation` whether or not it raises.
+        """
+        start = time.perf_counter_ns()
+        try:
+            return fn(*args)
+        finally:
+            self.record_latency(operation, time.perf_counter_ns() - start)
+
+    def record_latency(self, operation: str, ns: int):
+        histogram = self.latency.get(operation)
+        if histogram is None:
+            histogram = self.latency[operation] = LatencyHistogram()
+        histogram.record(ns)
+
+    def record_newton_solve(self, expansions: int, newton_steps: int, bisection_steps: int,
+                            stalled: bool, hit_max_iter: bool):
+        counters = self.counters
+        counters["newton_solves"] += 1
+        counters["bracket_expansions"] += expansions
+        counters["newton_steps"] += newton_steps
+        counters["bisection_steps"] += bisection_steps
+        counters["stalls"] += stalled
+        counters["max_iter_hits"] += hit_max_iter
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "latency": {operation: histogram.snapshot() for operation, histogram in sorted(self.latency.items())},
+        }
@@ -0,0 +1,289 @@
+import inspect
+import numpy as np
+from bonding.amms.ammdefaultparams import QUANTA
+from bonding.amms.traderesults import BuyValueResult, BuySharesResult, SellSharesResult, SellValueResult
+
+
+class AMMPool:
+    """
+    Many independent markets on curves of the same family, held as NumPy arrays
+    (struct-of-arrays) instead of one BondingCurveAMM object per market.
+
+    Every shipped curve is a scale family: with the curve at scale=1 as reference,
+
+        price_scale(x)          = price_1(x / scale)
+        price_integral_scale(x) = scale * price_integral_1(x / scale)
+
+    so a single reference curve serves every market and each operation is one
+    vectorized evaluation across the markets it touches. Fees and quanta rounding
+    follow BondingCurveAMM.
+
+    Attributes
+    ----------
+    curve_cls : type
+        The curve family.
+    curve_kwargs : dict
+        Parameters other than scale, shared by every market's curve.
+    unit_curve : BondingCurve
+        The family's curve at scale=1.
+    scale : np.ndarray
+        Per-market scale.
+    fee_rate : np.ndarray
+        Per-market fee rate.
+    quanta : float
+        Defines the smallest currency denomination (1e-8).
+    x : np.ndarray
+        Per-market supply.
+    total_cash_collected : np.ndarray
+        Per-market currency held by the curve (this excludes fees).
+    total_fees_collected : np.ndarray
+        Per-market currency collected as fees.
+    """
+
+    __slots__ = ("curve_cls", "curve_kwargs", "unit_curve", "scale", "fee_rate", "quanta",
+                 "x", "total_cash_collected", "total_fees_collected")
+
+    def __init__(self, curve_cls, scales, fee_rates=0.0, quanta=QUANTA, **curve_kwargs):
+        """
+        Parameters
+        ----------
+        curve_cls : type
+            A BondingCurve subclass taking a `scale` argument, e.g. SqrtBondingCurve.
+        scales : array_like
+            One scale per market. The number of markets is len(scales).
+        fee_rates : float or array_like, optional
+            Fee rate for every market, or one per market. Defaults to 0.
+        quanta : float, optional
+            Defines the smallest currency denomination (1e-8). Defaults to QUANTA.
+        **curve_kwargs
+            Any other parameters of curve_cls, shared by all markets (e.g. a and c for GrowthBondingCurve).
+        """
+        self.scale = np.array(scales, dtype=float).ravel()
+        if np.any(self.scale <= 0):
+            raise ValueError("Parameter 'scale' must be positive.")
+        n = len(self.scale)
+        if "scale" not in inspect.signature(curve_cls).parameters:
+            raise ValueError(f"{curve_cls.__name__} is not a scale family; AMMPool needs a curve class "
+                             f"taking a 'scale' parameter, such as SqrtBondingCurve.")
+        self.curve_cls = curve_cls
+        self.curve_kwargs = dict(curve_kwargs)
+        self.unit_curve = curve_cls(scale=1.0, **curve_kwargs)
+        self.fee_rate = np.array(np.broadcast_to(np.asarray(fee_rates, dtype=float), (n,)))
+        self.quanta = float(quanta)
+
+        self.x = np.zeros(n)
+        self.total_cash_collected = np.zeros(n)
+        self.total_fees_collected = np.zeros(n)
+
+    def __len__(self) -> int:
+        return len(self.scale)
+
+    def __repr__(self) -> str:
+        return (f"<AMMPool(curve={self.unit_curve.__class__.__name__}, "
+                f"markets={len(self)}, quanta={self.quanta})>")
+
+    ###########################################################################
+    # Scaled curve evaluations
+    ###########################################################################
+    def _ids(self, ids) -> np.ndarray:
+        if ids is None:
+            return np.arange(len(self))
+        ids = np.asarray(ids, dtype=np.intp).ravel()
+        if np.any((ids < 0) | (ids >= len(self))):
+            raise IndexError("Market id out of range.")
+        return ids
+
+    def _unique_ids(self, ids) -> np.ndarray:
+        ids = self._ids(ids)
+        if len(np.unique(ids)) != len(ids):
+            raise ValueError("Market ids in one trade call must be unique.")
+        return ids
+
+    def price(self, ids, x) -> np.ndarray:
+        scale = self.scale[ids]
+        return self.unit_curve.price_array(x / scale)
+
+    def price_integral(self, ids, x) -> np.ndarray:
+        scale = self.scale[ids]
+        return scale * self.unit_curve.price_integral_array(x / scale)
+
+    def cost_to_move(self, ids, x_start, x_end) -> np.ndarray:
+        scale = self.scale[ids]
+        return scale * self.unit_curve.cost_to_move_array(x_start / scale, x_end / scale)
+
+    def _solve_for_dx(self, ids, x_start, target_cost, tolerance=1e-12) -> np.ndarray:
+        scale = self.scale[ids]
+        target_cost = np.where(np.abs(target_cost) < tolerance, 0.0, target_cost)
+        x_end = x_start + scale * (self.unit_curve.supply_after_cost_array(x_start / scale, target_cost / scale)
+                                   - x_start / scale)
+        # Round every move down, as BondingCurveAMM._solve_for_dx() does. Through the unit
+        # curve, the cost can be flat or a few ulps out across neighbouring supplies, so a
+        # single step down is not always enough.
+        for _ in range(8):
+            over = (x_end > 0) & (self.cost_to_move(ids, x_start, x_end) > target_cost)
+            if not np.any(over):
+                break
+            x_end = np.where(over, np.nextafter(x_end, -np.inf), x_end)
+        return x_end - x_start
+
+    ###########################################################################
+    # Quotes (no state change)
+    ###########################################################################
+    def simulate_buy_value(self, ids, total_values):
+        """
+        Quote buying with `total_values[i]` currency in market `ids[i]`, for every i.
+        Returns the same result type, with arrays, as BondingCurveAMM.simulate_buy_value().
+        """
+        ids = self._ids(ids)
+        total_values = np.broadcast_to(np.asarray(total_values, dtype=float), ids.shape)
+        if np.any(total_values < 0):
+            raise ValueError("Buy value must be non-negative.")
+
+        quanta_used = np.floor(total_values / self.quanta)
+        breakage_fee = total_values - quanta_used * self.quanta
+        gross_currency = quanta_used * self.quanta
+        fee_amount = gross_currency * self.fee_rate[ids]
+        net_currency = gross_currency - fee_amount
+
+        return BuyValueResult(quanta_used, breakage_fee, fee_amount, net_currency,
+                              self._solve_for_dx(ids, self.x[ids], net_currency))
+
+    def simulate_buy_shares(self, ids, num_shares):
+        """
+        Quote buying `num_shares[i]` in market `ids[i]`, for every i.
+        Returns the same result type, with arrays, as BondingCurveAMM.simulate_buy_shares().
+        """
+        ids = self._ids(ids)
+        num_shares = np.broadcast_to(np.asarray(num_shares, dtype=float), ids.shape)
+        if np.any(num_shares < 0):
+            raise ValueError("Cannot buy a negative number of shares.")
+        x = self.x[ids]
+        fee_rate = self.fee_rate[ids]
+        gross_cost = np.maximum(self.cost_to_move(ids, x, x + num_shares), 0.0)
+        if np.any((fee_rate >= 1.0) & (gross_cost > 0)):
+            raise ValueError("Cannot buy shares when fee_rate is 1 or more.")
+
+        ideal_total = gross_cost / np.where(fee_rate < 1.0, 1.0 - fee_rate, 1.0)
+        quanta_used = np.ceil(ideal_total / self.quanta)
+        total_paid = quanta_used * self.quanta
+
+        return BuySharesResult(gross_cost, quanta_used, np.where(total_paid > ideal_total, total_paid - ideal_total, 0.0),
+                               total_paid * fee_rate, total_paid)
+
+    def simulate_sell_shares(self, ids, num_shares):
+        """
+        Quote selling `num_shares[i]` in market `ids[i]`, for every i.
+        Returns the same result type, with arrays, as BondingCurveAMM.simulate_sell_shares().
+        """
+        ids = self._ids(ids)
+        num_shares = np.broadcast_to(np.asarray(num_shares, dtype=float), ids.shape)
+        x = self.x[ids]
+        if np.any(num_shares < 0):
+            raise ValueError("Cannot sell a negative number of shares.")
+        if np.any(num_shares > x):
+            raise ValueError("Cannot sell more shares than current supply.")
+
+        gross_currency = np.maximum(-self.cost_to_move(ids, x, x - num_shares), 0.0)
+        quanta_used = np.floor(gross_currency / self.quanta)
+        actual_gross = quanta_used * self.quanta
+        fee_amount = actual_gross * self.fee_rate[ids]
+
+        return SellSharesResult(gross_currency, quanta_used, gross_currency - actual_gross, fee_amount,
+                                actual_gross - fee_amount)
+
+    def simulate_sell_value(self, ids, target_values):
+        """
+        Quote selling enough shares in market `ids[i]` to receive `target_values[i]`, for every i.
+        Returns the same result type, with arrays, as BondingCurveAMM.simulate_sell_value().
+        """
+        ids = self._ids(ids)
+        target_values = np.broadcast_to(np.asarray(target_values, dtype=float), ids.shape)
+        if np.any(target_values < 0):
+            raise ValueError("Target sell value must be non-negative.")
+
+        quanta_used = np.floor(target_values / self.quanta)
+        breakage_fee = target_values - quanta_used * self.quanta
+        gross_currency = quanta_used * self.quanta
+        fee_amount = gross_currency * self.fee_rate[ids]
+
+        return SellValueResult(quanta_used, breakage_fee, fee_amount, gross_currency, gross_currency - fee_amount,
+                               self._solve_for_dx(ids, self.x[ids], -gross_currency))
+
+    ###########################################################################
+    # Trades (state-changing). Ids within one call must be unique.
+    ###########################################################################
+    def buy_value(self, ids, values) -> np.ndarray:
+        """
+        Spend `values[i]` currency in market `ids[i]`. Returns the shares purchased in each.
+        """
+        ids = self._unique_ids(ids)
+        sim = self.simulate_buy_value(ids, values)
+        self.total_fees_collected[ids] += sim.breakage_fee + sim.fee_amount
+        self.total_cash_collected[ids] += sim.net_currency
+        self.x[ids] += sim.shares_received
+        return sim.shares_received
+
+    def buy_shares(self, ids, num_shares) -> np.ndarray:
+        """
+        Buy exactly `num_shares[i]` in market `ids[i]`. Returns the total paid in each.
+        """
+        ids = self._unique_ids(ids)
+        sim = self.simulate_buy_shares(ids, num_shares)
+        self.x[ids] += np.broadcast_to(np.asarray(num_shares, dtype=float), ids.shape)
+        self.total_fees_collected[ids] += sim.breakage_fee + sim.fee_amount
+        self.total_cash_collected[ids] += sim.total_paid - sim.fee_amount
+        return sim.total_paid
+
+    def sell_shares(self, ids, num_shares) -> np.ndarray:
+        """
+        Sell exactly `num_shares[i]` in market `ids[i]`. Returns the net currency received in each.
+        """
+        ids = self._unique_ids(ids)
+        sim = self.simulate_sell_shares(ids, num_shares)
+        self.x[ids] -= np.broadcast_to(np.asarray(num_shares, dtype=float), ids.shape)
+        self.total_cash_collected[ids] -= sim.net_currency
+        self.total_fees_collected[ids] += sim.breakage_fee + sim.fee_amount
+        return sim.net_currency
+
+    def sell_value(self, ids, values) -> np.ndarray:
+        """
+        Sell enough shares in market `ids[i]` to receive `values[i]`. Returns the shares sold in each.
+        """
+        ids = self._unique_ids(ids)
+        sim = self.simulate_sell_value(ids, values)
+        dx = sim.shares_sold
+        if np.any(self.x[ids] + dx < 0):
+            raise ValueError("Not enough supply to sell the requested currency amount (would go negative).")
+        self.x[ids] += dx
+        self.total_fees_collected[ids] += sim.breakage_fee + sim.fee_amount
+        self.total_cash_collected[ids] -= sim.net_currency
+        return np.abs(dx)
+
+    ###########################################################################
+    # Utility
+    ###########################################################################
+    def current_price(self, ids=None) -> np.ndarray:
+        """
+        Returns the instantaneous price in each market (all of them by default).
+        """
+        ids = self._ids(ids)
+        return self.price(ids, self.x[ids])
+
+    def total_cost_at_supply(self, ids=None) -> np.ndarray:
+        """
+        Returns the integral of the price from 0 to the current supply in each market.
+        """
+        ids = self._ids(ids)
+        return self.price_integral(ids, self.x[ids])
+
+    def to_amm(self, market_id: int):
+        """
+        Returns a standalone BondingCurveAMM holding a copy of one market's state.
+        """
+        from bonding.amms.bondingcurveamm import BondingCurveAMM
+        amm = BondingCurveAMM(curve=self.curve_cls(scale=float(self.scale[market_id]), **self.curve_kwargs),
+                              fee_rate=float(self.fee_rate[market_id]), quanta=self.quanta)
+        amm.x = float(self.x[market_id])
+        amm.total_cash_collected = float(self.total_cash_collected[market_id])
+        amm.total_fees_collected = float(self.total_fees_collected[market_id])
+        return amm
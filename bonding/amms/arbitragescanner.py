@@ -0,0 +1,174 @@
+import copy
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# The four round trips of BondingCurveAMM, and the quantity each one can gain
+ROUND_TRIPS = {
+    "buy_value_then_sell_shares": "net_delta",
+    "buy_shares_then_sell_shares": "net_delta",
+    "sell_value_then_buy_shares": "shares_delta",
+    "sell_shares_then_buy_value": "shares_delta",
+}
+
+
+def round_trip_grid(amm, supplies, sizes) -> dict:
+    """
+    Every round trip of `amm`, at every starting supply in `supplies` and trade size in `sizes`.
+
+    Each round trip is the corresponding simulate_*_then_* method of BondingCurveAMM, done
+    with the batch simulations in one vectorized pass over the len(supplies) x len(sizes)
+    grid. Sizes are currency for the *_value_* trips and shares otherwise. Cells where the
+    trip cannot be made (selling more than the supply holds) are NaN.
+
+    Returns
+    -------
+    dict
+        Round trip name -> 2D array of its net_delta (currency) or shares_delta (shares).
+    """
+    x, size = np.meshgrid(np.asarray(supplies, dtype=float), np.asarray(sizes, dtype=float), indexing="ij")
+
+    # (1) Buy value, then sell the shares received
+    shares = amm.simulate_buy_value_batch(size, x=x).shares_received
+    buy_value_then_sell_shares = amm.simulate_sell_shares_batch(shares, x=x + shares).net_currency - size
+
+    # (2) Buy shares, then sell them
+    spent = amm.simulate_buy_shares_batch(size, x=x).total_paid
+    buy_shares_then_sell_shares = amm.simulate_sell_shares_batch(size, x=x + size).net_currency - spent
+
+    # (3) Sell shares worth a value, then buy with that value (where the supply can pay it)
+    max_sell_value = np.floor(amm.simulate_sell_shares_batch(x, x=x).net_currency / amm.quanta) * amm.quanta
+    can_sell = size <= max_sell_value
+    value = np.where(can_sell, size, 0.0)
+    dx = amm.simulate_sell_value_batch(value, x=x).shares_sold
+    bought = amm.simulate_buy_value_batch(value, x=x + dx).shares_received
+    sell_value_then_buy_shares = np.where(can_sell & (x + dx >= 0), bought + dx, np.nan)
+
+    # (4) Sell shares, then buy with the proceeds (where there are enough shares)
+    can_sell = size <= x
+    shares = np.where(can_sell, size, 0.0)
+    received = amm.simulate_sell_shares_batch(shares, x=x).net_currency
+    bought = amm.simulate_buy_value_batch(received, x=x - shares).shares_received
+    sell_shares_then_buy_value = np.where(can_sell, bought - shares, np.nan)
+
+    return {
+        "buy_value_then_sell_shares": buy_value_then_sell_shares,
+        "buy_shares_then_sell_shares": buy_shares_then_sell_shares,
+        "sell_value_then_buy_shares": sell_value_then_buy_shares,
+        "sell_shares_then_buy_value": sell_shares_then_buy_value,
+    }
+
+
+def _scan_task(amm, supplies, sizes, tolerance) -> dict:
+    # Worst cell and number of arbitrage cells of each round trip, for one fee rate and block of supplies
+    report = {}
+    for name, delta in round_trip_grid(amm, supplies, sizes).items():
+        valid = ~np.isnan(delta)
+        if not np.any(valid):
+            report[name] = None
+            continue
+        i, j = np.unravel_index(np.argmax(np.where(valid, delta, -np.inf)), delta.shape)
+        report[name] = {
+            ROUND_TRIPS[name]: float(delta[i, j]),
+            "supply": float(supplies[i]),
+            "size": float(sizes[j]),
+            "fee_rate": amm.fee_rate,
+            "arbitrage_cells": int(np.sum(delta[valid] > tolerance)),
+            "cells": int(np.sum(valid)),
+        }
+    return report
+
+
+def _merge(reports) -> dict:
+    merged = {}
+    for name, field in ROUND_TRIPS.items():
+        worst = None
+        for report in reports:
+            cell = report[name]
+            if cell is None:
+                continue
+            if worst is None:
+                worst = dict(cell)
+                continue
+            if cell[field] > worst[field]:
+                worst.update({k: cell[k] for k in (field, "supply", "size", "fee_rate")})
+            worst["arbitrage_cells"] += cell["arbitrage_cells"]
+            worst["cells"] += cell["cells"]
+        merged[name] = worst
+    return merged
+
+
+def scan_round_trip_arbitrage(amm, supplies, sizes, fee_rates=None, tolerance=0.0,
+                              max_workers=None, chunk_size=1024) -> dict:
+    """
+    Sweep every round trip of `amm` over a grid of starting supply x trade size, for each
+    fee rate, and report the worst cell of each.
+
+    Parameters
+    ----------
+    amm : BondingCurveAMM
+        The AMM to certify. It is copied, never modified.
+    supplies : array_like
+        Starting supplies.
+    sizes : array_like
+        Trade sizes, in currency for the *_value_* round trips and in shares otherwise.
+    fee_rates : array_like, optional
+        Fee rates to scan. Defaults to the AMM's own fee rate.
+    tolerance : float, optional
+        Cells whose delta exceeds this count as arbitrage. Defaults to 0.
+    max_workers : int, optional
+        If given, the grid is split into blocks of `chunk_size` supplies per fee rate and
+        the blocks are scanned by a pool of this many processes. Otherwise it is scanned
+        in this process.
+    chunk_size : int, optional
+        Supplies per block.
+
+    Returns
+    -------
+    dict
+        Round trip name -> None if no cell of that trip could be made, else
+            {
+                'net_delta' or 'shares_delta': float,  # the worst (largest) delta
+                'supply': float,                       # where it occurred
+                'size': float,
+                'fee_rate': float,
+                'arbitrage_cells': int,                # cells with delta > tolerance
+                'cells': int,                          # cells where the trip could be made
+            }
+    """
+    supplies = np.asarray(supplies, dtype=float).ravel()
+    sizes = np.asarray(sizes, dtype=float).ravel()
+    fee_rates = [amm.fee_rate] if fee_rates is None else np.asarray(fee_rates, dtype=float).ravel()
+
+    tasks = []
+    for fee_rate in fee_rates:
+        scanned = copy.deepcopy(amm)
+        scanned.fee_rate = float(fee_rate)
+        for start in range(0, len(supplies), chunk_size):
+            tasks.append((scanned, supplies[start:start + chunk_size], sizes, tolerance))
+
+    if max_workers is None:
+        reports = [_scan_task(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            reports = list(pool.map(_scan_task, *zip(*tasks)))
+    return _merge(reports)
+
+
+def assert_no_round_trip_arbitrage_on_grid(amm, supplies, sizes, fee_rates=None, tolerance=0.0,
+                                           max_workers=None) -> dict:
+    """
+    Like BondingCurveAMM.assert_no_round_trip_arbitrage(), over a whole grid: runs
+    scan_round_trip_arbitrage() and raises RuntimeError naming the worst cell if any round
+    trip gains more than `tolerance`. Returns the scan report otherwise.
+    """
+    report = scan_round_trip_arbitrage(amm, supplies, sizes, fee_rates=fee_rates, tolerance=tolerance,
+                                       max_workers=max_workers)
+    for name, cell in report.items():
+        if cell is not None and cell["arbitrage_cells"]:
+            field = ROUND_TRIPS[name]
+            raise RuntimeError(
+                f"Arbitrage detected in {name} in {cell['arbitrage_cells']} of {cell['cells']} cells; "
+                f"worst {field}={cell[field]} at supply={cell['supply']}, size={cell['size']}, "
+                f"fee_rate={cell['fee_rate']}"
+            )
+    return report
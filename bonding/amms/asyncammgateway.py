@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from bonding.amms.bondingcurveamm import TRADE_OPERATIONS
+
+
+class AsyncAMMGateway:
+    """
+    An asyncio front-end for many BondingCurveAMMs.
+
+    Orders are queued per market and executed strictly in arrival order by one
+    worker task per market, so concurrent clients never interleave inside a trade
+    and no lock is held across markets. Quotes and state reads need no queue, since
+    the simulate_* methods do not modify the AMM.
+
+    Attributes
+    ----------
+    amms : dict
+        Market name -> BondingCurveAMM.
+    logger : logging.Logger
+        Logger instance for logging events and errors.
+    """
+
+    def __init__(self, amms: dict = None):
+        """
+        Parameters
+        ----------
+        amms : dict, optional
+            Initial markets, as market name -> BondingCurveAMM.
+        """
+        self.amms = dict(amms or {})
+        self._queues = {}
+        self._workers = {}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def add_market(self, market, amm):
+        if market in self.amms:
+            raise ValueError(f"Market {market!r} already exists.")
+        self.amms[market] = amm
+
+    async def submit(self, market, operation: str, amount: float, expected_version: int = None):
+        """
+        Queue a trade on `market` and wait for it to execute.
+
+        Parameters
+        ----------
+        market : hashable
+            Which AMM to trade against.
+        operation : str
+            One of 'buy_value', 'buy_shares', 'sell_shares' or 'sell_value'.
+        amount : float
+            Passed to the trade method.
+        expected_version : int, optional
+            If given, the trade is rejected with StaleStateError unless the AMM is
+            still at this version when the order reaches the front of the queue.
+
+        Returns
+        -------
+        Whatever the trade method returns. Exceptions raised by the trade are re-raised here.
+        """
+        if market not in self.amms:
+            raise KeyError(f"Unknown market {market!r}.")
+        if operation not in TRADE_OPERATIONS:
+            raise ValueError(f"Unknown operation {operation!r}; expected one of {TRADE_OPERATIONS}.")
+        future = asyncio.get_running_loop().create_future()
+        self._queue(market).put_nowait((operation, amount, expected_version, future))
+        return await future
+
+    def _queue(self, market) -> asyncio.Queue:
+        queue = self._queues.get(market)
+        if queue is None:
+            queue = self._queues[market] = asyncio.Queue()
+            self._workers[market] = asyncio.get_running_loop().create_task(self._work(market, queue))
+        return queue
+
+    async def _work(self, market, queue: asyncio.Queue):
+        amm = self.amms[market]
+        while True:
+            operation, amount, expected_version, future = await queue.get()
+            try:
+                if future.cancelled():
+                    # The client gave up before its turn, so the order is dropped
+                    continue
+                try:
+                    result = amm.execute(operation, amount, expected_version=expected_version)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            finally:
+                queue.task_done()
+
+    async def drain(self):
+        """
+        Wait until every queued order has executed.
+        """
+        await asyncio.gather(*(queue.join() for queue in self._queues.values()))
+
+    async def close(self):
+        """
+        Execute everything still queued, then stop the worker tasks.
+        """
+        await self.drain()
+        for worker in self._workers.values():
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._queues.clear()
+        self._workers.clear()
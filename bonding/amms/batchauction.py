@@ -0,0 +1,73 @@
+import logging
+from bonding.amms.bondingcurveamm import AUCTION_OPERATIONS
+
+
+class BatchAuction:
+    """
+    Collects orders for one BondingCurveAMM and executes them together, at one uniform
+    clearing price, when clear() is called. See BondingCurveAMM.execute_auction().
+
+    Call clear() on whatever schedule suits, e.g. every 100ms in a busy market: the cost
+    of clearing depends on the number of orders only through one vectorized pass, and
+    orders in the same block cannot trade ahead of each other.
+
+        auction = BatchAuction(amm)
+        auction.submit("buy_value", 100.0)
+        auction.submit("sell_shares", 3.0)
+        fills = auction.clear()
+
+    Attributes
+    ----------
+    amm : BondingCurveAMM
+        The AMM the orders execute against.
+    orders : list
+        Pending (operation, amount) orders, in submission order.
+    logger : logging.Logger
+        Logger instance for logging events and errors.
+    """
+
+    def __init__(self, amm):
+        self.amm = amm
+        self.orders = []
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def submit(self, operation: str, amount: float) -> int:
+        """
+        Add an order to the next auction.
+
+        Parameters
+        ----------
+        operation : str
+            One of 'buy_value', 'buy_shares' or 'sell_shares'.
+        amount : float
+            Currency to spend (buy_value) or shares to trade, non-negative.
+
+        Returns
+        -------
+        int
+            The order's index in the arrays returned by the next clear().
+        """
+        if operation not in AUCTION_OPERATIONS:
+            raise ValueError(f"Unknown auction operation {operation!r}; expected one of {AUCTION_OPERATIONS}.")
+        if not amount >= 0:
+            raise ValueError("Order amounts must be non-negative.")
+        self.orders.append((operation, float(amount)))
+        return len(self.orders) - 1
+
+    def clear(self) -> dict:
+        """
+        Execute the pending orders as one auction and start a new one.
+
+        Returns what BondingCurveAMM.execute_auction() returns. If the auction is rejected
+        (ValueError, e.g. sells beyond the supply) nothing is executed and the orders stay
+        pending, so the caller can remove the offending ones from `orders` and clear again.
+        """
+        fills = self.amm.execute_auction(self.orders)
+        self.orders = []
+        return fills
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def __repr__(self) -> str:
+        return f"BatchAuction(amm={self.amm!r}, pending={len(self.orders)})"
@@ -1,6 +1,28 @@
 import logging
 import math
-from bonding.amms.ammdefaultparams import QUANTA
+import threading
+from contextlib import nullcontext
+from functools import partial
+import numpy as np
+from bonding.amms.ammdefaultparams import QUANTA, RTOL
+from bonding.amms.quotecache import QUOTE_CACHE_SIZE, QuoteCache
+from bonding.amms.traderesults import BuyValueResult, BuySharesResult, SellSharesResult, SellValueResult
+
+# The state-changing trade methods, as accepted by BondingCurveAMM.execute()
+TRADE_OPERATIONS = ("buy_value", "buy_shares", "sell_shares", "sell_value")
+
+# The orders accepted by BondingCurveAMM.execute_auction()
+AUCTION_OPERATIONS = ("buy_value", "buy_shares", "sell_shares")
+
+# Integer ledger batches and auctions count quanta in int64 arrays, and refuse blocks whose
+# currency adds up to this many quanta or more (about 4.6e10 currency units at QUANTA=1e-8)
+LEDGER_BATCH_QUANTA = 2.0 ** 62
+
+
+class StaleStateError(RuntimeError):
+    """
+    Raised by BondingCurveAMM.execute() when the AMM has traded since the caller's expected version.
+    """
 
 
 class BondingCurveAMM:
@@ -22,11 +44,31 @@ class BondingCurveAMM:
         Total amount of currency that the amms curve has collected (this excludes fees).
     total_fees_collected : float
         Total amount of currency collected as fees.
+    integer_ledger : bool
+        Whether balances are kept as whole numbers of quanta (see cash_quanta and fees_quanta).
+    cash_quanta : int
+        In integer ledger mode, the currency held by the curve, in quanta.
+    fees_quanta : int
+        In integer ledger mode, the currency collected as fees, in quanta.
+    metrics : AMMMetrics or None
+        Solver counters and latency histograms, if enabled (see enable_metrics()).
+    quotes : QuoteCache or None
+        Recent simulate_* results at the current state, if enabled (see enable_quote_cache()).
+    version : int
+        Number of state changes so far. Use with execute() for compare-and-execute trading.
+    thread_safe : bool
+        Whether trades are serialized by a per-AMM lock.
     logger : logging.Logger
         Logger instance for logging events and errors.
     """
 
-    def __init__(self, curve, fee_rate=0.0, quanta=QUANTA):
+    # No per-instance __dict__. Subclasses should declare __slots__ = () to keep it that way.
+    __slots__ = ("_curve", "fee_rate", "quanta", "x", "total_cash_collected", "total_fees_collected",
+                 "integer_ledger", "cash_quanta", "fees_quanta", "version", "thread_safe", "_lock",
+                 "_last_solve", "_supply_integral", "_moved_integral", "metrics", "quotes", "logger")
+
+    def __init__(self, curve, fee_rate=0.0, quanta=QUANTA, thread_safe=False, integer_ledger=False,
+                 metrics=False, quote_cache=0):
         """
         Initialize the BondingCurveAMM.
 
@@ -38,8 +80,22 @@ class BondingCurveAMM:
             Fraction of each transaction (buy or sell) to be taken as fees (0.001 => 0.1%).
         quanta : float, optional
             Defines the smallest currency denomination (1e-8). Defaults to QUANTA.
+        thread_safe : bool, optional
+            If True, every state change holds a per-AMM lock, so trades from concurrent
+            threads are applied atomically and in some serial order. Defaults to False.
+        integer_ledger : bool, optional
+            If True, every trade moves a whole number of quanta between the trader, the
+            curve and the fee account, and the balances are kept as Python ints in
+            cash_quanta and fees_quanta. They are booked as in float mode, rounded to
+            whole quanta, and total_cash_collected and total_fees_collected are derived
+            from them, so repeated trades add no rounding drift. Defaults to False.
+        metrics : bool, optional
+            If True, enable_metrics() is called. Defaults to False.
+        quote_cache : int, optional
+            If positive, enable_quote_cache(quote_cache) is called. Defaults to 0.
         """
-        self.curve = curve
+        # The curve priced through: `curve`, or an InstrumentedCurve wrapping it while metrics are on
+        self._curve = curve
         self.fee_rate = float(fee_rate)
         self.quanta = float(quanta)
 
@@ -50,17 +106,204 @@ class BondingCurveAMM:
         self.total_cash_collected = 0.0
         self.total_fees_collected = 0.0
 
+        # Integer ledger mode: the same balances as whole numbers of quanta
+        self.integer_ledger = bool(integer_ledger)
+        self.cash_quanta = 0
+        self.fees_quanta = 0
+
+        # Concurrency: a version number bumped on every state change, and an optional lock
+        self.version = 0
+        self.thread_safe = bool(thread_safe)
+        self._lock = threading.RLock() if self.thread_safe else nullcontext()
+
+        # (target cost, shares) of the last numeric solve, used to warm-start the next
+        self._last_solve = (0.0, 0.0)
+
+        # (curve, x, price_integral(x)) at the current supply, and at the far end of the last
+        # move priced, which is usually the next supply. See _integral_at().
+        self._supply_integral = (curve, 0.0, 0.0)
+        self._moved_integral = (curve, 0.0, 0.0)
+
+        # Instrumentation, off unless asked for
+        self.metrics = None
+        if metrics:
+            self.enable_metrics()
+
+        # Cache of recent quotes, off unless asked for
+        self.quotes = None
+        if quote_cache:
+            self.enable_quote_cache(quote_cache)
+
         # Configure logger
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    def __getstate__(self):
+        # Locks cannot be pickled or copied; a fresh one is made on restore
+        state = {name: getattr(self, name) for name in BondingCurveAMM.__slots__ if name != "_lock"}
+        state.update(getattr(self, "__dict__", {}))
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._lock = threading.RLock() if self.thread_safe else nullcontext()
+
+    @property
+    def curve(self):
+        """
+        The bonding curve instance that defines price and integral logic.
+        """
+        return self._curve.curve if self.metrics is not None else self._curve
+
+    @curve.setter
+    def curve(self, curve):
+        self._curve = curve.instrumented() if self.metrics is not None else curve
+
+    ###########################################################################
+    # Metrics
+    ###########################################################################
+    def enable_metrics(self):
+        """
+        Start collecting metrics: solver iteration counts, calls made to the curve and
+        latency histograms for the trade and simulate_* methods. Calls are counted by
+        pricing through an InstrumentedCurve wrapping the curve; amm.curve itself is left
+        as it is. Costs nothing beyond a None check per call while disabled.
+        """
+        from bonding.amms.ammmetrics import AMMMetrics
+        if self.metrics is None:
+            self._curve = self._curve.instrumented()
+            self.metrics = AMMMetrics()
+
+    def disable_metrics(self):
+        """
+        Stop collecting metrics. Collected metrics are discarded.
+        """
+        if self.metrics is not None:
+            self._curve = self._curve.curve
+            self.metrics = None
+
+    def metrics_snapshot(self) -> dict:
+        """
+        Returns the metrics collected so far, as plain dicts and numbers:
+            {
+                'counters': dict,      # solver counters, see ammmetrics.SOLVER_COUNTERS
+                'curve_calls': dict,   # curve method name -> calls
+                'latency': dict,       # operation -> {'count', 'mean_ns', 'max_ns', 'p50_ns', 'p99_ns', 'buckets'}
+            }
+        or None if metrics are not enabled.
+        """
+        if self.metrics is None:
+            return None
+        snapshot = self.metrics.snapshot()
+        snapshot["curve_calls"] = dict(self._curve.calls)
+        return snapshot
+
+    ###########################################################################
+    # Quote cache
+    ###########################################################################
+    def enable_quote_cache(self, maxsize: int = QUOTE_CACHE_SIZE):
+        """
+        Keep the last `maxsize` results of simulate_buy_value, simulate_buy_shares,
+        simulate_sell_shares and simulate_sell_value at the current supply (x=None), so
+        repeated quotes of the same size are not solved again. Entries are keyed by
+        (version, x, operation, amount), so any trade invalidates them. Changing fee_rate,
+        quanta or the curve in place does not; call quotes.clear() after doing so.
+        """
+        if self.quotes is None or self.quotes.maxsize != maxsize:
+            self.quotes = QuoteCache(maxsize)
+
+    def disable_quote_cache(self):
+        """
+        Stop caching quotes. Cached entries and statistics are discarded.
+        """
+        self.quotes = None
+
+    def quote_cache_stats(self) -> dict:
+        """
+        Returns the quote cache's statistics:
+            {
+                'hits': int,
+                'misses': int,
+                'hit_rate': float,    # hits / (hits + misses)
+                'size': int,          # entries held
+                'maxsize': int,
+            }
+        or None if the quote cache is not enabled.
+        """
+        if self.quotes is None:
+            return None
+        return self.quotes.stats()
+
+    def _cached_quote(self, operation: str, quote, amount: float, x: float = None) -> tuple:
+        # quote(amount) at the current state, through the quote cache; x is always None here
+        return self.quotes.lookup((self.version, self.x, operation, amount), quote, amount)
+
+    ###########################################################################
+    # Cached integral at the current supply
+    ###########################################################################
+    def _integral_at(self, x: float) -> float:
+        """
+        curve.price_integral(x), remembered for the current supply. The cache is keyed on
+        the curve and the supply, so any change to either invalidates it.
+        """
+        curve = self._curve
+        cached_curve, cached_x, integral = self._supply_integral
+        if cached_curve is curve and cached_x == x:
+            return integral
+        cached_curve, cached_x, integral = self._moved_integral
+        if not (cached_curve is curve and cached_x == x):
+            integral = curve.price_integral(x)
+        if x == self.x:
+            self._supply_integral = (curve, x, integral)
+        return integral
+
+    def _cost_from(self, x_start: float):
+        """
+        cost_to_move(x_start, x_end) as a function of x_end, for curves whose cost_to_move is
+        the difference in their integrals, or None for other curves. The integral at x_start
+        comes from _integral_at(), so each call costs one integral rather than two, and the
+        integral at the last x_end is kept for the next trade, which starts there.
+        """
+        curve = self._curve
+        if not curve.cost_is_integral_difference():
+            return None
+        integral_start = self._integral_at(x_start)
+
+        def cost_to(x_end):
+            integral_end = curve.price_integral(x_end)
+            self._moved_integral = (curve, x_end, integral_end)
+            return integral_end - integral_start
+
+        return cost_to
+
+    def _cost_to_move(self, x_start: float, x_end: float) -> float:
+        """
+        curve.cost_to_move(x_start, x_end), reusing cached integrals as _cost_from() does.
+        """
+        cost_to = self._cost_from(x_start)
+        if cost_to is None:
+            return self._curve.cost_to_move(x_start, x_end)
+        return cost_to(x_end)
+
     ###########################################################################
     # Internal solver that uses the curve's cost_to_move
     ###########################################################################
     def _solve_for_dx(self, x_start: float, target_cost: float,
-                      tolerance=1e-12, max_iter=200) -> float:
+                      tolerance=1e-12, max_iter=200, rtol=RTOL) -> float:
         """
-        Solve for dx such that cost_to_move(x_start, x_start + dx) = target_cost
-        using the bisection method.
+        Solve for dx such that cost_to_move(x_start, x_start + dx) = target_cost.
+
+        Uses the curve's supply_after_cost() inverse when it provides one, and
+        a safeguarded Newton iteration otherwise.
+
+        Parameters
+        ----------
+        tolerance : float
+            Target costs smaller than this in magnitude are treated as zero.
+        max_iter : int
+            Iteration cap for the Newton fallback.
+        rtol : float
+            Relative tolerance on dx for the Newton fallback.
 
         Returns
         -------
@@ -69,56 +312,119 @@ class BondingCurveAMM:
         """
         if abs(target_cost) < tolerance:
             return 0.0
+        if self.metrics is not None:
+            self.metrics.counters["solves"] += 1
 
+        try:
+            x_end = self._curve.supply_after_cost(x_start, target_cost)
+        except NotImplementedError:
+            x_end = x_start + self._newton_solve_for_dx(x_start, target_cost, max_iter=max_iter, rtol=rtol)
+        else:
+            if self.metrics is not None:
+                self.metrics.counters["closed_form_solves"] += 1
+
+        # Supplies are floats, so the move is rounded. Round it down: at high prices one ulp
+        # of supply can be worth more than the round trip tolerance, so rounding up would
+        # hand out shares worth more than was paid, or take fewer than were sold.
+        if x_end > 0 and self._cost_to_move(x_start, x_end) > target_cost:
+            x_end = math.nextafter(x_end, -math.inf)
+        return x_end - x_start
+
+    def _newton_solve_for_dx(self, x_start: float, target_cost: float,
+                             max_iter=200, rtol=RTOL) -> float:
+        """
+        Newton's method on the size t = |dx| of the move, using curve.price as the
+        exact derivative of cost_to_move. Steps are taken in log(cost) against log(t),
+        and replaced by bisection whenever one leaves the current bracket.
+
+        The first guess reuses the previous solve's shares-per-currency when the
+        previous trade was of similar size, and the tangent estimate otherwise.
+        Iteration stops once the step, or the bracket, is within rtol of t or within the
+        spacing of floats at the final supply, or when a Newton step fails to reduce the
+        residual because cost_to_move has reached its rounding noise.
+        """
         direction = 1.0 if target_cost > 0 else -1.0
+        target = abs(target_cost)
+        cost_to = self._cost_from(x_start) or partial(self._curve.cost_to_move, x_start)
 
-        # Bisection bracketing
-        lower_dx = 0.0
-        upper_dx = 1e-12
+        def excess(t):
+            # Currency moved by a trade of size t, in excess of the target (increasing in t)
+            return direction * cost_to(x_start + direction * t) - target
 
-        # Expand to bracket the solution
-        while True:
-            x_test = x_start + direction * upper_dx
-            if x_test < 0:
-                x_test = 0.0
-            cost = self.curve.cost_to_move(x_start, x_test)  # Use the curve's logic
-
-            # If we've bracketed the target
-            if (direction > 0 and cost >= target_cost) or \
-                    (direction < 0 and cost <= target_cost):
-                break
-
-            upper_dx *= 2.0
-            if abs(upper_dx) > 1e20:
-                raise RuntimeError("Failed to bracket the solution for dx (bisection).")
+        last_target, last_t = self._last_solve
+        if 0.25 * last_target <= target <= 4.0 * last_target:
+            t = last_t * target / last_target
+        else:
+            t = target / self._curve.price(x_start)
+        t_max = x_start if direction < 0 else math.inf
+        t = min(t, t_max)
+
+        # Counts for metrics, if enabled
+        expansions = newton_steps = bisection_steps = 0
+        stalled = hit_max_iter = False
+
+        # Bracket [lo, hi], with excess(lo) < 0 <= excess(hi)
+        lo, hi = 0.0, math.inf
+        g = excess(t)
+        while g < 0:
+            expansions += 1
+            lo = t
+            if t >= t_max:
+                raise ValueError("Not enough supply to sell the requested currency amount (would go negative).")
+            t = min(2.0 * t, t_max)
+            if t > 1e20:
+                raise RuntimeError("Failed to bracket the solution for dx.")
+            g = excess(t)
+        hi = t
 
-        # Bisection
         for _ in range(max_iter):
-            mid_dx = 0.5 * (lower_dx + upper_dx)
-            x_mid = x_start + direction * mid_dx
-            if x_mid < 0:
-                x_mid = 0.0
-            cost_mid = self.curve.cost_to_move(x_start, x_mid)
-
-            if abs(cost_mid - target_cost) < tolerance:
-                return direction * mid_dx
-
-            if (direction > 0 and cost_mid < target_cost) or \
-                    (direction < 0 and cost_mid > target_cost):
-                lower_dx = mid_dx
+            if g == 0:
+                break
+            # Newton step on log(cost) against log(t): the same step near the root, but
+            # far better than plain Newton from a distant guess on power-like curves
+            cost = g + target
+            slope = self._curve.price(x_start + direction * t) * t / cost if cost > 0 else 0.0
+            t_next = t * math.exp(-math.log1p(g / target) / slope) if slope > 0 else lo - 1.0
+            # Sizes finer than the spacing of floats near the final supply cannot be told apart
+            resolution = max(rtol * t, math.ulp(x_start + t))
+            newton = lo < t_next < hi
+            if newton:
+                newton_steps += 1
+            elif abs(t_next - t) <= resolution:
+                # Left the bracket only by rounding
+                break
             else:
-                upper_dx = mid_dx
+                bisection_steps += 1
+                t_next = 0.5 * (lo + hi)
+            converged = abs(t_next - t) <= resolution or hi - lo <= resolution
+            g_next = excess(t_next)
+            if newton and abs(g_next) >= abs(g):
+                # No progress: cost_to_move is down to its rounding noise
+                stalled = True
+                break
+            t, g = t_next, g_next
+            if g < 0:
+                lo = t
+            else:
+                hi = t
+            if converged:
+                break
+        else:
+            hit_max_iter = True
 
-        return direction * 0.5 * (lower_dx + upper_dx)
+        if self.metrics is not None:
+            self.metrics.record_newton_solve(expansions, newton_steps, bisection_steps, stalled, hit_max_iter)
+        self._last_solve = (target, t)
+        return direction * t
 
     ###########################################################################
     # Simulation (Hypothetical) Methods
     ###########################################################################
-    def simulate_buy_value(self, total_value: float):
+    def simulate_buy_value(self, total_value: float, x: float = None):
         """
-        Simulate buying with `total_value` currency.
+        Simulate buying with `total_value` currency at supply `x` (default: the current supply).
 
-        Returns a dict with:
+        Returns a BuyValueResult, which also reads like a dict, with:
             {
                 'quanta_used': int,
                 'breakage_fee': float,
@@ -127,33 +433,47 @@ class BondingCurveAMM:
                 'shares_received': float
             }
         """
+        quote = self._quote_buy_value
+        if self.quotes is not None and x is None:
+            quote = partial(self._cached_quote, "buy_value", quote)
+        if self.metrics is not None:
+            return BuyValueResult(*self.metrics.timed("simulate_buy_value", quote, total_value, x))
+        return BuyValueResult(*quote(total_value, x))
+
+    def _quote_buy_value(self, total_value: float, x: float = None) -> tuple:
+        """
+        The fields of simulate_buy_value(), in order, as a plain tuple. The trade methods use this
+        directly, so a trade builds no result object.
+        """
         if total_value < 0:
             raise ValueError("Buy value must be non-negative.")
+        if x is None:
+            x = self.x
 
         # 1) Determine how many quanta we can use
         quanta_used = int(math.floor(total_value / self.quanta))
         breakage_fee = total_value - (quanta_used * self.quanta)
 
-        gross_currency = quanta_used * self.quanta
-        fee_amount = gross_currency * self.fee_rate
-        net_currency = gross_currency - fee_amount
+        if self.integer_ledger:
+            fee_quanta = self._fee_quanta(quanta_used)
+            fee_amount = fee_quanta * self.quanta
+            net_currency = (quanta_used - fee_quanta) * self.quanta
+        else:
+            gross_currency = quanta_used * self.quanta
+            fee_amount = gross_currency * self.fee_rate
+            net_currency = gross_currency - fee_amount
 
         # 2) Solve how many shares (dx) we can buy with net_currency
-        shares_received = self._solve_for_dx(self.x, net_currency)
+        shares_received = self._solve_for_dx(x, net_currency)
 
-        return {
-            "quanta_used": quanta_used,
-            "breakage_fee": breakage_fee,
-            "fee_amount": fee_amount,
-            "net_currency": net_currency,
-            "shares_received": shares_received,
-        }
+        return quanta_used, breakage_fee, fee_amount, net_currency, shares_received
 
-    def simulate_buy_shares(self, num_shares: float):
+    def simulate_buy_shares(self, num_shares: float, x: float = None):
         """
-        Simulate buying exactly `num_shares`, determining how much currency is required.
+        Simulate buying exactly `num_shares` at supply `x` (default: the current supply),
+        determining how much currency is required.
 
-        Returns a dict with:
+        Returns a BuySharesResult, which also reads like a dict, with:
             {
                 'gross_cost': float,     # The net cost (without fees) required by the curve
                 'quanta_used': int,
@@ -162,10 +482,24 @@ class BondingCurveAMM:
                 'total_paid': float,     # The total currency user must pay
             }
         """
+        quote = self._quote_buy_shares
+        if self.quotes is not None and x is None:
+            quote = partial(self._cached_quote, "buy_shares", quote)
+        if self.metrics is not None:
+            return BuySharesResult(*self.metrics.timed("simulate_buy_shares", quote, num_shares, x))
+        return BuySharesResult(*quote(num_shares, x))
+
+    def _quote_buy_shares(self, num_shares: float, x: float = None) -> tuple:
+        """
+        The fields of simulate_buy_shares(), in order, as a plain tuple. The trade methods use this
+        directly, so a trade builds no result object.
+        """
         if num_shares < 0:
             raise ValueError("Cannot buy a negative number of shares.")
+        if x is None:
+            x = self.x
         # The net cost to move supply from x to x + num_shares
-        gross_cost = self.curve.cost_to_move(self.x, self.x + num_shares)
+        gross_cost = self._cost_to_move(x, x + num_shares)
         if gross_cost < 0:
             gross_cost = 0.0  # Edge case if num_shares=0 or x=0
 
@@ -177,25 +511,28 @@ class BondingCurveAMM:
         else:
             # If fee_rate=1, the user can't actually buy anything.
             ideal_total = float('inf') if gross_cost > 0 else 0.0
+        if ideal_total / self.quanta == math.inf:
+            raise ValueError("Cost is too large to count in quanta.")
 
         quanta_used = int(math.ceil(ideal_total / self.quanta)) if ideal_total > 0 else 0
         total_paid = quanta_used * self.quanta
         breakage_fee = total_paid - ideal_total if total_paid > ideal_total else 0.0
-        fee_amount = total_paid * self.fee_rate
+        if self.integer_ledger:
+            # The curve gets whole quanta covering gross_cost, and the fee is the rest of the payment
+            net_quanta = int(math.ceil(gross_cost / self.quanta))
+            quanta_used = max(quanta_used, net_quanta)
+            total_paid = quanta_used * self.quanta
+            fee_amount = (quanta_used - net_quanta) * self.quanta
+        else:
+            fee_amount = total_paid * self.fee_rate
 
-        return {
-            "gross_cost": gross_cost,
-            "quanta_used": quanta_used,
-            "breakage_fee": breakage_fee,
-            "fee_amount": fee_amount,
-            "total_paid": total_paid,
-        }
+        return gross_cost, quanta_used, breakage_fee, fee_amount, total_paid
 
-    def simulate_sell_shares(self, num_shares: float):
+    def simulate_sell_shares(self, num_shares: float, x: float = None):
         """
-        Simulate selling `num_shares` from the current supply.
+        Simulate selling `num_shares` from supply `x` (default: the current supply).
 
-        Returns a dict with:
+        Returns a SellSharesResult, which also reads like a dict, with:
             {
                 'gross_currency': float,
                 'quanta_used': int,
@@ -204,37 +541,53 @@ class BondingCurveAMM:
                 'net_currency': float,
             }
         """
+        quote = self._quote_sell_shares
+        if self.quotes is not None and x is None:
+            quote = partial(self._cached_quote, "sell_shares", quote)
+        if self.metrics is not None:
+            return SellSharesResult(*self.metrics.timed("simulate_sell_shares", quote, num_shares, x))
+        return SellSharesResult(*quote(num_shares, x))
+
+    def _quote_sell_shares(self, num_shares: float, x: float = None) -> tuple:
+        """
+        The fields of simulate_sell_shares(), in order, as a plain tuple. The trade methods use this
+        directly, so a trade builds no result object.
+        """
         if num_shares < 0:
             raise ValueError("Cannot sell a negative number of shares.")
-        if num_shares > self.x:
+        if x is None:
+            x = self.x
+        if num_shares > x:
             raise ValueError("Cannot sell more shares than current supply.")
 
         # 1) The "gross" currency (before fees) from x -> x - num_shares
-        gross_currency = -self.curve.cost_to_move(self.x, self.x - num_shares)
+        gross_currency = -self._cost_to_move(x, x - num_shares)
         if gross_currency < 0:
             gross_currency = 0.0  # Edge case
 
         # 2) Break into quanta
+        if gross_currency / self.quanta == math.inf:
+            raise ValueError("Proceeds are too large to count in quanta.")
         quanta_used = int(math.floor(gross_currency / self.quanta))
         actual_gross = quanta_used * self.quanta
         breakage_fee = gross_currency - actual_gross
 
-        fee_amount = actual_gross * self.fee_rate
-        net_currency = actual_gross - fee_amount
+        if self.integer_ledger:
+            fee_quanta = self._fee_quanta(quanta_used)
+            fee_amount = fee_quanta * self.quanta
+            net_currency = (quanta_used - fee_quanta) * self.quanta
+        else:
+            fee_amount = actual_gross * self.fee_rate
+            net_currency = actual_gross - fee_amount
 
-        return {
-            "gross_currency": gross_currency,
-            "quanta_used": quanta_used,
-            "breakage_fee": breakage_fee,
-            "fee_amount": fee_amount,
-            "net_currency": net_currency,
-        }
+        return gross_currency, quanta_used, breakage_fee, fee_amount, net_currency
 
-    def simulate_sell_value(self, target_value: float):
+    def simulate_sell_value(self, target_value: float, x: float = None):
         """
-        Simulate selling enough shares to receive `target_value` total currency.
+        Simulate selling enough shares to receive `target_value` total currency,
+        from supply `x` (default: the current supply).
 
-        Returns a dict with:
+        Returns a SellValueResult, which also reads like a dict, with:
             {
                 'quanta_used': int,
                 'breakage_fee': float,
@@ -244,29 +597,179 @@ class BondingCurveAMM:
                 'shares_sold': float
             }
         """
+        quote = self._quote_sell_value
+        if self.quotes is not None and x is None:
+            quote = partial(self._cached_quote, "sell_value", quote)
+        if self.metrics is not None:
+            return SellValueResult(*self.metrics.timed("simulate_sell_value", quote, target_value, x))
+        return SellValueResult(*quote(target_value, x))
+
+    def _quote_sell_value(self, target_value: float, x: float = None) -> tuple:
+        """
+        The fields of simulate_sell_value(), in order, as a plain tuple. The trade methods use this
+        directly, so a trade builds no result object.
+        """
         if target_value < 0:
             raise ValueError("Target sell value must be non-negative.")
+        if x is None:
+            x = self.x
 
         # 1) break into quanta
         quanta_used = int(math.floor(target_value / self.quanta))
         breakage_fee = target_value - quanta_used * self.quanta
 
         gross_currency = quanta_used * self.quanta
-        fee_amount = gross_currency * self.fee_rate
-        net_currency = gross_currency - fee_amount
+        if self.integer_ledger:
+            fee_quanta = self._fee_quanta(quanta_used)
+            fee_amount = fee_quanta * self.quanta
+            net_currency = (quanta_used - fee_quanta) * self.quanta
+        else:
+            fee_amount = gross_currency * self.fee_rate
+            net_currency = gross_currency - fee_amount
 
         # 2) Solve for dx s.t. cost_to_move(x, x+dx) = -gross_currency
         # (the user is receiving `gross_currency`)
-        dx = self._solve_for_dx(self.x, -gross_currency)  # likely negative
+        dx = self._solve_for_dx(x, -gross_currency)  # likely negative
 
-        return {
-            "quanta_used": quanta_used,
-            "breakage_fee": breakage_fee,
-            "fee_amount": fee_amount,
-            "gross_currency": gross_currency,
-            "net_currency": net_currency,
-            "shares_sold": dx,
-        }
+        return quanta_used, breakage_fee, fee_amount, gross_currency, net_currency, dx
+
+    ###########################################################################
+    # Batched Simulation Methods (columnar, one vectorized pass per call)
+    #
+    # quanta_used columns hold whole numbers as float64 rather than int64, as
+    # int64 would overflow on trades beyond ~9e10 currency units at QUANTA=1e-8.
+    ###########################################################################
+    def _solve_for_dx_array(self, x_start, target_cost, tolerance=1e-12) -> np.ndarray:
+        """
+        Vectorized _solve_for_dx(), solving every element in one call to the curve's
+        supply_after_cost_array().
+        """
+        x_start, target_cost = np.broadcast_arrays(np.asarray(x_start, dtype=float),
+                                                   np.asarray(target_cost, dtype=float))
+        target_cost = np.where(np.abs(target_cost) < tolerance, 0.0, target_cost)
+        x_end = self._curve.supply_after_cost_array(x_start, target_cost)
+        # Round every move down, as _solve_for_dx() does
+        over = (x_end > 0) & (self._curve.cost_to_move_array(x_start, x_end) > target_cost)
+        return np.where(over, np.nextafter(x_end, -np.inf), x_end) - x_start
+
+    def simulate_buy_value_batch(self, total_values, x=None):
+        """
+        Simulate buying with each of `total_values`, from supply `x` (default: the current
+        supply). An array `x` is broadcast against `total_values`.
+
+        Returns a BuyValueResult with an array in each field.
+        """
+        total_values = np.asarray(total_values, dtype=float)
+        if np.any(total_values < 0):
+            raise ValueError("Buy value must be non-negative.")
+        x = self.x if x is None else np.asarray(x, dtype=float)
+
+        quanta_used = np.floor(total_values / self.quanta)
+        breakage_fee = total_values - (quanta_used * self.quanta)
+
+        if self.integer_ledger:
+            fee_quanta = np.rint(quanta_used * self.fee_rate)
+            fee_amount = fee_quanta * self.quanta
+            net_currency = (quanta_used - fee_quanta) * self.quanta
+        else:
+            gross_currency = quanta_used * self.quanta
+            fee_amount = gross_currency * self.fee_rate
+            net_currency = gross_currency - fee_amount
+
+        shares_received = self._solve_for_dx_array(x, net_currency)
+
+        return BuyValueResult(quanta_used, breakage_fee, fee_amount, net_currency, shares_received)
+
+    def simulate_buy_shares_batch(self, num_shares, x=None):
+        """
+        Simulate buying each of `num_shares`, from supply `x` (default: the current supply).
+        An array `x` is broadcast against `num_shares`.
+
+        Returns a BuySharesResult with an array in each field.
+        """
+        num_shares = np.asarray(num_shares, dtype=float)
+        if np.any(num_shares < 0):
+            raise ValueError("Cannot buy a negative number of shares.")
+        x = self.x if x is None else np.asarray(x, dtype=float)
+        gross_cost = np.maximum(self._curve.cost_to_move_array(x, x + num_shares), 0.0)
+
+        if self.fee_rate < 1.0:
+            ideal_total = gross_cost / (1.0 - self.fee_rate)
+        elif np.any(gross_cost > 0):
+            raise ValueError("Cannot buy shares when fee_rate is 1 or more.")
+        else:
+            ideal_total = gross_cost
+
+        quanta_used = np.ceil(ideal_total / self.quanta)
+        total_paid = quanta_used * self.quanta
+        breakage_fee = np.where(total_paid > ideal_total, total_paid - ideal_total, 0.0)
+        if self.integer_ledger:
+            net_quanta = np.ceil(gross_cost / self.quanta)
+            quanta_used = np.maximum(quanta_used, net_quanta)
+            total_paid = quanta_used * self.quanta
+            fee_amount = (quanta_used - net_quanta) * self.quanta
+        else:
+            fee_amount = total_paid * self.fee_rate
+
+        return BuySharesResult(gross_cost, quanta_used, breakage_fee, fee_amount, total_paid)
+
+    def simulate_sell_shares_batch(self, num_shares, x=None):
+        """
+        Simulate selling each of `num_shares`, from supply `x` (default: the current supply).
+        An array `x` is broadcast against `num_shares`.
+
+        Returns a SellSharesResult with an array in each field.
+        """
+        num_shares = np.asarray(num_shares, dtype=float)
+        if np.any(num_shares < 0):
+            raise ValueError("Cannot sell a negative number of shares.")
+        x = self.x if x is None else np.asarray(x, dtype=float)
+        if np.any(num_shares > x):
+            raise ValueError("Cannot sell more shares than current supply.")
+
+        gross_currency = np.maximum(-self._curve.cost_to_move_array(x, x - num_shares), 0.0)
+
+        quanta_used = np.floor(gross_currency / self.quanta)
+        actual_gross = quanta_used * self.quanta
+        breakage_fee = gross_currency - actual_gross
+
+        if self.integer_ledger:
+            fee_quanta = np.rint(quanta_used * self.fee_rate)
+            fee_amount = fee_quanta * self.quanta
+            net_currency = (quanta_used - fee_quanta) * self.quanta
+        else:
+            fee_amount = actual_gross * self.fee_rate
+            net_currency = actual_gross - fee_amount
+
+        return SellSharesResult(gross_currency, quanta_used, breakage_fee, fee_amount, net_currency)
+
+    def simulate_sell_value_batch(self, target_values, x=None):
+        """
+        Simulate selling enough shares to receive each of `target_values`, from supply `x`
+        (default: the current supply). An array `x` is broadcast against `target_values`.
+
+        Returns a SellValueResult with an array in each field.
+        """
+        target_values = np.asarray(target_values, dtype=float)
+        if np.any(target_values < 0):
+            raise ValueError("Target sell value must be non-negative.")
+        x = self.x if x is None else np.asarray(x, dtype=float)
+
+        quanta_used = np.floor(target_values / self.quanta)
+        breakage_fee = target_values - quanta_used * self.quanta
+
+        gross_currency = quanta_used * self.quanta
+        if self.integer_ledger:
+            fee_quanta = np.rint(quanta_used * self.fee_rate)
+            fee_amount = fee_quanta * self.quanta
+            net_currency = (quanta_used - fee_quanta) * self.quanta
+        else:
+            fee_amount = gross_currency * self.fee_rate
+            net_currency = gross_currency - fee_amount
+
+        dx = self._solve_for_dx_array(x, -gross_currency)
+
+        return SellValueResult(quanta_used, breakage_fee, fee_amount, gross_currency, net_currency, dx)
 
     ###########################################################################
     # Actual Action Methods (State-Changing)
@@ -276,95 +779,597 @@ class BondingCurveAMM:
         The user spends `value` currency to buy shares.
         Returns the number of shares actually purchased.
         """
-        sim = self.simulate_buy_value(value)
+        if self.metrics is not None:
+            return self.metrics.timed("buy_value", self._buy_value, value)
+        return self._buy_value(value)
 
-        # Update state from simulation
-        self.total_fees_collected += sim["breakage_fee"] + sim["fee_amount"]
-        self.total_cash_collected += sim["net_currency"]
-        self.x += sim["shares_received"]
+    def _buy_value(self, value: float) -> float:
+        with self._lock:
+            if self.integer_ledger:
+                return self._ledger_buy_value(value)
+            _, breakage_fee, fee_amount, net_currency, shares_received = self._quote_buy_value(value)
 
-        return sim["shares_received"]
+            # Update state from simulation
+            self.total_fees_collected += breakage_fee + fee_amount
+            self.total_cash_collected += net_currency
+            self.x += shares_received
+            self.version += 1
+
+        return shares_received
 
     def buy_shares(self, num_shares: float) -> float:
         """
         The user wants to buy exactly `num_shares`.
         Returns the total currency they actually paid.
         """
-        sim = self.simulate_buy_shares(num_shares)
+        if self.metrics is not None:
+            return self.metrics.timed("buy_shares", self._buy_shares, num_shares)
+        return self._buy_shares(num_shares)
 
-        # We assume we can indeed mint exactly num_shares
-        self.x += num_shares
+    def _buy_shares(self, num_shares: float) -> float:
+        with self._lock:
+            if self.integer_ledger:
+                return self._ledger_buy_shares(num_shares)
+            _, _, breakage_fee, fee_amount, total_paid = self._quote_buy_shares(num_shares)
 
-        # The curve receives net = (total_paid - fee_amount)
-        net_currency = sim["total_paid"] - sim["fee_amount"]
+            # We assume we can indeed mint exactly num_shares
+            self.x += num_shares
 
-        # Update AMM balances
-        self.total_fees_collected += sim["breakage_fee"] + sim["fee_amount"]
-        self.total_cash_collected += net_currency
+            # The curve receives net = (total_paid - fee_amount)
+            net_currency = total_paid - fee_amount
 
-        return sim["total_paid"]
+            # Update AMM balances
+            self.total_fees_collected += breakage_fee + fee_amount
+            self.total_cash_collected += net_currency
+            self.version += 1
+
+        return total_paid
 
     def sell_shares(self, num_shares: float) -> float:
         """
         Sell exactly `num_shares`, returning the net currency the user receives.
         """
-        sim = self.simulate_sell_shares(num_shares)
+        if self.metrics is not None:
+            return self.metrics.timed("sell_shares", self._sell_shares, num_shares)
+        return self._sell_shares(num_shares)
 
-        # Remove the shares from supply
-        self.x -= num_shares
+    def _sell_shares(self, num_shares: float) -> float:
+        with self._lock:
+            if self.integer_ledger:
+                return self._ledger_sell_shares(num_shares)
+            _, _, breakage_fee, fee_amount, net_currency = self._quote_sell_shares(num_shares)
 
-        # The user receives sim["net_currency"]
-        self.total_cash_collected -= sim["net_currency"]
-        self.total_fees_collected += sim["breakage_fee"] + sim["fee_amount"]
+            # Remove the shares from supply
+            self.x -= num_shares
 
-        return sim["net_currency"]
+            # The user receives net_currency
+            self.total_cash_collected -= net_currency
+            self.total_fees_collected += breakage_fee + fee_amount
+            self.version += 1
+
+        return net_currency
 
     def sell_value(self, value: float) -> float:
         """
         Sell enough shares to receive `value` currency (in total).
         Returns the number of shares sold (positive float).
         """
-        sim = self.simulate_sell_value(value)
-        dx = sim["shares_sold"]  # negative or possibly 0
+        if self.metrics is not None:
+            return self.metrics.timed("sell_value", self._sell_value, value)
+        return self._sell_value(value)
+
+    def _sell_value(self, value: float) -> float:
+        with self._lock:
+            if self.integer_ledger:
+                return self._ledger_sell_value(value)
+            _, breakage_fee, fee_amount, _, net_currency, dx = self._quote_sell_value(value)
+            # dx is negative or possibly 0
+
+            # Check if this would exceed the current supply
+            if self.x + dx < 0:
+                raise ValueError("Not enough supply to sell the requested currency amount (would go negative).")
+
+            # Finalize state
+            self.x += dx
+            self.total_fees_collected += breakage_fee + fee_amount
+            self.total_cash_collected -= net_currency
+            self.version += 1
+
+        return abs(dx)
+
+    ###########################################################################
+    # Integer ledger mode
+    #
+    # Currency is converted to quanta once, where it enters or leaves the AMM.
+    # A buy takes paid_q quanta from the trader, of which fee_q go to fees and
+    # the rest to the curve. A sell takes gross_q quanta from the curve, of which
+    # fee_q go to fees and the rest to the trader. Fees are rounded to the
+    # nearest quanta; any sub-quanta remainder stays with the trader (buys) or
+    # the curve (sells) and is never booked. As in float mode, a sell takes only
+    # the trader's gross_q - fee_q off cash_quanta, so both modes book the same.
+    # The quotes (_quote_* and simulate_*) round the same way, so a fill is
+    # exactly what was quoted.
+    ###########################################################################
+    def _fee_quanta(self, quanta_used: int) -> int:
+        return round(quanta_used * self.fee_rate)
+
+    def _book_quanta(self, cash_quanta: int, fees_quanta: int):
+        self.cash_quanta += cash_quanta
+        self.fees_quanta += fees_quanta
+        self.total_cash_collected = self.cash_quanta * self.quanta
+        self.total_fees_collected = self.fees_quanta * self.quanta
+        self.version += 1
+
+    def _ledger_buy_value(self, value: float) -> float:
+        paid_q, _, _, _, shares_received = self._quote_buy_value(value)
+        fee_q = self._fee_quanta(paid_q)
+        self.x += shares_received
+        self._book_quanta(paid_q - fee_q, fee_q)
+        return shares_received
+
+    def _ledger_buy_shares(self, num_shares: float) -> float:
+        gross_cost, paid_q, _, _, total_paid = self._quote_buy_shares(num_shares)
+        # The curve receives at least gross_cost, and the trader pays at least that plus fees
+        net_q = int(math.ceil(gross_cost / self.quanta))
+        self.x += num_shares
+        self._book_quanta(net_q, paid_q - net_q)
+        return total_paid
+
+    def _ledger_sell_shares(self, num_shares: float) -> float:
+        _, gross_q, _, _, net_currency = self._quote_sell_shares(num_shares)
+        fee_q = self._fee_quanta(gross_q)
+        self.x -= num_shares
+        self._book_quanta(fee_q - gross_q, fee_q)
+        return net_currency
 
-        # Check if this would exceed the current supply
+    def _ledger_sell_value(self, value: float) -> float:
+        gross_q, _, _, _, _, dx = self._quote_sell_value(value)
+        fee_q = self._fee_quanta(gross_q)
         if self.x + dx < 0:
             raise ValueError("Not enough supply to sell the requested currency amount (would go negative).")
-
-        # Finalize state
         self.x += dx
-        self.total_fees_collected += sim["breakage_fee"] + sim["fee_amount"]
-        self.total_cash_collected -= sim["net_currency"]
-
+        self._book_quanta(fee_q - gross_q, fee_q)
         return abs(dx)
 
+    def total_quanta_collected(self) -> int:
+        """
+        In integer ledger mode, cash_quanta + fees_quanta: exactly the quanta paid in by
+        buyers, less the quanta paid out to sellers, plus the fee quanta on sells (which,
+        as in float mode, are booked to fees without being taken off cash). Reconciling
+        against an external ledger is a single integer comparison.
+        """
+        if not self.integer_ledger:
+            raise RuntimeError("total_quanta_collected() requires integer_ledger=True.")
+        with self._lock:
+            return self.cash_quanta + self.fees_quanta
+
+    def execute(self, operation: str, amount: float, expected_version: int = None):
+        """
+        Atomically run one of the trade methods named in TRADE_OPERATIONS
+        ('buy_value', 'buy_shares', 'sell_shares' or 'sell_value') with `amount`.
+
+        If `expected_version` is given the trade only goes ahead if no other trade has
+        happened since the caller saw that version (e.g. from snapshot()), and
+        StaleStateError is raised otherwise. This lets a client quote, decide and then
+        trade without holding the lock in between.
+
+        Returns whatever the trade method returns.
+        """
+        if operation not in TRADE_OPERATIONS:
+            raise ValueError(f"Unknown operation {operation!r}; expected one of {TRADE_OPERATIONS}.")
+        with self._lock:
+            if expected_version is not None and expected_version != self.version:
+                raise StaleStateError(f"AMM is at version {self.version}, not {expected_version}.")
+            return getattr(self, operation)(amount)
+
+    def execute_shares_batch(self, signed_shares):
+        """
+        Execute a sequence of share-denominated trades in order: buy_shares(n) for each
+        n >= 0 and sell_shares(-n) for each n < 0.
+
+        The supply after every trade is a running sum of the signed quantities, so the
+        whole sequence costs one cumulative sum and one vectorized cost_to_move_array
+        evaluation. Fees, quanta rounding and the running totals then follow the scalar
+        methods operation for operation, but the costs come from the curve's array methods,
+        whose last bits can differ from the scalar ones. So a fill can differ from what the
+        scalar method would return by one quanta or about 1e-14 of the fill, whichever is
+        larger, and the totals by the sum of those. (The linear curve matches exactly.) Nothing
+        is executed if any trade would take the supply below zero. In integer ledger mode
+        the quanta are counted in int64 arrays, with the same rounding as the scalar methods,
+        and nothing is executed if the trades add up to LEDGER_BATCH_QUANTA quanta or more.
+
+        Returns
+        -------
+        dict of arrays, one entry per trade:
+            {
+                'shares': float,         # signed quantity traded
+                'supply': float,         # supply after the trade
+                'quanta_used': float,    # whole numbers, as in the batch simulations
+                'breakage_fee': float,
+                'fee_amount': float,
+                'paid': float,           # total paid by a buyer (what buy_shares returns), else 0
+                'received': float,       # net currency to a seller (what sell_shares returns), else 0
+            }
+        """
+        with self._lock:
+            signed_shares = np.asarray(signed_shares, dtype=float).ravel()
+            path = np.cumsum(np.concatenate(([self.x], signed_shares)))
+            if np.any(path[1:] < 0):
+                raise ValueError("Cannot sell more shares than current supply.")
+            buy = signed_shares >= 0
+
+            # Currency the curve takes in (buys) or pays out (sells), before fees and rounding
+            if self._curve.cost_is_integral_difference():
+                # One integral per supply on the path, rather than two per trade
+                integrals = self._curve.price_integral_array(path)
+                cost = np.diff(integrals)
+                self._moved_integral = (self._curve, float(path[-1]), float(integrals[-1]))
+            else:
+                cost = self._curve.cost_to_move_array(path[:-1], path[1:])
+            gross = np.maximum(np.where(buy, cost, -cost), 0.0)
+
+            if self.fee_rate < 1.0:
+                ideal_total = gross / (1.0 - self.fee_rate)
+            elif np.any(gross[buy] > 0):
+                raise ValueError("Cannot buy shares when fee_rate is 1 or more.")
+            else:
+                ideal_total = gross
+
+            if self.integer_ledger:
+                return self._ledger_execute_shares_batch(signed_shares, path, buy, gross, ideal_total)
+
+            quanta_used = np.where(buy, np.ceil(ideal_total / self.quanta), np.floor(gross / self.quanta))
+            quantized = quanta_used * self.quanta
+            breakage_fee = np.where(buy, np.where(quantized > ideal_total, quantized - ideal_total, 0.0), gross - quantized)
+            fee_amount = quantized * self.fee_rate
+            net_currency = quantized - fee_amount
+
+            cash_path = np.cumsum(np.concatenate(([self.total_cash_collected], np.where(buy, net_currency, -net_currency))))
+            fees_path = np.cumsum(np.concatenate(([self.total_fees_collected], breakage_fee + fee_amount)))
+
+            self.x = float(path[-1])
+            self.total_cash_collected = float(cash_path[-1])
+            self.total_fees_collected = float(fees_path[-1])
+            self.version += len(signed_shares)
+
+        return {
+            "shares": signed_shares,
+            "supply": path[1:],
+            "quanta_used": quanta_used,
+            "breakage_fee": breakage_fee,
+            "fee_amount": fee_amount,
+            "paid": np.where(buy, quantized, 0.0),
+            "received": np.where(buy, 0.0, net_currency),
+        }
+
+    def _ledger_execute_shares_batch(self, signed_shares, path, buy, gross, ideal_total) -> dict:
+        """
+        The integer ledger part of execute_shares_batch(), with the same rounding as the
+        scalar _ledger_* methods done in int64 arrays.
+        """
+        self._check_ledger_batch(ideal_total)
+        net_q = np.ceil(gross / self.quanta).astype(np.int64)
+        gross_q = np.floor(gross / self.quanta).astype(np.int64)
+        paid_q = np.maximum(np.ceil(ideal_total / self.quanta).astype(np.int64), net_q)
+        fee_q = np.where(buy, paid_q - net_q, np.rint(gross_q * self.fee_rate).astype(np.int64))
+        quanta_used = np.where(buy, paid_q, gross_q)
+        cash_q = np.where(buy, net_q, fee_q - gross_q)
+
+        self.x = float(path[-1])
+        self.cash_quanta += int(cash_q.sum())
+        self.fees_quanta += int(fee_q.sum())
+        self.total_cash_collected = self.cash_quanta * self.quanta
+        self.total_fees_collected = self.fees_quanta * self.quanta
+        self.version += len(signed_shares)
+
+        quantized = quanta_used * self.quanta
+        return {
+            "shares": signed_shares,
+            "supply": path[1:],
+            "quanta_used": quanta_used,
+            "breakage_fee": np.where(buy, np.maximum(quantized - ideal_total, 0.0), gross - quantized),
+            "fee_amount": fee_q * self.quanta,
+            "paid": np.where(buy, quantized, 0.0),
+            "received": np.where(buy, 0.0, (gross_q - fee_q) * self.quanta),
+        }
+
+    def _check_ledger_batch(self, currency):
+        """
+        Raise ValueError unless the non-negative amounts in `currency` add up to fewer than
+        LEDGER_BATCH_QUANTA quanta, so that int64 counts of them, and their sums, cannot wrap.
+        """
+        if not np.sum(currency) / self.quanta < LEDGER_BATCH_QUANTA:
+            raise ValueError("Trades are too large to count in int64 quanta; execute them one at a time.")
+
+    ###########################################################################
+    # Batch auctions
+    ###########################################################################
+    def execute_auction(self, orders) -> dict:
+        """
+        Execute a block of orders together, at one uniform clearing price.
+
+        Buys are netted against sells and the curve makes a single move for the imbalance.
+        Every order fills at the curve's average price over that move,
+
+            clearing_price = cost_to_move(x, x + net_shares) / net_shares
+
+        (the current price if the orders net to nothing), so the curve collects exactly
+        what the move costs and no order gains from its position in the block. Fees and
+        quanta are rounded per order, as the scalar trade methods round them.
+
+        Orders are (operation, amount) pairs, with operation one of AUCTION_OPERATIONS:
+            'buy_value'     spend `amount` currency
+            'buy_shares'    buy `amount` shares
+            'sell_shares'   sell `amount` shares
+        sell_value orders are not taken, as the shares they sell depend on the clearing price.
+
+        The cost is one root find for the clearing price and one vectorized pass over the
+        orders, however many there are. Nothing is executed if the sells exceed the supply
+        plus the shares bought, or if an order is invalid. In integer ledger mode the quanta
+        are counted in int64 arrays, as in execute_shares_batch(), and nothing is executed
+        if the orders add up to LEDGER_BATCH_QUANTA quanta or more.
+
+        Returns
+        -------
+        dict
+            {
+                'clearing_price': float,
+                'net_shares': float,     # the curve's move
+                'supply': float,         # supply after the auction
+                # one array entry per order:
+                'shares': float,         # shares bought (positive) or sold (negative)
+                'quanta_used': float,    # whole numbers, as in the batch simulations
+                'breakage_fee': float,
+                'fee_amount': float,
+                'paid': float,           # total paid by a buyer, else 0
+                'received': float,       # net currency to a seller, else 0
+            }
+        """
+        operations = [operation for operation, _ in orders]
+        amounts = np.array([amount for _, amount in orders], dtype=float)
+        for operation in set(operations):
+            if operation not in AUCTION_OPERATIONS:
+                raise ValueError(f"Unknown auction operation {operation!r}; expected one of {AUCTION_OPERATIONS}.")
+        if not np.all(amounts >= 0):
+            raise ValueError("Order amounts must be non-negative.")
+        operations = np.array(operations, dtype=object)
+        buy_value = operations == "buy_value"
+        buy_shares = operations == "buy_shares"
+        sell_shares = operations == "sell_shares"
+        quanta, fee_rate = self.quanta, self.fee_rate
+        if self.fee_rate >= 1.0 and np.any(amounts[buy_shares] > 0):
+            raise ValueError("Cannot buy shares when fee_rate is 1 or more.")
+
+        with self._lock:
+            x = self.x
+            shares_in = math.fsum(amounts[buy_shares]) - math.fsum(amounts[sell_shares])
+            if x + shares_in < 0:
+                raise ValueError("Cannot sell more shares than current supply.")
+
+            # Currency the value buyers put into the curve, with the scalar methods' rounding
+            if self.integer_ledger:
+                value_amounts = np.where(buy_value, amounts, 0.0)
+                self._check_ledger_batch(value_amounts)
+                value_q = np.floor(value_amounts / quanta).astype(np.int64)
+                value_fee_q = np.rint(value_q * fee_rate).astype(np.int64)
+                value_net = (value_q - value_fee_q) * quanta
+            else:
+                value_quanta = np.floor(amounts / quanta)
+                value_gross = value_quanta * quanta
+                value_fee = value_gross * fee_rate
+                value_net = value_gross - value_fee
+            value_in = math.fsum(value_net[buy_value])
+
+            net_shares = self._auction_move(x, value_in, shares_in)
+            clearing_price = self._cost_to_move(x, x + net_shares) / net_shares if net_shares else self._curve.price(x)
+
+            # Shares for the value buyers, rounded down so none pays below the clearing price
+            value_shares = value_net / clearing_price
+            value_shares = np.where(value_shares * clearing_price > value_net,
+                                    np.nextafter(value_shares, -np.inf), value_shares)
+            shares = np.where(buy_value, value_shares, np.where(buy_shares, amounts, -amounts))
+            net_shares = shares_in + math.fsum(value_shares[buy_value])
+
+            gross = amounts * clearing_price
+            if not np.all(gross / quanta < math.inf):
+                raise ValueError("Cost is too large to count in quanta.")
+            if self.integer_ledger:
+                ideal_total = gross / (1.0 - fee_rate) if fee_rate < 1.0 else gross
+                self._check_ledger_batch(np.where(buy_value, amounts, ideal_total))
+                net_q = np.ceil(gross / quanta).astype(np.int64)
+                paid_q = np.maximum(np.ceil(ideal_total / quanta).astype(np.int64), net_q)
+                gross_q = np.floor(gross / quanta).astype(np.int64)
+                sell_fee_q = np.rint(gross_q * fee_rate).astype(np.int64)
+                quanta_used = np.where(buy_value, value_q, np.where(buy_shares, paid_q, gross_q))
+                fee_q = np.where(buy_value, value_fee_q, np.where(buy_shares, paid_q - net_q, sell_fee_q))
+                cash_q = np.where(buy_value, value_q - value_fee_q, np.where(buy_shares, net_q, sell_fee_q - gross_q))
+                quantized = quanta_used * quanta
+                breakage_fee = np.where(buy_value, amounts - quantized,
+                                        np.where(buy_shares, np.maximum(quantized - ideal_total, 0.0),
+                                                 gross - quantized))
+                fee_amount = fee_q * quanta
+                received = (gross_q - sell_fee_q) * quanta
+
+                self.cash_quanta += int(cash_q.sum())
+                self.fees_quanta += int(fee_q.sum())
+                self.total_cash_collected = self.cash_quanta * self.quanta
+                self.total_fees_collected = self.fees_quanta * self.quanta
+            else:
+                ideal_total = gross / (1.0 - fee_rate) if fee_rate < 1.0 else gross
+                quanta_used = np.where(buy_value, value_quanta,
+                                       np.where(buy_shares, np.ceil(ideal_total / quanta), np.floor(gross / quanta)))
+                quantized = quanta_used * quanta
+                breakage_fee = np.where(buy_value, amounts - quantized,
+                                        np.where(buy_shares, np.where(quantized > ideal_total, quantized - ideal_total, 0.0),
+                                                 gross - quantized))
+                fee_amount = quantized * fee_rate
+                received = quantized - fee_amount
+                net_currency = np.where(sell_shares, -received, received)
+
+                self.total_cash_collected += math.fsum(net_currency)
+                self.total_fees_collected += math.fsum(breakage_fee + fee_amount)
+
+            self.x = x + net_shares
+            if len(amounts):
+                self.version += 1
+
+        return {
+            "clearing_price": clearing_price,
+            "net_shares": net_shares,
+            "supply": self.x,
+            "shares": shares,
+            "quanta_used": quanta_used,
+            "breakage_fee": breakage_fee,
+            "fee_amount": fee_amount,
+            "paid": np.where(sell_shares, 0.0, np.where(buy_value, amounts, quantized)),
+            "received": np.where(sell_shares, received, 0.0),
+        }
+
+    def _auction_move(self, x: float, value_in: float, shares_in: float,
+                      max_iter=200, rtol=RTOL) -> float:
+        """
+        The net move D of an auction in which share orders net to `shares_in` shares and
+        value buyers put `value_in` currency into the curve. Value buyers get u = D - shares_in
+        shares at the average price over the move, so u solves
+
+            h(u) = u * cost_to_move(x, x + shares_in + u) / (shares_in + u) - value_in = 0
+
+        h is increasing in u, as the average price is. Newton's method, using
+        h'(u) = avg + u * (price(x + D) - avg) / D, with bisection whenever a step leaves
+        the bracket.
+        """
+        if value_in <= 0:
+            return shares_in
+        cost_to = self._cost_from(x) or partial(self._curve.cost_to_move, x)
+
+        def average(d):
+            return cost_to(x + d) / d if d else self._curve.price(x)
+
+        lo, hi = 0.0, math.inf
+        u = value_in / self._curve.price(x + max(shares_in, 0.0))
+        for _ in range(max_iter):
+            d = shares_in + u
+            avg = average(d)
+            g = u * avg - value_in
+            if g == 0:
+                break
+            if g < 0:
+                lo = u
+            else:
+                hi = u
+            slope = avg + u * (self._curve.price(x + d) - avg) / d if d else avg
+            u_next = u - g / slope
+            if not lo < u_next < hi:
+                u_next = 0.5 * (lo + hi) if hi < math.inf else 2.0 * u
+            if abs(u_next - u) <= max(rtol * u, math.ulp(x + d)):
+                u = u_next
+                break
+            u = u_next
+        return shares_in + u
+
     ###########################################################################
     # Utility
     ###########################################################################
-    def get_maximum_sell_value(self) -> float:
+    def get_maximum_sell_value(self, x: float = None) -> float:
         """
-        Returns the maximum net currency value one can extract by selling all shares (curve.x).
+        Returns the maximum net currency value one can extract by selling all shares (curve.x),
+        or all `x` shares if given.
         """
-        if self.x <= 0:
+        if x is None:
+            x = self.x
+        if x <= 0:
             return 0.0
-        sim = self.simulate_sell_shares(num_shares=self.x)
+        sim = self.simulate_sell_shares(num_shares=x, x=x)
         # We'll return net_currency truncated to quanta
-        max_quanta = int(math.floor(sim["net_currency"] / self.quanta))
+        max_quanta = int(math.floor(sim.net_currency / self.quanta))
         return max_quanta * self.quanta
 
+    def snapshot(self) -> dict:
+        """
+        Returns a consistent copy of the AMM's state: version, x, and the cash and fee totals
+        (also in quanta, in integer ledger mode).
+        """
+        with self._lock:
+            state = {
+                "version": self.version,
+                "x": self.x,
+                "total_cash_collected": self.total_cash_collected,
+                "total_fees_collected": self.total_fees_collected,
+            }
+            if self.integer_ledger:
+                state["cash_quanta"] = self.cash_quanta
+                state["fees_quanta"] = self.fees_quanta
+            return state
+
     def total_cost_at_supply(self, x_val: float = None) -> float:
         """
         Returns the integral of the price from 0 to x_val (or curve.x).
         """
         if x_val is None:
             x_val = self.x
-        return self.curve.price_integral(x_val)
+        return self._integral_at(x_val)
 
     def current_price(self) -> float:
         """
         Returns the instantaneous price at supply curve.x.
         """
-        return self.curve.price(self.x)
+        return self._curve.price(self.x)
+
+    def depth_ladder(self, num_levels: int = 10, size_step: float = None, price_step: float = None):
+        """
+        Bid/ask depth at the current supply, at `num_levels` rungs spaced either by
+        `size_step` shares or by `price_step` in marginal price (give exactly one).
+
+        Each rung reports the cumulative trade from the current supply out to that rung,
+        with fees and quanta rounding included, all rungs being evaluated together in
+        one pass of the batch simulations. Bid rungs beyond the current supply (or below
+        price(0)) are dropped.
+
+        Returns
+        -------
+        dict
+            {
+                'asks': {'shares', 'currency', 'average_price', 'marginal_price'},
+                'bids': {'shares', 'currency', 'average_price', 'marginal_price'},
+            }
+            with one array entry per rung. 'currency' is the total paid for asks
+            and the net currency received for bids.
+        """
+        if (size_step is None) == (price_step is None):
+            raise ValueError("Specify exactly one of size_step or price_step.")
+        x = self.x
+        steps = np.arange(1, int(num_levels) + 1, dtype=float)
+
+        if size_step is not None:
+            if size_step <= 0:
+                raise ValueError("size_step must be positive.")
+            ask_shares = steps * size_step
+            bid_shares = ask_shares[ask_shares <= x]
+        else:
+            if price_step <= 0:
+                raise ValueError("price_step must be positive.")
+            p0 = self._curve.price(x)
+            ask_shares = self._curve.supply_at_price_array(p0 + steps * price_step) - x
+            bid_supply = self._curve.supply_at_price_array(p0 - steps * price_step)
+            bid_shares = x - bid_supply[~np.isnan(bid_supply)]
+
+        asks = self.simulate_buy_shares_batch(ask_shares, x=x)
+        bids = self.simulate_sell_shares_batch(bid_shares, x=x)
+        with np.errstate(invalid='ignore'):
+            return {
+                "asks": {
+                    "shares": ask_shares,
+                    "currency": asks.total_paid,
+                    "average_price": asks.total_paid / ask_shares,
+                    "marginal_price": self._curve.price_array(x + ask_shares),
+                },
+                "bids": {
+                    "shares": bid_shares,
+                    "currency": bids.net_currency,
+                    "average_price": bids.net_currency / bid_shares,
+                    "marginal_price": self._curve.price_array(x - bid_shares),
+                },
+            }
 
     def __repr__(self) -> str:
         return (f"<BondingCurveAMM("
@@ -378,10 +1383,11 @@ class BondingCurveAMM:
     ###########################################################################
     # Arbitrage checks (Round Trip Simulations)
     ###########################################################################
-    def simulate_buy_value_then_sell_shares(self, buy_value: float = 1.0):
+    def simulate_buy_value_then_sell_shares(self, buy_value: float = 1.0, x: float = None):
         """
         Simulate spending `buy_value` currency to buy shares, and then
-        immediately selling *all* those purchased shares.
+        immediately selling *all* those purchased shares, starting from
+        supply `x` (default: the current supply). The AMM is not modified.
 
         Returns
         -------
@@ -395,37 +1401,30 @@ class BondingCurveAMM:
                 'arbitrage': bool,    # True if net_delta > 0
             }
         """
-        # -- 1) Snapshot current AMM state --
-        old_x = self.x
-        old_cash = self.total_cash_collected
-        old_fees = self.total_fees_collected
+        if x is None:
+            x = self.x
 
-        try:
-            # -- 2) Perform the actual buy and sell on the AMM --
-            shares_received = self.buy_value(buy_value)  # real state change
-            final_currency = self.sell_shares(shares_received)  # real state change
+        buy_sim = self.simulate_buy_value(buy_value, x=x)
+        shares_received = buy_sim.shares_received
+        sell_sim = self.simulate_sell_shares(shares_received, x=x + shares_received)
+        final_currency = sell_sim.net_currency
 
-            # -- 3) Calculate the net delta --
-            net_delta = final_currency - buy_value
+        net_delta = final_currency - buy_value
 
-            return {
-                "initial_currency": buy_value,
-                "final_currency": final_currency,
-                "net_delta": net_delta,
-                "buy_sim": {},  # Optionally, include simulation details if needed
-                "sell_sim": {},
-                "arbitrage": (net_delta > 0),
-            }
-        finally:
-            # -- 4) Revert state to snapshot to avoid polluting further tests --
-            self.x = old_x
-            self.total_cash_collected = old_cash
-            self.total_fees_collected = old_fees
+        return {
+            "initial_currency": buy_value,
+            "final_currency": final_currency,
+            "net_delta": net_delta,
+            "buy_sim": buy_sim,
+            "sell_sim": sell_sim,
+            "arbitrage": (net_delta > 0),
+        }
 
-    def simulate_buy_shares_then_sell_shares(self, num_shares: float = 1.0):
+    def simulate_buy_shares_then_sell_shares(self, num_shares: float = 1.0, x: float = None):
         """
         Simulate buying exactly `num_shares`, then immediately selling
-        those same shares.
+        those same shares, starting from supply `x` (default: the current
+        supply). The AMM is not modified.
 
         Returns
         -------
@@ -438,36 +1437,27 @@ class BondingCurveAMM:
                 'arbitrage': bool
             }
         """
-        # -- 1) Snapshot --
-        old_x = self.x
-        old_cash = self.total_cash_collected
-        old_fees = self.total_fees_collected
+        if x is None:
+            x = self.x
 
-        try:
-            # -- 2) Actual operations --
-            currency_spent = self.buy_shares(num_shares)  # returns total_paid
-            currency_received = self.sell_shares(num_shares)
+        currency_spent = self.simulate_buy_shares(num_shares, x=x).total_paid
+        currency_received = self.simulate_sell_shares(num_shares, x=x + num_shares).net_currency
 
-            # -- 3) Net delta in currency --
-            net_delta = currency_received - currency_spent
+        net_delta = currency_received - currency_spent
 
-            return {
-                "shares_bought": num_shares,
-                "currency_spent": currency_spent,
-                "currency_received": currency_received,
-                "net_delta": net_delta,
-                "arbitrage": (net_delta > 0),
-            }
-        finally:
-            # -- 4) Revert --
-            self.x = old_x
-            self.total_cash_collected = old_cash
-            self.total_fees_collected = old_fees
+        return {
+            "shares_bought": num_shares,
+            "currency_spent": currency_spent,
+            "currency_received": currency_received,
+            "net_delta": net_delta,
+            "arbitrage": (net_delta > 0),
+        }
 
-    def simulate_sell_value_then_buy_shares(self, target_value: float = 1.0):
+    def simulate_sell_value_then_buy_shares(self, target_value: float = 1.0, x: float = None):
         """
         Simulate selling enough shares to receive exactly `target_value` currency,
-        then use the *net* proceeds to buy shares again.
+        then using that same currency to buy shares again, starting from supply `x`
+        (default: the current supply). The AMM is not modified.
 
         Returns
         -------
@@ -475,45 +1465,37 @@ class BondingCurveAMM:
             {
                 'target_value': float,
                 'shares_sold': float,          # positive
-                'buy_shares_received': float,  # how many shares we get from the net currency
+                'buy_shares_received': float,  # how many shares we get from the currency
                 'shares_delta': float,         # (buy_shares_received - shares_sold)
                 'arbitrage': bool
             }
         """
-        # -- 1) Snapshot --
-        old_x = self.x
-        old_cash = self.total_cash_collected
-        old_fees = self.total_fees_collected
+        if x is None:
+            x = self.x
 
-        try:
-            # -- 2) Sell enough shares to get `target_value` currency (actual call) --
-            shares_sold = self.sell_value(target_value)  # returns # shares sold
-            # Now the user has `target_value` currency (conceptually)...
+        dx = self.simulate_sell_value(target_value, x=x).shares_sold
+        if x + dx < 0:
+            raise ValueError("Not enough supply to sell the requested currency amount (would go negative).")
+        shares_sold = abs(dx)
 
-            # -- 3) Use that same currency to buy shares again (actual call) --
-            #   We'll call buy_value(...) with exactly `target_value`
-            shares_bought = self.buy_value(target_value)
+        shares_bought = self.simulate_buy_value(target_value, x=x + dx).shares_received
 
-            # -- 4) net shares difference --
-            shares_delta = shares_bought - shares_sold
+        shares_delta = shares_bought - shares_sold
 
-            return {
-                "target_value": target_value,
-                "shares_sold": shares_sold,
-                "buy_shares_received": shares_bought,
-                "shares_delta": shares_delta,
-                "arbitrage": (shares_delta > 0),
-            }
-        finally:
-            # -- 5) Revert --
-            self.x = old_x
-            self.total_cash_collected = old_cash
-            self.total_fees_collected = old_fees
+        return {
+            "target_value": target_value,
+            "shares_sold": shares_sold,
+            "buy_shares_received": shares_bought,
+            "shares_delta": shares_delta,
+            "arbitrage": (shares_delta > 0),
+        }
 
-    def simulate_sell_shares_then_buy_value(self, shares_to_sell: float = 1.0):
+    def simulate_sell_shares_then_buy_value(self, shares_to_sell: float = 1.0, x: float = None):
         """
         Simulate selling exactly `shares_to_sell`, then use the net proceeds
-        to buy as much as possible of the AMM (buy_value) with that currency.
+        to buy as much as possible of the AMM (buy_value) with that currency,
+        starting from supply `x` (default: the current supply). The AMM is not
+        modified.
 
         Returns
         -------
@@ -526,52 +1508,45 @@ class BondingCurveAMM:
                 'arbitrage': bool
             }
         """
-        # -- 1) Snapshot --
-        old_x = self.x
-        old_cash = self.total_cash_collected
-        old_fees = self.total_fees_collected
+        if x is None:
+            x = self.x
 
-        try:
-            # -- 2) Sell `shares_to_sell` (actual call) --
-            currency_received = self.sell_shares(shares_to_sell)
+        currency_received = self.simulate_sell_shares(shares_to_sell, x=x).net_currency
+        shares_bought = self.simulate_buy_value(currency_received, x=x - shares_to_sell).shares_received
 
-            # -- 3) Use that entire currency to buy_value(...) again --
-            shares_bought = self.buy_value(currency_received)
+        shares_delta = shares_bought - shares_to_sell
 
-            # -- 4) Compare new shares vs. old
-            shares_delta = shares_bought - shares_to_sell
-
-            return {
-                "shares_sold": shares_to_sell,
-                "currency_received": currency_received,
-                "shares_bought": shares_bought,
-                "shares_delta": shares_delta,
-                "arbitrage": (shares_delta > 0),
-            }
-        finally:
-            # -- 5) Revert --
-            self.x = old_x
-            self.total_cash_collected = old_cash
-            self.total_fees_collected = old_fees
+        return {
+            "shares_sold": shares_to_sell,
+            "currency_received": currency_received,
+            "shares_bought": shares_bought,
+            "shares_delta": shares_delta,
+            "arbitrage": (shares_delta > 0),
+        }
 
-    def assert_no_round_trip_arbitrage(self) -> bool:
+    def assert_no_round_trip_arbitrage(self, x: float = None) -> bool:
         """
-        Runs a few sample round-trip trades with *actual* state changes
-        (then reverts after each test). If any scenario yields a net profit,
-        raises RuntimeError.
+        Runs a few sample round-trip simulations from supply `x` (default: the
+        current supply, read once). If any scenario yields a net profit, raises
+        RuntimeError. The AMM is not modified, so this is safe to run against a
+        live AMM. To sweep many supplies, sizes and fee rates at once, see
+        bonding.amms.arbitragescanner.
 
         Returns
         -------
         bool
             True if no arbitrage found, else RuntimeError is raised.
         """
+        if x is None:
+            x = self.x
+
         # You can pick a small set of test values/shares
         test_values = [0.5, 1.0, 10.0]
         test_shares = [0.5, 1.0, 10.0]
 
         # (1) Buy-value->Sell-shares
         for val in test_values:
-            result = self.simulate_buy_value_then_sell_shares(val)
+            result = self.simulate_buy_value_then_sell_shares(val, x=x)
             if result["arbitrage"]:
                 raise RuntimeError(
                     f"Arbitrage detected in buy_value->sell_shares for value={val}: "
@@ -580,7 +1555,7 @@ class BondingCurveAMM:
 
         # (2) Buy-shares->Sell-shares
         for s in test_shares:
-            result = self.simulate_buy_shares_then_sell_shares(s)
+            result = self.simulate_buy_shares_then_sell_shares(s, x=x)
             if result["arbitrage"]:
                 raise RuntimeError(
                     f"Arbitrage detected in buy_shares->sell_shares for shares={s}: "
@@ -590,8 +1565,8 @@ class BondingCurveAMM:
         # (3) Sell-value->Buy-shares
         for val in test_values:
             # Only attempt if the AMM has enough supply to realistically sell `val`.
-            if self.get_maximum_sell_value() >= val:
-                result = self.simulate_sell_value_then_buy_shares(val)
+            if self.get_maximum_sell_value(x=x) >= val:
+                result = self.simulate_sell_value_then_buy_shares(val, x=x)
                 if result["arbitrage"]:
                     raise RuntimeError(
                         f"Arbitrage detected in sell_value->buy_shares for value={val}: "
@@ -601,8 +1576,8 @@ class BondingCurveAMM:
         # (4) Sell-shares->Buy-value
         for s in test_shares:
             # Must have enough shares (s <= curve.x) to do the test
-            if s <= self.x:
-                result = self.simulate_sell_shares_then_buy_value(s)
+            if s <= x:
+                result = self.simulate_sell_shares_then_buy_value(s, x=x)
                 if result["arbitrage"]:
                     raise RuntimeError(
                         f"Arbitrage detected in sell_shares->buy_value for shares={s}: "
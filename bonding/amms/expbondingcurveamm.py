@@ -7,8 +7,9 @@ from bonding.amms.bondingcurveamm import BondingCurveAMM
 
 
 class ExpBondingCurveAMM(BondingCurveAMM):
+    __slots__ = ()
 
-    def __init__(self, scale: float = 500_000.0, fee_rate: float = 0.0):
+    def __init__(self, scale: float = 500_000.0, fee_rate: float = 0.0, **kwargs):
         """
 
         scale : float, optional
@@ -19,5 +20,7 @@ class ExpBondingCurveAMM(BondingCurveAMM):
             Fraction of each transaction (buy or sell) collected as fees.
             0.001 => 0.1%.
             Default: 0.0
+        **kwargs
+            Further BondingCurveAMM options, e.g. thread_safe.
         """
-        super().__init__(curve=ExpBondingCurve(scale=scale), fee_rate=fee_rate)
+        super().__init__(curve=ExpBondingCurve(scale=scale), fee_rate=fee_rate, **kwargs)
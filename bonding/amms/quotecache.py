@@ -0,0 +1,75 @@
+from collections import OrderedDict
+
+# Entries kept by default, see BondingCurveAMM.enable_quote_cache()
+QUOTE_CACHE_SIZE = 1024
+
+
+class QuoteCache:
+    """
+    A bounded LRU cache of quotes for one BondingCurveAMM. See BondingCurveAMM.enable_quote_cache().
+
+    Keys are (version, x, operation, amount), so a trade, or any other change to the supply,
+    makes every earlier entry unreachable; those age out as new quotes come in. Values are
+    the plain tuples built by the AMM's _quote_* methods, so callers never share a result
+    object with the cache.
+
+    Updates are not locked. Concurrent quotes on a thread_safe AMM may both miss and
+    compute the same entry, and the hit and miss counts are then approximate.
+
+    Attributes
+    ----------
+    maxsize : int
+        Entries kept before the least recently used is dropped.
+    entries : OrderedDict
+        Key -> quote tuple, least recently used first.
+    hits : int
+        Quotes served from the cache.
+    misses : int
+        Quotes computed and added to the cache.
+    """
+
+    __slots__ = ("maxsize", "entries", "hits", "misses")
+
+    def __init__(self, maxsize: int = QUOTE_CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError("Quote cache size must be at least 1.")
+        self.maxsize = int(maxsize)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key, quote, amount) -> tuple:
+        """
+        The cached quote for `key`, or quote(amount) stored under `key`.
+        """
+        entries = self.entries
+        try:
+            value = entries[key]
+        except KeyError:
+            pass
+        else:
+            entries.move_to_end(key)
+            self.hits += 1
+            return value
+        value = quote(amount)
+        self.misses += 1
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """
+        Drop every entry, keeping the hit and miss counts.
+        """
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,97 @@
+from collections.abc import Mapping
+
+
+class TradeResult(Mapping):
+    """
+    Base class for the results of the simulate_* methods.
+
+    Each result type has a fixed set of fields held in __slots__, so a quote
+    allocates one small object rather than a dict. Fields read as attributes
+    (sim.net_currency) and, for code written against the older dict results,
+    by key (sim["net_currency"]), along with keys(), items(), get(), dict(sim)
+    and equality with a dict holding the same entries.
+
+    The batch simulations return the same types with an array in each field.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{self.__class__.__name__}({fields})"
+
+
+class BuyValueResult(TradeResult):
+    """
+    Result of simulate_buy_value(): quanta_used, breakage_fee, fee_amount,
+    net_currency (what goes into the curve) and shares_received.
+    """
+
+    __slots__ = ("quanta_used", "breakage_fee", "fee_amount", "net_currency", "shares_received")
+
+    def __init__(self, quanta_used, breakage_fee, fee_amount, net_currency, shares_received):
+        self.quanta_used = quanta_used
+        self.breakage_fee = breakage_fee
+        self.fee_amount = fee_amount
+        self.net_currency = net_currency
+        self.shares_received = shares_received
+
+
+class BuySharesResult(TradeResult):
+    """
+    Result of simulate_buy_shares(): gross_cost (what the curve requires), quanta_used,
+    breakage_fee, fee_amount and total_paid (what the buyer pays).
+    """
+
+    __slots__ = ("gross_cost", "quanta_used", "breakage_fee", "fee_amount", "total_paid")
+
+    def __init__(self, gross_cost, quanta_used, breakage_fee, fee_amount, total_paid):
+        self.gross_cost = gross_cost
+        self.quanta_used = quanta_used
+        self.breakage_fee = breakage_fee
+        self.fee_amount = fee_amount
+        self.total_paid = total_paid
+
+
+class SellSharesResult(TradeResult):
+    """
+    Result of simulate_sell_shares(): gross_currency (what the curve pays out), quanta_used,
+    breakage_fee, fee_amount and net_currency (what the seller receives).
+    """
+
+    __slots__ = ("gross_currency", "quanta_used", "breakage_fee", "fee_amount", "net_currency")
+
+    def __init__(self, gross_currency, quanta_used, breakage_fee, fee_amount, net_currency):
+        self.gross_currency = gross_currency
+        self.quanta_used = quanta_used
+        self.breakage_fee = breakage_fee
+        self.fee_amount = fee_amount
+        self.net_currency = net_currency
+
+
+class SellValueResult(TradeResult):
+    """
+    Result of simulate_sell_value(): quanta_used, breakage_fee, fee_amount, gross_currency,
+    net_currency and shares_sold (negative, as a change in supply).
+    """
+
+    __slots__ = ("quanta_used", "breakage_fee", "fee_amount", "gross_currency", "net_currency", "shares_sold")
+
+    def __init__(self, quanta_used, breakage_fee, fee_amount, gross_currency, net_currency, shares_sold):
+        self.quanta_used = quanta_used
+        self.breakage_fee = breakage_fee
+        self.fee_amount = fee_amount
+        self.gross_currency = gross_currency
+        self.net_currency = net_currency
+        self.shares_sold = shares_sold
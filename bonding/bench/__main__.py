@@ -0,0 +1,51 @@
+import argparse
+import json
+import sys
+from bonding.bench.benchmarks import BENCHMARKS, run_benchmarks
+from bonding.bench.baseline import DEFAULT_THRESHOLD, to_json, save_baseline, load_baseline, compare
+
+
+def main(argv=None) -> int:
+    """
+    Run the benchmarks, print or save the results as JSON, and optionally compare them
+    against a stored baseline. Returns 1 if anything regressed beyond the threshold.
+
+        python -m bonding.bench --save-baseline baseline.json
+        python -m bonding.bench --baseline baseline.json --threshold 0.2
+    """
+    parser = argparse.ArgumentParser(prog="python -m bonding.bench", description="Benchmarks for bonding.")
+    parser.add_argument("benchmarks", nargs="*",
+                        help=f"Benchmarks to run, from {', '.join(BENCHMARKS)} (default: all).")
+    parser.add_argument("--quick", action="store_true", help="Shorter, noisier timings.")
+    parser.add_argument("--output", help="Write the results as JSON to this file instead of stdout.")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Store the results as a new baseline.")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare the results against this baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Fractional slowdown counted as a regression (default: {DEFAULT_THRESHOLD}).")
+    args = parser.parse_args(argv)
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name!r}")
+
+    results = run_benchmarks(args.benchmarks, mode="quick" if args.quick else "full")
+
+    if args.output:
+        save_baseline(results, args.output)
+    elif not args.save_baseline:
+        json.dump(to_json(results), sys.stdout, indent=2)
+        print()
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+
+    if args.baseline:
+        regressions = compare(results, load_baseline(args.baseline), threshold=args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['name']}: {r['baseline']:.6g} -> {r['value']:.6g} ({r['ratio']:.2f}x)",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import json
+import platform
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.25
+
+
+def to_json(results: dict) -> dict:
+    """
+    Results with the environment they were measured in, as stored in a baseline file.
+    """
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": dict(sorted(results.items())),
+    }
+
+
+def save_baseline(results: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(to_json(results), f, indent=2)
+        f.write("\n")
+
+
+def load_baseline(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Results that are more than `threshold` (a fraction, 0.25 => 25%) worse than the baseline.
+    Lower is better for every result. Results missing from either side are ignored.
+
+    Returns
+    -------
+    list of dict, worst first
+        {
+            'name': str,
+            'baseline': float,
+            'value': float,
+            'ratio': float,   # value / baseline
+        }
+    """
+    regressions = []
+    for name, value in results.items():
+        reference = baseline.get(name)
+        if reference is None or reference <= 0:
+            continue
+        ratio = value / reference
+        if ratio > 1.0 + threshold:
+            regressions.append({"name": name, "baseline": reference, "value": value, "ratio": ratio})
+    return sorted(regressions, key=lambda r: -r["ratio"])
@@ -0,0 +1,264 @@
+import copy
+import numpy as np
+from bonding.bench.timing import time_per_call
+
+SCALE = 1000.0
+FEE_RATE = 0.001
+
+# Starting supplies, as multiples of the scale
+SUPPLIES = {
+    "small": 0.001,
+    "typical": 1.0,
+    "huge": 10.0,
+}
+
+# Trade size, as a fraction of the scale in shares
+TRADE_FRACTION = 0.001
+
+# Markets and trades (by mode) for bench_durability
+DURABLE_MARKETS = 1000
+DURABLE_TRADES = {"quick": 20_000, "full": 200_000}
+
+# Paths (by mode), steps and orders per path per step for bench_montecarlo
+MONTE_CARLO_PATHS = {"quick": 10_000, "full": 100_000}
+MONTE_CARLO_STEPS = 10
+MONTE_CARLO_RATE = 1.0
+
+# Supplies for bench_large_supply, up to a trillion times the scale
+LARGE_SUPPLIES = (1e3, 1e4, 1e5, 1e6, 1e9, 1e12, 1e15)
+COST_ERROR_FLOOR = 1e-12
+
+
+def _amm_at_supply(amm_cls, level: str):
+    amm = amm_cls(scale=SCALE, fee_rate=FEE_RATE)
+    amm.buy_shares(SUPPLIES[level] * SCALE)
+    return amm
+
+
+def bench_curves(mode: str = "full") -> dict:
+    """
+    ns per call of price, price_integral and cost_to_move, for every curve in all_curves_cls()
+    at every supply in SUPPLIES.
+    """
+    from bonding.curves.allcurves import all_curves_cls
+    results = {}
+    for curve_cls in all_curves_cls():
+        curve = curve_cls(scale=SCALE)
+        for level, multiple in SUPPLIES.items():
+            x = multiple * SCALE
+            dx = TRADE_FRACTION * SCALE
+            name = f"curve/{curve_cls.__name__}/{level}"
+            results[f"{name}/price_ns"] = time_per_call(lambda: curve.price(x), mode)
+            results[f"{name}/price_integral_ns"] = time_per_call(lambda: curve.price_integral(x), mode)
+            results[f"{name}/cost_to_move_ns"] = time_per_call(lambda: curve.cost_to_move(x, x + dx), mode)
+    return results
+
+
+def bench_solver(mode: str = "full") -> dict:
+    """
+    For every AMM in all_amm_cls() at every supply in SUPPLIES: ns per _solve_for_dx() (the
+    path trades take), and the mean number of cost_to_move evaluations per solve made by the
+    Newton fallback, over a spread of buy and sell sizes.
+    """
+    from bonding.amms.allamms import all_amm_cls
+    results = {}
+    for amm_cls in all_amm_cls():
+        for level in SUPPLIES:
+            amm = _amm_at_supply(amm_cls, level)
+            x = amm.x
+            cost = TRADE_FRACTION * SCALE * amm.current_price()
+            name = f"solver/{amm_cls.__name__}/{level}"
+            results[f"{name}/solve_ns"] = time_per_call(lambda: amm._solve_for_dx(x, cost), mode)
+
+            counting = amm.curve.instrumented()
+            amm.curve = counting
+            costs = cost * np.geomspace(1e-3, 1e2, 11)
+            targets = np.concatenate((costs, -costs[costs < 0.5 * amm.total_cost_at_supply(x)]))
+            for target in targets:
+                amm._newton_solve_for_dx(x, float(target))
+            amm.curve = counting.curve
+            results[f"{name}/newton_evaluations"] = counting.calls["cost_to_move"] / len(targets)
+    return results
+
+
+def bench_large_supply(mode: str = "full") -> dict:
+    """
+    Solver stress at supplies up to 1e15, for every AMM in all_amm_cls() at every supply in
+    LARGE_SUPPLIES at which the price is finite, over buys and sells of 1 to 10,000 shares:
+
+      - newton_evaluations: the mean number of cost_to_move evaluations per solve made by the
+        Newton fallback. Where cost_to_move loses its digits to cancellation, the solver
+        cannot meet its tolerance and this climbs.
+      - cost_error: the largest relative error in the currency moved by a solved trade,
+        against Gauss-Legendre quadrature of the price, floored at COST_ERROR_FLOOR so that
+        rounding noise does not register as a regression. Rounding the final supply to a
+        float alone costs up to ulp(x) / shares, e.g. ~1e-7 for one share at x = 1e9.
+    """
+    from bonding.amms.allamms import all_amm_cls
+    nodes, weights = np.polynomial.legendre.leggauss(20)
+    results = {}
+    for amm_cls in all_amm_cls():
+        for x in LARGE_SUPPLIES:
+            amm = amm_cls(scale=SCALE, fee_rate=FEE_RATE)
+            with np.errstate(over="ignore"):
+                if not np.isfinite(amm.curve.price_array(x)):
+                    continue
+            counting = amm.curve.instrumented()
+            amm.curve = counting
+            costs = np.geomspace(1.0, 1e4, 5) * amm.curve.price(x)
+            targets = np.concatenate((costs, -costs[costs < 0.5 * amm.total_cost_at_supply(x)]))
+            errors = []
+            for target in targets:
+                dx = amm._newton_solve_for_dx(x, float(target))
+                moved = 0.5 * dx * np.dot(weights, counting.curve.price_array(x + 0.5 * dx * (nodes + 1.0)))
+                errors.append(abs(moved / target - 1.0))
+            amm.curve = counting.curve
+            name = f"large_supply/{amm_cls.__name__}/{x:.0e}"
+            results[f"{name}/newton_evaluations"] = counting.calls["cost_to_move"] / len(targets)
+            results[f"{name}/cost_error"] = max(max(errors), COST_ERROR_FLOOR)
+    return results
+
+
+def bench_trades(mode: str = "full") -> dict:
+    """
+    ns per pair of trades for every AMM in all_amm_cls() at every supply in SUPPLIES. Each
+    trade is undone by the second of its pair, so the supply stays put while timing:
+    buy_value then sell_shares, and sell_value then buy_shares.
+    """
+    from bonding.amms.allamms import all_amm_cls
+    results = {}
+    for amm_cls in all_amm_cls():
+        for level in SUPPLIES:
+            amm = _amm_at_supply(amm_cls, level)
+            value = TRADE_FRACTION * SCALE * amm.current_price()
+            name = f"trade/{amm_cls.__name__}/{level}"
+            results[f"{name}/buy_value_sell_shares_ns"] = time_per_call(
+                lambda: amm.sell_shares(amm.buy_value(value)), mode)
+            if amm.get_maximum_sell_value() >= 2 * value:
+                results[f"{name}/sell_value_buy_shares_ns"] = time_per_call(
+                    lambda: amm.buy_shares(amm.sell_value(value)), mode)
+    return results
+
+
+def bench_round_trips(mode: str = "full", grid_size: int = 100) -> dict:
+    """
+    ns per assert_no_round_trip_arbitrage() for every AMM in all_amm_cls() at every supply in
+    SUPPLIES, and ns per cell of a grid_size x grid_size round_trip_grid().
+    """
+    from bonding.amms.allamms import all_amm_cls
+    from bonding.amms.arbitragescanner import round_trip_grid
+    results = {}
+    for amm_cls in all_amm_cls():
+        for level in SUPPLIES:
+            amm = _amm_at_supply(amm_cls, level)
+            results[f"round_trip/{amm_cls.__name__}/{level}/assert_no_arbitrage_ns"] = time_per_call(
+                amm.assert_no_round_trip_arbitrage, mode)
+        amm = amm_cls(scale=SCALE, fee_rate=FEE_RATE)
+        supplies = np.linspace(0.0, SUPPLIES["huge"] * SCALE, grid_size)
+        sizes = np.geomspace(1e-3, 1.0, grid_size) * SCALE
+        results[f"round_trip/{amm_cls.__name__}/grid_cell_ns"] = time_per_call(
+            lambda: round_trip_grid(amm, supplies, sizes), mode) / grid_size ** 2
+    return results
+
+
+def bench_durability(mode: str = "full") -> dict:
+    """
+    Sustained ns per trade through DurableMarkets, fsyncs and checkpoints included, against
+    the same trades on the AMMs alone; and ns per checkpoint and per recovery of
+    DURABLE_MARKETS markets. Trades alternate between buying and selling shares, a round
+    of one trade per market at a time, with a checkpoint every quarter of the trades.
+    """
+    import tempfile
+    import time
+    from bonding.amms.sqrtbondingcurveamm import SqrtBondingCurveAMM
+    from bonding.persistence.durablemarkets import DurableMarkets
+
+    def markets():
+        return {f"market{i}": SqrtBondingCurveAMM(scale=SCALE, fee_rate=FEE_RATE) for i in range(DURABLE_MARKETS)}
+
+    n = DURABLE_TRADES[mode]
+    orders = [(f"market{i % DURABLE_MARKETS}", "sell_shares" if i // DURABLE_MARKETS % 2 else "buy_shares", 1.0)
+              for i in range(n)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        durable = DurableMarkets(directory, markets(), checkpoint_every=n // 4)
+        start = time.perf_counter()
+        for order in orders:
+            durable.trade(*order)
+        durable.commit()
+        results["durability/trade_ns"] = 1e9 * (time.perf_counter() - start) / n
+
+        amms = markets()
+        start = time.perf_counter()
+        for market, operation, amount in orders:
+            amms[market].execute(operation, amount)
+        results["durability/memory_trade_ns"] = 1e9 * (time.perf_counter() - start) / n
+
+        results["durability/checkpoint_ns"] = time_per_call(durable.checkpoint, mode)
+        durable.close()
+        results["durability/recovery_ns"] = time_per_call(lambda: DurableMarkets(directory, markets()).close(), mode)
+    return results
+
+
+def bench_montecarlo(mode: str = "full") -> dict:
+    """
+    ns per order for every AMM in all_amm_cls() when simulate_paths() runs MONTE_CARLO_PATHS
+    paths at once, against the same order flow executed one order at a time on one AMM.
+    Paths start at the typical supply, with balanced orders of about a thousandth of the
+    scale in value.
+    """
+    import time
+    from bonding.amms.allamms import all_amm_cls
+    from bonding.montecarlo.orderflow import OrderFlow
+    from bonding.montecarlo.simulator import simulate_paths
+
+    results = {}
+    for amm_cls in all_amm_cls():
+        amm = _amm_at_supply(amm_cls, "typical")
+        flow = OrderFlow(arrival_rate=MONTE_CARLO_RATE, median_size=TRADE_FRACTION * SCALE * amm.current_price())
+        start = time.perf_counter()
+        paths = simulate_paths(amm, flow, MONTE_CARLO_PATHS[mode], MONTE_CARLO_STEPS, seed=0)
+        elapsed = time.perf_counter() - start
+        name = f"montecarlo/{amm_cls.__name__}"
+        results[f"{name}/path_order_ns"] = 1e9 * elapsed / max(int(paths["orders"].sum()), 1)
+
+        rng = np.random.default_rng(0)
+        n = MONTE_CARLO_PATHS[mode] // 10
+        buys, sizes = flow.sides(rng, n, 0), flow.sizes(rng, n, 0)
+        start = time.perf_counter()
+        for buy, size in zip(buys.tolist(), sizes.tolist()):
+            try:
+                amm.buy_value(size) if buy else amm.sell_value(size)
+            except ValueError:
+                pass
+        results[f"{name}/scalar_order_ns"] = 1e9 * (time.perf_counter() - start) / n
+    return results
+
+
+BENCHMARKS = {
+    "curves": bench_curves,
+    "solver": bench_solver,
+    "large_supply": bench_large_supply,
+    "trades": bench_trades,
+    "round_trips": bench_round_trips,
+    "durability": bench_durability,
+    "montecarlo": bench_montecarlo,
+}
+
+
+def run_benchmarks(names=None, mode: str = "full") -> dict:
+    """
+    Run the benchmarks in BENCHMARKS named in `names` (default: all).
+
+    Returns
+    -------
+    dict
+        Result name -> value. Names end in _ns (nanoseconds per call), _evaluations
+        (counts) or _error (relative errors), and for all of them lower is better.
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark {name!r}; expected one of {tuple(BENCHMARKS)}.")
+        results.update(BENCHMARKS[name](mode))
+    return results
@@ -0,0 +1,32 @@
+import time
+
+# Seconds each timed repeat should take, and how many repeats are made, by mode
+BUDGETS = {
+    "quick": (0.005, 3),
+    "full": (0.05, 7),
+}
+
+
+def time_per_call(fn, mode: str = "full") -> float:
+    """
+    Best-of-repeats time for one call of `fn()`, in nanoseconds.
+
+    The number of calls per repeat is doubled until a repeat takes the mode's budget, and
+    the fastest repeat is reported, as timeit does.
+    """
+    budget, repeats = BUDGETS[mode]
+    number = 1
+    while True:
+        elapsed = _time_calls(fn, number)
+        if elapsed >= budget:
+            break
+        number *= 2
+    best = min([elapsed] + [_time_calls(fn, number) for _ in range(repeats - 1)])
+    return 1e9 * best / number
+
+
+def _time_calls(fn, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start
@@ -36,23 +36,14 @@ if using_matplotlib:
         x_values = np.linspace(0, x_max, num_points)
 
         # Compute price and integral values
-        price_values = []
-        integral_values = []
-        for x in x_values:
-            try:
-                price = curve.price(x)
-                integral = curve.price_integral(x)
-            except Exception as e:
-                logger = logging.getLogger(__name__)
-                logger.error(f"Error computing values at x={x}: {e}")
-                price = np.nan
-                integral = np.nan
-            price_values.append(price)
-            integral_values.append(integral)
-
-        # Convert lists to numpy arrays for plotting
-        price_values = np.array(price_values)
-        integral_values = np.array(integral_values)
+        try:
+            price_values = curve.price_array(x_values)
+            integral_values = curve.price_integral_array(x_values)
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error computing values on [0, {x_max}]: {e}")
+            price_values = np.full_like(x_values, np.nan)
+            integral_values = np.full_like(x_values, np.nan)
 
         # Create plots
         fig, ax1 = plt.subplots(figsize=(10, 6))
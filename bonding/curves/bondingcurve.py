@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
+import math
 from bonding.curveplots.matplotlibcurveplot import matplotlib_curve_plot
 from bonding.curves.verifyintegralaccuracy import verify_integral_accuracy
 from typing import List
+import numpy as np
 
 
 class BondingCurve(ABC):
@@ -14,9 +16,24 @@ class BondingCurve(ABC):
         => integral of price(u) du from 0 to x
       - cost_to_move(x_start, x_end): float
         => can default to price_integral(x_end) - price_integral(x_start),
-           or be overridden if desired.
+           or be overridden if desired (see cost_is_integral_difference).
+
+    and may optionally define:
+      - supply_after_cost(x_start, cost): float
+        => the inverse of cost_to_move in its second argument.
+      - price_array(x), price_integral_array(x): np.ndarray
+        => NumPy versions of price and price_integral. The defaults call the
+           scalar methods once per element.
+      - supply_after_cost_array(x_start, cost): np.ndarray
+        => NumPy version of supply_after_cost. The default is a vectorized
+           root finder that needs only the array methods above.
+      - supply_at_price_array(prices): np.ndarray
+        => the inverse of price_array. The default bisects.
     """
 
+    # Concrete curves list their parameters in __slots__, so instances carry no __dict__
+    __slots__ = ()
+
     def get_scale(self) -> float:
         try:
             return self.__getattribute__("scale")
@@ -44,6 +61,200 @@ class BondingCurve(ABC):
         """
         return self.price_integral(x_end) - self.price_integral(x_start)
 
+    def cost_is_integral_difference(self) -> bool:
+        """
+        Return True if cost_to_move is the default difference in the integrals, so a caller
+        that already holds price_integral(x_start) can subtract it from price_integral(x_end)
+        instead. Curves that override cost_to_move return False.
+        """
+        return type(self).cost_to_move is BondingCurve.cost_to_move
+
+    def price_array(self, x) -> np.ndarray:
+        """
+        Return price(x) for every element of the array `x`.
+        """
+        x = np.asarray(x, dtype=float)
+        return np.fromiter((self.price(xi) for xi in x.ravel().tolist()), dtype=float, count=x.size).reshape(x.shape)
+
+    def price_integral_array(self, x) -> np.ndarray:
+        """
+        Return price_integral(x) for every element of the array `x`.
+        """
+        x = np.asarray(x, dtype=float)
+        return np.fromiter((self.price_integral(xi) for xi in x.ravel().tolist()), dtype=float,
+                           count=x.size).reshape(x.shape)
+
+    def cost_to_move_array(self, x_start, x_end) -> np.ndarray:
+        """
+        Return cost_to_move(x_start, x_end) elementwise, broadcasting `x_start` against `x_end`.
+        """
+        return self.price_integral_array(x_end) - self.price_integral_array(x_start)
+
+    def supply_after_cost(self, x_start: float, cost: float) -> float:
+        """
+        Return x_end such that cost_to_move(x_start, x_end) = cost.
+
+        Optional. Curves that can invert their integral cheaply override this,
+        and BondingCurveAMM falls back to its numeric solver otherwise.
+        A negative cost (a sale) that would take the supply below zero raises ValueError.
+        """
+        raise NotImplementedError("Concrete class may implement supply_after_cost() to invert cost_to_move().")
+
+    def _newton_supply_after_cost(self, x_start: float, cost: float, dx: float, max_iter: int = 100) -> float:
+        """
+        Newton's method for cost_to_move(x_start, x_start + dx) = cost, started from
+        an overestimate of dx. Price is positive and increasing, so the cost is convex
+        in dx and the residuals decrease monotonically to zero. Iteration stops as
+        soon as they cease to decrease, which is where rounding takes over.
+        """
+        if cost < -self.price_integral(x_start):
+            raise ValueError("Cannot sell below zero supply.")
+        residual = math.inf
+        for _ in range(max_iter):
+            x_end = x_start + dx
+            residual_next = self.cost_to_move(x_start, x_end) - cost
+            if not 0 < residual_next < residual:
+                break
+            residual = residual_next
+            step = residual / self.price(x_end)
+            if x_end - step <= 0:
+                return 0.0
+            dx -= step
+        return x_start + dx
+
+    def supply_at_price_array(self, prices) -> np.ndarray:
+        """
+        Return the supply x at which price(x) equals each of `prices`, or nan where
+        the price is below price(0).
+
+        The default bisects on price_array, all elements at once.
+        """
+        prices = np.asarray(prices, dtype=float)
+        lo = np.zeros_like(prices)
+        hi = np.ones_like(prices)
+        below = self.price_array(hi) < prices
+        while np.any(below):
+            hi[below] *= 2.0
+            if np.any(hi > 1e20):
+                raise RuntimeError("Failed to bracket the supply for supply_at_price_array.")
+            below[below] = self.price_array(hi[below]) < prices[below]
+        for _ in range(128):
+            mid = 0.5 * (lo + hi)
+            if not np.any((lo < mid) & (mid < hi)):
+                break
+            low = self.price_array(mid) < prices
+            lo = np.where(low, mid, lo)
+            hi = np.where(low, hi, mid)
+        return np.where(prices < self.price(0.0), np.nan, hi)
+
+    def supply_after_cost_array(self, x_start, cost) -> np.ndarray:
+        """
+        Return supply_after_cost(x_start, cost) elementwise, broadcasting `x_start` against `cost`.
+
+        The default solves all elements together by a bracketed Newton iteration on
+        price_array and cost_to_move_array, so any increasing curve gets it for free.
+        """
+        return self._bracketed_supply_after_cost_array(x_start, cost)
+
+    def _bracketed_supply_after_cost_array(self, x_start, cost, max_iter: int = 200,
+                                           rtol: float = 4 * np.finfo(float).eps) -> np.ndarray:
+        """
+        Vectorized Newton's method on the size t = |x_end - x_start| of each move, stepping in
+        log(cost) against log(t) and bisecting any element whose step leaves its bracket.
+        Elements drop out as they converge, so later iterations only evaluate stragglers.
+        """
+        x_start, cost = np.broadcast_arrays(np.asarray(x_start, dtype=float), np.asarray(cost, dtype=float))
+        x_end = np.array(x_start, dtype=float)
+        idx = np.flatnonzero(cost != 0)
+        if idx.size == 0:
+            return x_end
+
+        xs = x_start.ravel()[idx]
+        d = np.sign(cost.ravel()[idx])
+        target = np.abs(cost.ravel()[idx])
+
+        def excess(k, t):
+            # Currency moved by trades of size t, in excess of the target (increasing in t)
+            return d[k] * self.cost_to_move_array(xs[k], xs[k] + d[k] * t) - target[k]
+
+        t_max = np.where(d < 0, xs, np.inf)
+        t = np.minimum(target / self.price_array(xs), t_max)
+        lo = np.zeros_like(t)
+        g = excess(slice(None), t)
+
+        # Bracket [lo, hi] elementwise, with excess(lo) < 0 <= excess(hi)
+        k = np.flatnonzero(g < 0)
+        while k.size:
+            if np.any(t[k] >= t_max[k]):
+                raise ValueError("Cannot sell below zero supply.")
+            lo[k] = t[k]
+            t[k] = np.minimum(2.0 * t[k], t_max[k])
+            if np.any(t[k] > 1e20):
+                raise RuntimeError("Failed to bracket the solution for supply_after_cost_array.")
+            g[k] = excess(k, t[k])
+            k = k[g[k] < 0]
+        hi = t.copy()
+
+        k = np.flatnonzero(g != 0)
+        for _ in range(max_iter):
+            if k.size == 0:
+                break
+            t_k, g_k = t[k], g[k]
+            with np.errstate(all='ignore'):
+                slope = self.price_array(xs[k] + d[k] * t_k) * t_k / (g_k + target[k])
+                t_next = t_k * np.exp(-np.log1p(g_k / target[k]) / slope)
+            newton = (lo[k] < t_next) & (t_next < hi[k])
+            t_next = np.where(newton, t_next, 0.5 * (lo[k] + hi[k]))
+            converged = (np.abs(t_next - t_k) <= rtol * t_next) | (hi[k] - lo[k] <= rtol * hi[k])
+            g_next = excess(k, t_next)
+            # A Newton step that fails to reduce the residual has hit rounding noise
+            stalled = newton & (np.abs(g_next) >= np.abs(g_k))
+            moved = k[~stalled]
+            t[moved], g[moved] = t_next[~stalled], g_next[~stalled]
+            below = moved[g[moved] < 0]
+            lo[below] = t[below]
+            above = moved[g[moved] >= 0]
+            hi[above] = t[above]
+            k = k[~(stalled | converged | (g_next == 0))]
+
+        x_end.flat[idx] = xs + d * t
+        return x_end
+
+    def _newton_supply_after_cost_array(self, x_start, cost, dx, max_iter: int = 100) -> np.ndarray:
+        """
+        Vectorized _newton_supply_after_cost(), started from overestimates `dx`.
+        """
+        x_start, cost, dx = np.broadcast_arrays(np.asarray(x_start, dtype=float), np.asarray(cost, dtype=float),
+                                                np.asarray(dx, dtype=float))
+        if np.any(cost < -self.price_integral_array(x_start)):
+            raise ValueError("Cannot sell below zero supply.")
+        shape = cost.shape
+        x_start, cost, dx = x_start.ravel(), cost.ravel(), np.array(dx, dtype=float).ravel()
+        residual = np.full_like(dx, np.inf)
+        k = np.arange(dx.size)
+        for _ in range(max_iter):
+            if k.size == 0:
+                break
+            x_end = x_start[k] + dx[k]
+            residual_next = self.cost_to_move_array(x_start[k], x_end) - cost[k]
+            k, x_end, residual_next = [a[(0 < residual_next) & (residual_next < residual[k])]
+                                       for a in (k, x_end, residual_next)]
+            residual[k] = residual_next
+            step = residual_next / self.price_array(x_end)
+            to_zero = x_end - step <= 0
+            dx[k[to_zero]] = -x_start[k[to_zero]]
+            dx[k[~to_zero]] -= step[~to_zero]
+            k = k[~to_zero]
+        return (x_start + dx).reshape(shape)
+
+    def instrumented(self):
+        """
+        Return an InstrumentedCurve wrapping this curve, which prices identically and counts
+        the calls made to it.
+        """
+        from bonding.curves.instrumentedcurve import InstrumentedCurve
+        return InstrumentedCurve(self)
+
     def plot(self, x_max: float = 10, num_points: int = 1000):
         return matplotlib_curve_plot(self, x_max=x_max, num_points=num_points)
 
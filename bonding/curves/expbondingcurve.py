@@ -1,8 +1,13 @@
 from bonding.curves.bondingcurve import BondingCurve
 import math
+import numpy as np
 import logging
 
 
+def _overflow(scales: float):
+    return ValueError(f"Price overflows at {scales:.6g} scales of supply.")
+
+
 class ExpBondingCurve(BondingCurve):
     """
     Implements an exponential bonding curve defined by:
@@ -22,6 +27,8 @@ class ExpBondingCurve(BondingCurve):
          ∫[0 to x] f(u) du = (scale / (e - 1)) * (e^(x / scale) - 1) + ((e - 2) / (e - 1)) * x
     """
 
+    __slots__ = ("scale", "logger", "a", "b")
+
     def __init__(self, scale: float = 500_000):
         """
         Initialize the ExpBondingCurve.
@@ -58,7 +65,10 @@ class ExpBondingCurve(BondingCurve):
         """
         if x < 0:
             raise ValueError("Supply x cannot be negative.")
-        return self.a * math.exp(x / self.scale) + self.b
+        try:
+            return self.a * math.exp(x / self.scale) + self.b
+        except OverflowError:
+            raise _overflow(x / self.scale) from None
 
     def price_integral(self, x: float) -> float:
         """
@@ -85,10 +95,165 @@ class ExpBondingCurve(BondingCurve):
         if x == 0:
             return 0.0
 
-        integral = (self.scale / (math.e - 1)) * (math.exp(x / self.scale) - 1) + \
-                   ((math.e - 2) / (math.e - 1)) * x
+        try:
+            integral = (self.scale / (math.e - 1)) * (math.exp(x / self.scale) - 1) + \
+                       ((math.e - 2) / (math.e - 1)) * x
+        except OverflowError:
+            raise _overflow(x / self.scale) from None
         return integral
 
+    def cost_to_move(self, x_start: float, x_end: float) -> float:
+        """
+        The integral of price(u) from x_start to x_end, as
+
+            scale * a * e^(x_start / scale) * expm1((x_end - x_start) / scale) + b * (x_end - x_start)
+
+        rather than the difference of two integrals, which at large supplies are huge and
+        nearly equal.
+
+        Parameters
+        ----------
+        x_start : float
+            The supply before the move (>= 0).
+        x_end : float
+            The supply after the move (>= 0).
+
+        Returns
+        -------
+        float
+            ∫[x_start to x_end] price(u) du
+        """
+        if x_start < 0 or x_end < 0:
+            raise ValueError("Supply x cannot be negative.")
+        dx = x_end - x_start
+        try:
+            cost = self.scale * self.a * math.exp(x_start / self.scale) * math.expm1(dx / self.scale) + self.b * dx
+        except OverflowError:
+            cost = math.inf
+        if cost == math.inf:
+            raise _overflow(max(x_start, x_end) / self.scale)
+        return cost
+
+    def price_array(self, x) -> np.ndarray:
+        """
+        Vectorized price(x).
+
+        Parameters
+        ----------
+        x : array_like
+            Supplies (>= 0).
+
+        Returns
+        -------
+        np.ndarray
+            The instantaneous price at each supply.
+        """
+        x = np.asarray(x, dtype=float)
+        if np.any(x < 0):
+            raise ValueError("Supply x cannot be negative.")
+        return self.a * np.exp(x / self.scale) + self.b
+
+    def price_integral_array(self, x) -> np.ndarray:
+        """
+        Vectorized price_integral(x).
+
+        Parameters
+        ----------
+        x : array_like
+            Upper limits of integration (>= 0).
+
+        Returns
+        -------
+        np.ndarray
+            ∫[0 to x] price(u) du for each element of x.
+        """
+        x = np.asarray(x, dtype=float)
+        if np.any(x < 0):
+            raise ValueError("Supply x cannot be negative.")
+        return (self.scale / (math.e - 1)) * (np.exp(x / self.scale) - 1) + \
+               ((math.e - 2) / (math.e - 1)) * x
+
+    def cost_to_move_array(self, x_start, x_end) -> np.ndarray:
+        """
+        Vectorized cost_to_move(x_start, x_end), broadcasting `x_start` against `x_end`.
+        """
+        x_start, x_end = np.asarray(x_start, dtype=float), np.asarray(x_end, dtype=float)
+        if np.any(x_start < 0) or np.any(x_end < 0):
+            raise ValueError("Supply x cannot be negative.")
+        dx = x_end - x_start
+        return self.scale * self.a * np.exp(x_start / self.scale) * np.expm1(dx / self.scale) + self.b * dx
+
+    def supply_at_price_array(self, prices) -> np.ndarray:
+        """
+        Vectorized inverse of price(x):
+
+            x = scale * log((price - b) / a)
+
+        Parameters
+        ----------
+        prices : array_like
+            Prices to locate on the curve.
+
+        Returns
+        -------
+        np.ndarray
+            The supply at each price, or nan where the price is below price(0) = 1.
+        """
+        prices = np.asarray(prices, dtype=float)
+        with np.errstate(all='ignore'):
+            return np.where(prices < 1.0, np.nan, self.scale * np.log((prices - self.b) / self.a))
+
+    def supply_after_cost(self, x_start: float, cost: float) -> float:
+        """
+        Invert cost_to_move(x_start, x_end) = cost for x_end.
+
+        With u = dx / scale the cost is scale * [a * e^(x_start / scale) * (e^u - 1) + b * u],
+        which is bounded below by both its tangent at u=0 and its exponential part. So
+
+            dx <= min(cost / price(x_start), scale * log(1 + cost / (scale * a * e^(x_start / scale))))
+
+        and Newton's method started there converges monotonically in a handful of steps.
+
+        Parameters
+        ----------
+        x_start : float
+            The current supply (>= 0).
+        cost : float
+            Currency paid into (positive) or taken out of (negative) the curve.
+
+        Returns
+        -------
+        float
+            The supply x_end after the move.
+        """
+        dx = cost / self.price(x_start)
+        if cost > 0:
+            dx = min(dx, self.scale * math.log1p(cost / (self.scale * self.a * math.exp(x_start / self.scale))))
+        return self._newton_supply_after_cost(x_start, cost, dx)
+
+    def supply_after_cost_array(self, x_start, cost) -> np.ndarray:
+        """
+        Vectorized supply_after_cost(x_start, cost), with the same starting point.
+
+        Parameters
+        ----------
+        x_start : array_like
+            Current supplies (>= 0), broadcast against `cost`.
+        cost : array_like
+            Currency paid into (positive) or taken out of (negative) the curve.
+
+        Returns
+        -------
+        np.ndarray
+            The supplies x_end after each move.
+        """
+        x_start, cost = np.asarray(x_start, dtype=float), np.asarray(cost, dtype=float)
+        dx = cost / self.price_array(x_start)
+        with np.errstate(all='ignore'):
+            dx_bound = self.scale * np.log1p(cost / (self.scale * self.a * np.exp(x_start / self.scale)))
+        dx = np.where(cost > 0, np.minimum(dx, dx_bound), dx)
+        return self._newton_supply_after_cost_array(x_start, cost, dx)
+
     def __repr__(self) -> str:
         return (f"<ExpBondingCurve(scale={self.scale}, "
                 f"a={self.a:.6f}, b={self.b:.6f})>")
@@ -1,5 +1,6 @@
 from bonding.curves.bondingcurve import BondingCurve
 import math
+import numpy as np
 import logging
 
 
@@ -26,6 +27,8 @@ class GrowthBondingCurve(BondingCurve):
 
     """
 
+    __slots__ = ("a", "c", "scale", "logger", "p")
+
     def __init__(self,  scale=100.0, a=0.25, c=2.0):
         """
         Parameters
@@ -85,6 +88,91 @@ class GrowthBondingCurve(BondingCurve):
         # If p == -1, the integral of u^-1 is ln(u). We'll assume a>0 => p>0 => no special case needed.
         return x + (x ** (self.p + 1)) / (self.scale ** self.p * (self.p + 1))
 
+    def cost_to_move(self, x_start: float, x_end: float) -> float:
+        """
+        ∫[x_start..x_end] price(u) du, without differencing two integrals that at large
+        supplies are huge and nearly equal:
+
+            x_end^(p+1) - x_start^(p+1) = x_start^(p+1) * expm1((p+1) * log1p(dx / x_start))
+
+        with dx = x_end - x_start.
+        """
+        if x_start < 0 or x_end < 0:
+            raise ValueError("Supply x cannot be negative.")
+        if x_start == 0 or x_end == 0:
+            return self.price_integral(x_end) - self.price_integral(x_start)
+        dx = x_end - x_start
+        power_term = x_start * (x_start / self.scale) ** self.p / (self.p + 1)
+        return dx + power_term * math.expm1((self.p + 1) * math.log1p(dx / x_start))
+
+    def price_array(self, x) -> np.ndarray:
+        """
+        Vectorized price(x).
+        """
+        x = np.asarray(x, dtype=float)
+        if np.any(x < 0):
+            raise ValueError("Supply x cannot be negative.")
+        return 1.0 + (x ** self.p) / (self.scale ** self.p)
+
+    def price_integral_array(self, x) -> np.ndarray:
+        """
+        Vectorized price_integral(x).
+        """
+        x = np.asarray(x, dtype=float)
+        if np.any(x < 0):
+            raise ValueError("Supply x cannot be negative.")
+        return x + (x ** (self.p + 1)) / (self.scale ** self.p * (self.p + 1))
+
+    def cost_to_move_array(self, x_start, x_end) -> np.ndarray:
+        """
+        Vectorized cost_to_move(x_start, x_end), broadcasting `x_start` against `x_end`.
+        """
+        x_start, x_end = np.asarray(x_start, dtype=float), np.asarray(x_end, dtype=float)
+        if np.any(x_start < 0) or np.any(x_end < 0):
+            raise ValueError("Supply x cannot be negative.")
+        dx = x_end - x_start
+        with np.errstate(all='ignore'):
+            power_term = x_start * (x_start / self.scale) ** self.p / (self.p + 1)
+            cost = dx + power_term * np.expm1((self.p + 1) * np.log1p(dx / x_start))
+        endpoint = (x_start == 0) | (x_end == 0)
+        return np.where(endpoint, self.price_integral_array(x_end) - self.price_integral_array(x_start), cost)
+
+    def supply_at_price_array(self, prices) -> np.ndarray:
+        """
+        Vectorized inverse of price(x):  x = scale * (price - 1)^(1/p).
+        """
+        prices = np.asarray(prices, dtype=float)
+        with np.errstate(invalid='ignore'):
+            return np.where(prices < 1.0, np.nan, self.scale * (prices - 1.0) ** (1 / self.p))
+
+    def supply_after_cost(self, x_start: float, cost: float) -> float:
+        """
+        Invert cost_to_move(x_start, x_end) = cost for x_end.
+
+        Since price_integral(x) >= x^(p+1) / [scale^p * (p+1)], a buy can reach at most
+
+            x_end <= ( scale^p * (p+1) * (price_integral(x_start) + cost) )^(1/(p+1))
+
+        Newton's method is started from the smaller of that bound and the tangent estimate,
+        both of which overestimate the move, and converges monotonically.
+        """
+        dx = cost / self.price(x_start)
+        if cost > 0:
+            x_bound = (self.scale ** self.p * (self.p + 1) * (self.price_integral(x_start) + cost)) ** (1 / (self.p + 1))
+            dx = min(dx, x_bound - x_start)
+        return self._newton_supply_after_cost(x_start, cost, dx)
+
+    def supply_after_cost_array(self, x_start, cost) -> np.ndarray:
+        """
+        Vectorized supply_after_cost(x_start, cost), with the same starting point.
+        """
+        x_start, cost = np.asarray(x_start, dtype=float), np.asarray(cost, dtype=float)
+        dx = cost / self.price_array(x_start)
+        with np.errstate(all='ignore'):
+            x_bound = (self.scale ** self.p * (self.p + 1) * (self.price_integral_array(x_start) + cost)) ** (1 / (self.p + 1))
+        dx = np.where(cost > 0, np.minimum(dx, x_bound - x_start), dx)
+        return self._newton_supply_after_cost_array(x_start, cost, dx)
+
     def __repr__(self):
         return (f"<GrowthBondingCurve(a={self.a}, c={self.c}, scale={self.scale}, "
                 f"p={self.p:.4f})>")
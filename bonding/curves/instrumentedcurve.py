@@ -0,0 +1,82 @@
+from bonding.curves.bondingcurve import BondingCurve
+
+# The curve methods whose calls are counted
+COUNTED_METHODS = ("price", "price_integral", "cost_to_move", "supply_after_cost",
+                   "price_array", "price_integral_array", "cost_to_move_array", "supply_after_cost_array")
+
+
+class InstrumentedCurve(BondingCurve):
+    """
+    Wraps a curve, counting the calls made to it. Every method is passed through, so the
+    wrapper prices exactly as the wrapped curve does. Calls the wrapped curve makes to
+    itself (e.g. cost_to_move calling price_integral) are not counted.
+
+    Get one from BondingCurve.instrumented().
+
+    Attributes
+    ----------
+    curve : BondingCurve
+        The wrapped curve.
+    calls : dict
+        Method name -> number of calls, for each of COUNTED_METHODS.
+    """
+
+    __slots__ = ("curve", "calls")
+
+    def __init__(self, curve):
+        self.curve = curve
+        self.calls = dict.fromkeys(COUNTED_METHODS, 0)
+
+    def get_scale(self) -> float:
+        return self.curve.get_scale()
+
+    def price(self, x: float) -> float:
+        self.calls["price"] += 1
+        return self.curve.price(x)
+
+    def price_integral(self, x: float) -> float:
+        self.calls["price_integral"] += 1
+        return self.curve.price_integral(x)
+
+    def cost_to_move(self, x_start: float, x_end: float) -> float:
+        self.calls["cost_to_move"] += 1
+        return self.curve.cost_to_move(x_start, x_end)
+
+    def cost_is_integral_difference(self) -> bool:
+        return self.curve.cost_is_integral_difference()
+
+    def supply_after_cost(self, x_start: float, cost: float) -> float:
+        self.calls["supply_after_cost"] += 1
+        return self.curve.supply_after_cost(x_start, cost)
+
+    def price_array(self, x):
+        self.calls["price_array"] += 1
+        return self.curve.price_array(x)
+
+    def price_integral_array(self, x):
+        self.calls["price_integral_array"] += 1
+        return self.curve.price_integral_array(x)
+
+    def cost_to_move_array(self, x_start, x_end):
+        self.calls["cost_to_move_array"] += 1
+        return self.curve.cost_to_move_array(x_start, x_end)
+
+    def supply_after_cost_array(self, x_start, cost):
+        self.calls["supply_after_cost_array"] += 1
+        return self.curve.supply_after_cost_array(x_start, cost)
+
+    def supply_at_price_array(self, prices):
+        return self.curve.supply_at_price_array(prices)
+
+    def instrumented(self):
+        return self
+
+    def __getattr__(self, name):
+        # Curve parameters (scale, a, c, ...) read through to the wrapped curve
+        if name in InstrumentedCurve.__slots__:
+            # Not yet set, as while unpickling
+            raise AttributeError(name)
+        return getattr(self.curve, name)
+
+    def __repr__(self) -> str:
+        return f"InstrumentedCurve({self.curve!r})"
@@ -1,12 +1,18 @@
 from bonding.curves.bondingcurve import BondingCurve
+import math
+import numpy as np
 
 
 class LinearBondingCurve(BondingCurve):
     """
     price(x) = m*x + b
     price_integral(x) = ∫(m*u + b) du = m/2 * x^2 + b*x
+    cost_to_move(x0, x1) = (x1 - x0) * price((x0 + x1) / 2), without differencing the integrals
+    supply_after_cost(x, c) = x + dx, where m/2 * dx^2 + price(x) * dx = c
     """
 
+    __slots__ = ("m", "b")
+
     def __init__(self, scale: float=500_000):
         self.m = 1/scale
         self.b = 1
@@ -20,6 +26,40 @@ class LinearBondingCurve(BondingCurve):
     def price_integral(self, x: float) -> float:
         return (self.m / 2.0) * (x ** 2) + self.b * x
 
+    def cost_to_move(self, x_start: float, x_end: float) -> float:
+        return (x_end - x_start) * (self.m * 0.5 * (x_start + x_end) + self.b)
+
+    def price_array(self, x) -> np.ndarray:
+        return self.m * np.asarray(x, dtype=float) + self.b
+
+    def price_integral_array(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        return (self.m / 2.0) * (x ** 2) + self.b * x
+
+    def cost_to_move_array(self, x_start, x_end) -> np.ndarray:
+        x_start, x_end = np.asarray(x_start, dtype=float), np.asarray(x_end, dtype=float)
+        return (x_end - x_start) * (self.m * 0.5 * (x_start + x_end) + self.b)
+
+    def supply_at_price_array(self, prices) -> np.ndarray:
+        prices = np.asarray(prices, dtype=float)
+        return np.where(prices < self.b, np.nan, (prices - self.b) / self.m)
+
+    def supply_after_cost(self, x_start: float, cost: float) -> float:
+        if cost < -self.price_integral(x_start):
+            raise ValueError("Cannot sell below zero supply.")
+        p0 = self.price(x_start)
+        # Root of m/2 * dx^2 + p0 * dx - cost = 0, in the form that avoids cancellation
+        dx = 2.0 * cost / (p0 + math.sqrt(max(p0 ** 2 + 2.0 * self.m * cost, 0.0)))
+        return max(x_start + dx, 0.0)
+
+    def supply_after_cost_array(self, x_start, cost) -> np.ndarray:
+        x_start, cost = np.asarray(x_start, dtype=float), np.asarray(cost, dtype=float)
+        if np.any(cost < -self.price_integral_array(x_start)):
+            raise ValueError("Cannot sell below zero supply.")
+        p0 = self.price_array(x_start)
+        dx = 2.0 * cost / (p0 + np.sqrt(np.maximum(p0 ** 2 + 2.0 * self.m * cost, 0.0)))
+        return np.maximum(x_start + dx, 0.0)
+
 
 if __name__=='__main__':
     LinearBondingCurve(scale=10).plot()
\ No newline at end of file
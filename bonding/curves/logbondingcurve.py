@@ -1,5 +1,6 @@
 from bonding.curves.bondingcurve import BondingCurve
 import math
+import numpy as np
 import logging
 
 
@@ -24,6 +25,8 @@ class LogBondingCurve(BondingCurve):
          (e + (e^2 - e) * (x / scale)) * (log(e + (e^2 - e) * (x / scale)) - 1) / ((e^2 - e) / scale)
     """
 
+    __slots__ = ("scale", "logger")
+
     def __init__(self, scale: float = 500_000):
         """
         Initialize the LogBondingCurve.
@@ -85,6 +88,153 @@ class LogBondingCurve(BondingCurve):
         denominator = (math.e ** 2 - math.e) / self.scale
         return numerator / denominator
 
+    def cost_to_move(self, x_start: float, x_end: float) -> float:
+        """
+        The integral of price(u) from x_start to x_end. With z = e + (e^2 - e) * (x / scale)
+        and r = (z_end - z_start) / z_start, it is
+
+            (x_end - x_start) * (log(z_start) + (1 + r) * log1p(r) / r - 1)
+
+        which avoids differencing two integrals that at large supplies are huge and nearly
+        equal. The second and third terms nearly cancel only when r is small, and then they
+        are small beside log(z_start) >= 1.
+
+        Parameters
+        ----------
+        x_start : float
+            The supply before the move (>= 0).
+        x_end : float
+            The supply after the move (>= 0).
+
+        Returns
+        -------
+        float
+            ∫[x_start to x_end] price(u) du
+        """
+        if x_start < 0 or x_end < 0:
+            raise ValueError("Supply x cannot be negative.")
+        dx = x_end - x_start
+        if dx == 0:
+            return 0.0
+        k = (math.e ** 2 - math.e) / self.scale
+        z_start = math.e + k * x_start
+        r = k * dx / z_start
+        return dx * (math.log(z_start) + (1 + r) * math.log1p(r) / r - 1)
+
+    def price_array(self, x) -> np.ndarray:
+        """
+        Vectorized price(x).
+
+        Parameters
+        ----------
+        x : array_like
+            Supplies (>= 0).
+
+        Returns
+        -------
+        np.ndarray
+            The instantaneous price at each supply.
+        """
+        x = np.asarray(x, dtype=float)
+        if np.any(x < 0):
+            raise ValueError("Supply x cannot be negative.")
+        return np.log(math.e + (math.e ** 2 - math.e) * (x / self.scale))
+
+    def price_integral_array(self, x) -> np.ndarray:
+        """
+        Vectorized price_integral(x).
+
+        Parameters
+        ----------
+        x : array_like
+            Upper limits of integration (>= 0).
+
+        Returns
+        -------
+        np.ndarray
+            ∫[0 to x] log(e + (e^2 - e) * (u / scale)) du for each element of x.
+        """
+        x = np.asarray(x, dtype=float)
+        if np.any(x < 0):
+            raise ValueError("Supply x cannot be negative.")
+        z = math.e + (math.e ** 2 - math.e) * (x / self.scale)
+        return z * (np.log(z) - 1) / ((math.e ** 2 - math.e) / self.scale)
+
+    def cost_to_move_array(self, x_start, x_end) -> np.ndarray:
+        """
+        Vectorized cost_to_move(x_start, x_end), broadcasting `x_start` against `x_end`.
+        """
+        x_start, x_end = np.asarray(x_start, dtype=float), np.asarray(x_end, dtype=float)
+        if np.any(x_start < 0) or np.any(x_end < 0):
+            raise ValueError("Supply x cannot be negative.")
+        dx = x_end - x_start
+        k = (math.e ** 2 - math.e) / self.scale
+        z_start = math.e + k * x_start
+        r = k * dx / z_start
+        with np.errstate(invalid='ignore'):
+            return np.where(dx == 0, 0.0, dx * (np.log(z_start) + (1 + r) * np.log1p(r) / r - 1))
+
+    def supply_at_price_array(self, prices) -> np.ndarray:
+        """
+        Vectorized inverse of price(x):
+
+            x = scale * (e^price - e) / (e^2 - e)
+
+        Parameters
+        ----------
+        prices : array_like
+            Prices to locate on the curve.
+
+        Returns
+        -------
+        np.ndarray
+            The supply at each price, or nan where the price is below price(0) = 1.
+        """
+        prices = np.asarray(prices, dtype=float)
+        with np.errstate(over='ignore'):
+            return np.where(prices < 1.0, np.nan, self.scale * (np.exp(prices) - math.e) / (math.e ** 2 - math.e))
+
+    def supply_after_cost(self, x_start: float, cost: float) -> float:
+        """
+        Invert cost_to_move(x_start, x_end) = cost for x_end.
+
+        Price grows only logarithmically, so the tangent estimate cost / price(x_start)
+        is already close, and since it overestimates the move (the cost is convex in x_end)
+        Newton's method started there converges monotonically.
+
+        Parameters
+        ----------
+        x_start : float
+            The current supply (>= 0).
+        cost : float
+            Currency paid into (positive) or taken out of (negative) the curve.
+
+        Returns
+        -------
+        float
+            The supply x_end after the move.
+        """
+        return self._newton_supply_after_cost(x_start, cost, cost / self.price(x_start))
+
+    def supply_after_cost_array(self, x_start, cost) -> np.ndarray:
+        """
+        Vectorized supply_after_cost(x_start, cost), with the same starting point.
+
+        Parameters
+        ----------
+        x_start : array_like
+            Current supplies (>= 0), broadcast against `cost`.
+        cost : array_like
+            Currency paid into (positive) or taken out of (negative) the curve.
+
+        Returns
+        -------
+        np.ndarray
+            The supplies x_end after each move.
+        """
+        x_start, cost = np.asarray(x_start, dtype=float), np.asarray(cost, dtype=float)
+        return self._newton_supply_after_cost_array(x_start, cost, cost / self.price_array(x_start))
+
     def __repr__(self) -> str:
         return (f"<LogBondingCurve(scale={self.scale}, "
                 f"price(x)=log(e + (e^2 - e)*(x/scale)))>")
@@ -0,0 +1,236 @@
+from bonding.curves.bondingcurve import BondingCurve
+from bisect import bisect_right
+import math
+import numpy as np
+
+# Segment kinds. Each is written in the local supply u = x - start, from its price p0 at the start:
+#   linear: price = p0 + a u                  integral = u (p0 + a u / 2)
+#   power:  price = p0 (1 + u / a)^q          integral = p0 a / (q + 1) * ((1 + u / a)^(q + 1) - 1)
+#   exp:    price = p0 e^(u / a)              integral = p0 a (e^(u / a) - 1)
+LINEAR, POWER, EXP = 0, 1, 2
+SEGMENT_KINDS = {"linear": LINEAR, "power": POWER, "exp": EXP}
+
+
+def _segment_price(kind: int, p0: float, a: float, q: float, u: float) -> float:
+    if kind == LINEAR:
+        return p0 + a * u
+    if kind == POWER:
+        return p0 * (1.0 + u / a) ** q
+    return p0 * math.exp(u / a)
+
+
+def _segment_integral(kind: int, p0: float, a: float, q: float, u: float) -> float:
+    if kind == LINEAR:
+        return u * (p0 + 0.5 * a * u)
+    if kind == POWER:
+        return p0 * a / (q + 1.0) * math.expm1((q + 1.0) * math.log1p(u / a))
+    return p0 * a * math.expm1(u / a)
+
+
+def _segment_inverse(kind: int, p0: float, a: float, q: float, cost: float) -> float:
+    # The u >= 0 with _segment_integral(u) = cost >= 0
+    if kind == LINEAR:
+        return 2.0 * cost / (p0 + math.sqrt(max(p0 * p0 + 2.0 * a * cost, 0.0)))
+    if kind == POWER:
+        return a * math.expm1(math.log1p((q + 1.0) * cost / (p0 * a)) / (q + 1.0))
+    return a * math.log1p(cost / (p0 * a))
+
+
+class PiecewiseBondingCurve(BondingCurve):
+    """
+    A curve made of consecutive segments, each linear, power-law or exponential in the
+    supply since the segment's start, for tiered sales with many tranches:
+
+        PiecewiseBondingCurve([
+            (0.0,   "linear", 1.0, 0.01),         # start, kind, start price, slope
+            (100.0, "exp",    2.5, 100.0),        # ..., start price, supply per e-fold
+            (300.0, "power",  20.0, 20.0, 0.5),   # ..., start price, scale, exponent
+        ])
+
+    with, for local supply u = x - start,
+
+        linear: price = p0 + slope * u,                  slope >= 0
+        exp:    price = p0 * e^(u / efold)
+        power:  price = p0 * (1 + u / scale)^exponent,   exponent >= 0
+
+    Prices may jump up at segment starts, but never fall, so that supply_at_price_array()
+    and everything built on it (depth ladders, say) see a non-decreasing price. The last
+    segment runs on forever.
+
+    The integral up to each segment start is precomputed, so price, price_integral and
+    cost_to_move bisect the starts and cost O(log segments). supply_after_cost inverts
+    the located segment's integral in closed form.
+    """
+
+    __slots__ = ("segments", "starts", "prefix", "_starts", "_prefix", "_params",
+                 "_kind", "_p0", "_a", "_q")
+
+    def __init__(self, segments):
+        """
+        Parameters
+        ----------
+        segments : list of tuple
+            (start, kind, p0, a) or (start, "power", p0, scale, exponent), in increasing
+            order of start, the first starting at 0. `kind` is one of "linear", "exp"
+            or "power".
+        """
+        if not segments:
+            raise ValueError("Need at least one segment.")
+        self.segments = [tuple(segment) for segment in segments]
+        starts, params = [], []
+        for segment in self.segments:
+            start, kind, p0, a = segment[:4]
+            if kind not in SEGMENT_KINDS:
+                raise ValueError(f"Unknown segment kind {kind!r}; expected one of {', '.join(SEGMENT_KINDS)}.")
+            if (kind == "power") != (len(segment) == 5) or len(segment) not in (4, 5):
+                raise ValueError(f"Segment {segment} should be (start, kind, p0, a), or "
+                                 f"(start, 'power', p0, scale, exponent) for power segments.")
+            q = float(segment[4]) if kind == "power" else 0.0
+            if p0 <= 0:
+                raise ValueError(f"Segment {segment} must start at a positive price.")
+            if kind != "linear" and a <= 0:
+                raise ValueError(f"Segment {segment} needs a positive scale.")
+            if kind == "linear" and a < 0:
+                raise ValueError(f"Segment {segment} needs a non-negative slope.")
+            if kind == "power" and q < 0:
+                raise ValueError(f"Segment {segment} needs a non-negative exponent.")
+            starts.append(float(start))
+            params.append((SEGMENT_KINDS[kind], float(p0), float(a), q))
+        if starts[0] != 0.0 or any(s1 <= s0 for s0, s1 in zip(starts, starts[1:])):
+            raise ValueError("Segment starts must begin at 0 and be strictly increasing.")
+
+        lengths = [s1 - s0 for s0, s1 in zip(starts, starts[1:])]
+        for (kind, p0, a, q), length, start, (_, p1, _, _) in zip(params, lengths, starts[1:], params[1:]):
+            # Allow for rounding in start prices meant to continue the previous segment
+            if p1 < _segment_price(kind, p0, a, q, length) * (1.0 - 1e-12):
+                raise ValueError(f"Price falls at {start}: segments may only jump up.")
+
+        prefix = [0.0]
+        for (kind, p0, a, q), length in zip(params, lengths):
+            prefix.append(prefix[-1] + _segment_integral(kind, p0, a, q, length))
+        prefix.append(math.inf)
+
+        # Python lists for the scalar methods, which are faster to index than arrays
+        self._starts = starts
+        self._prefix = prefix
+        self._params = params
+        self.starts = np.array(starts)
+        self.prefix = np.array(prefix)
+        self._kind, self._p0, self._a, self._q = (np.array(column) for column in zip(*params))
+
+    @classmethod
+    def from_tranches(cls, sizes, prices):
+        """
+        Flat-priced tranches: the first sizes[0] shares at prices[0], the next sizes[1] at
+        prices[1], and so on. The last price holds beyond the last tranche.
+        """
+        if len(sizes) != len(prices):
+            raise ValueError("Need one price per tranche.")
+        starts = np.concatenate(([0.0], np.cumsum(np.asarray(sizes, dtype=float))[:-1]))
+        return cls([(start, "linear", price, 0.0) for start, price in zip(starts.tolist(), prices)])
+
+    ###########################################################################
+    # Scalar methods
+    ###########################################################################
+    def _segment(self, x: float) -> int:
+        if x < 0:
+            raise ValueError("Supply x cannot be negative.")
+        return bisect_right(self._starts, x) - 1
+
+    def price(self, x: float) -> float:
+        i = self._segment(x)
+        return _segment_price(*self._params[i], x - self._starts[i])
+
+    def price_integral(self, x: float) -> float:
+        i = self._segment(x)
+        return self._prefix[i] + _segment_integral(*self._params[i], x - self._starts[i])
+
+    def cost_to_move(self, x_start: float, x_end: float) -> float:
+        # Within a segment, difference the local integrals rather than the cumulative ones
+        if x_end < x_start:
+            return -self.cost_to_move(x_end, x_start)
+        i, j = self._segment(x_start), self._segment(x_end)
+        local_start = _segment_integral(*self._params[i], x_start - self._starts[i])
+        local_end = _segment_integral(*self._params[j], x_end - self._starts[j])
+        if i == j:
+            return local_end - local_start
+        return (self._prefix[j] - self._prefix[i]) + local_end - local_start
+
+    def supply_after_cost(self, x_start: float, cost: float) -> float:
+        i = self._segment(x_start)
+        local_start = _segment_integral(*self._params[i], x_start - self._starts[i])
+        local = local_start + cost
+        if not 0.0 <= local <= self._prefix[i + 1] - self._prefix[i]:
+            if cost < -(self._prefix[i] + local_start):
+                raise ValueError("Cannot sell below zero supply.")
+            target = max(self._prefix[i] + local, 0.0)
+            i = bisect_right(self._prefix, target) - 1
+            local = target - self._prefix[i]
+        if local <= 0.0:
+            return self._starts[i]
+        return self._starts[i] + _segment_inverse(*self._params[i], local)
+
+    ###########################################################################
+    # Array methods
+    ###########################################################################
+    def _segments_array(self, x: np.ndarray) -> np.ndarray:
+        if np.any(x < 0):
+            raise ValueError("Supply x cannot be negative.")
+        return np.searchsorted(self.starts, x, side="right") - 1
+
+    def _select(self, i, linear, power, exp) -> np.ndarray:
+        kind = self._kind[i]
+        return np.where(kind == LINEAR, linear, np.where(kind == POWER, power, exp))
+
+    def price_array(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        i = self._segments_array(x)
+        u, p0, a, q = x - self.starts[i], self._p0[i], self._a[i], self._q[i]
+        with np.errstate(all="ignore"):
+            return self._select(i, p0 + a * u, p0 * (1.0 + u / a) ** q, p0 * np.exp(u / a))
+
+    def _integral_array(self, i, u) -> np.ndarray:
+        p0, a, q = self._p0[i], self._a[i], self._q[i]
+        with np.errstate(all="ignore"):
+            return self._select(i, u * (p0 + 0.5 * a * u),
+                                p0 * a / (q + 1.0) * np.expm1((q + 1.0) * np.log1p(u / a)),
+                                p0 * a * np.expm1(u / a))
+
+    def price_integral_array(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        i = self._segments_array(x)
+        return self.prefix[i] + self._integral_array(i, x - self.starts[i])
+
+    def cost_to_move_array(self, x_start, x_end) -> np.ndarray:
+        # cost_to_move(), element by element: local integrals within a segment
+        x_start, x_end = np.broadcast_arrays(np.asarray(x_start, dtype=float), np.asarray(x_end, dtype=float))
+        lo, hi = np.minimum(x_start, x_end), np.maximum(x_start, x_end)
+        i, j = self._segments_array(lo), self._segments_array(hi)
+        cost = (self.prefix[j] - self.prefix[i]) + self._integral_array(j, hi - self.starts[j]) - \
+            self._integral_array(i, lo - self.starts[i])
+        return np.where(x_end < x_start, -cost, cost)
+
+    def supply_after_cost_array(self, x_start, cost) -> np.ndarray:
+        x_start, cost = np.broadcast_arrays(np.asarray(x_start, dtype=float), np.asarray(cost, dtype=float))
+        i = self._segments_array(x_start)
+        integral = self.prefix[i] + self._integral_array(i, x_start - self.starts[i])
+        if np.any(cost < -integral):
+            raise ValueError("Cannot sell below zero supply.")
+        target = np.maximum(integral + cost, 0.0)
+        j = np.searchsorted(self.prefix, target, side="right") - 1
+        local = np.maximum(target - self.prefix[j], 0.0)
+        p0, a, q = self._p0[j], self._a[j], self._q[j]
+        with np.errstate(all="ignore"):
+            u = self._select(j, 2.0 * local / (p0 + np.sqrt(np.maximum(p0 * p0 + 2.0 * a * local, 0.0))),
+                             a * np.expm1(np.log1p((q + 1.0) * local / (p0 * a)) / (q + 1.0)),
+                             a * np.log1p(local / (p0 * a)))
+        return np.where(cost == 0, x_start, self.starts[j] + u)
+
+    def __repr__(self) -> str:
+        return f"PiecewiseBondingCurve(segments={len(self.segments)})"
+
+
+if __name__ == "__main__":
+    curve = PiecewiseBondingCurve([(0.0, "linear", 1.0, 0.01), (100.0, "exp", 2.5, 100.0),
+                                   (300.0, "power", 20.0, 20.0, 0.5)])
+    curve.plot(x_max=400)
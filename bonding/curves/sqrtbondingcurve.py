@@ -1,5 +1,6 @@
 from bonding.curves.bondingcurve import BondingCurve
 import math
+import numpy as np
 
 
 class SqrtBondingCurve(BondingCurve):
@@ -8,8 +9,14 @@ class SqrtBondingCurve(BondingCurve):
 
     price(x) = sqrt(1 + (x/scale)^2)
     price_integral(x) = 0.5 * [ x * sqrt(1 + (x/scale)^2 ) + scale * asinh(x / scale) ]
+    cost_to_move(x0, x1) without differencing the integrals, from the identities (y = x/scale, q = price)
+        x1 q1 - x0 q0 = (x1 - x0) q1 + x0 (y1^2 - y0^2) / (q0 + q1)
+        asinh(y1) - asinh(y0) = asinh((y1^2 - y0^2) / (y1 q0 + y0 q1))
+    supply_after_cost(x, c) by Newton from an upper bound, using price_integral(x) >= x^2 / (2 scale)
     """
 
+    __slots__ = ("scale",)
+
     def __init__(self, scale: float = 500_000.0):
         self.scale = float(scale)
 
@@ -23,6 +30,53 @@ class SqrtBondingCurve(BondingCurve):
                 + self.scale * math.asinh(x_prime)
         )
 
+    def cost_to_move(self, x_start: float, x_end: float) -> float:
+        if x_start == x_end:
+            return 0.0
+        y0, y1 = x_start / self.scale, x_end / self.scale
+        q0, q1 = math.sqrt(1.0 + y0 ** 2), math.sqrt(1.0 + y1 ** 2)
+        dx = x_end - x_start
+        dy2 = (dx / self.scale) * (y0 + y1)  # y1^2 - y0^2
+        return 0.5 * (dx * q1 + x_start * dy2 / (q0 + q1) + self.scale * math.asinh(dy2 / (y1 * q0 + y0 * q1)))
+
+    def price_array(self, x) -> np.ndarray:
+        return np.sqrt(1.0 + (np.asarray(x, dtype=float) / self.scale) ** 2)
+
+    def price_integral_array(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        x_prime = x / self.scale
+        return 0.5 * (x * np.sqrt(1.0 + x_prime ** 2) + self.scale * np.arcsinh(x_prime))
+
+    def cost_to_move_array(self, x_start, x_end) -> np.ndarray:
+        x_start, x_end = np.asarray(x_start, dtype=float), np.asarray(x_end, dtype=float)
+        y0, y1 = x_start / self.scale, x_end / self.scale
+        q0, q1 = np.sqrt(1.0 + y0 ** 2), np.sqrt(1.0 + y1 ** 2)
+        dx = x_end - x_start
+        dy2 = (dx / self.scale) * (y0 + y1)
+        with np.errstate(invalid='ignore'):
+            cost = 0.5 * (dx * q1 + x_start * dy2 / (q0 + q1) + self.scale * np.arcsinh(dy2 / (y1 * q0 + y0 * q1)))
+        return np.where(dx == 0, 0.0, cost)
+
+    def supply_at_price_array(self, prices) -> np.ndarray:
+        prices = np.asarray(prices, dtype=float)
+        with np.errstate(invalid='ignore'):
+            return np.where(prices < 1.0, np.nan, self.scale * np.sqrt(prices ** 2 - 1.0))
+
+    def supply_after_cost(self, x_start: float, cost: float) -> float:
+        dx = cost / self.price(x_start)
+        if cost > 0:
+            x_bound = math.sqrt(2.0 * self.scale * (self.price_integral(x_start) + cost))
+            dx = min(dx, x_bound - x_start)
+        return self._newton_supply_after_cost(x_start, cost, dx)
+
+    def supply_after_cost_array(self, x_start, cost) -> np.ndarray:
+        x_start, cost = np.asarray(x_start, dtype=float), np.asarray(cost, dtype=float)
+        dx = cost / self.price_array(x_start)
+        with np.errstate(all='ignore'):
+            x_bound = np.sqrt(2.0 * self.scale * (self.price_integral_array(x_start) + cost))
+        dx = np.where(cost > 0, np.minimum(dx, x_bound - x_start), dx)
+        return self._newton_supply_after_cost_array(x_start, cost, dx)
+
 
 if __name__ == "__main__":
     curve = SqrtBondingCurve(scale=10)
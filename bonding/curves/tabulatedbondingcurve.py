@@ -0,0 +1,336 @@
+from bonding.curves.bondingcurve import BondingCurve
+from bisect import bisect_right
+import os
+import numpy as np
+
+# Gauss-Legendre nodes and weights on [0, 1], used to check each segment's integral while refining
+_GL_NODES, _GL_WEIGHTS = np.polynomial.legendre.leggauss(5)
+_GL_NODES = 0.5 * (_GL_NODES + 1.0)
+_GL_WEIGHTS = 0.5 * _GL_WEIGHTS
+
+_EPS = np.finfo(float).eps
+
+
+def _monotone_slopes(x: np.ndarray, p: np.ndarray) -> np.ndarray:
+    """
+    Slopes of the quartic through each knot and its two neighbours either side (or the five
+    knots nearest an end), clipped to [0, 3 * the adjacent secant slopes] (Hyman's filter)
+    so that the cubic Hermite interpolant of non-decreasing data is non-decreasing.
+
+    Fourth-order slopes keep the interpolant fourth order on uneven grids too, where the
+    usual three-point slopes lose the cancellation they enjoy on even ones.
+    """
+    n = len(x)
+    width = min(5, n)
+    start = np.clip(np.arange(n) - width // 2, 0, n - width)
+    window = start[:, None] + np.arange(width)
+    xs, ps = x[window], p[window]
+    own = (np.arange(n) - start)[:, None] == np.arange(width)
+    gaps = np.where(own, 1.0, x[:, None] - xs)   # x_k - x_m, with 1 in place of m = k
+
+    # Derivative at x_k of the Lagrange basis polynomial of each window point
+    weights = np.empty_like(xs)
+    for j in range(width):
+        others = np.arange(width) != j
+        numerator = np.prod(np.where(own[:, others], 1.0, gaps[:, others]), axis=1)
+        denominator = np.prod(xs[:, j, None] - xs[:, others], axis=1)
+        weights[:, j] = np.where(own[:, j], np.sum(np.where(own, 0.0, 1.0 / gaps), axis=1),
+                                 numerator / denominator)
+    d = np.sum(weights * ps, axis=1)
+
+    delta = np.diff(p) / np.diff(x)
+    bound = np.empty_like(p)
+    bound[0], bound[-1] = delta[0], delta[-1]
+    bound[1:-1] = np.minimum(delta[:-1], delta[1:])
+    return np.clip(d, 0.0, 3.0 * bound)
+
+
+class TabulatedBondingCurve(BondingCurve):
+    """
+    A curve for any positive, non-decreasing price schedule on [0, x_max], given either as
+    a price(x) callable or as sampled points, with no closed-form integral needed.
+
+    The price is a monotone cubic Hermite interpolant of the tabulated prices, and
+    price_integral is its exact integral:
+
+        price(x)          = a_i + b_i t + c_i t^2 + e_i t^3,       t = (x - x_i) / h_i on [x_i, x_i+1]
+        price_integral(x) = C_i + h_i (a_i t + b_i t^2 / 2 + c_i t^3 / 3 + e_i t^4 / 4)
+
+    where C_i is the precomputed integral up to knot x_i. Lookups bisect the knots, so cost
+    O(log n). supply_after_cost inverts the same polynomial by Newton's method within one
+    segment, so value trades are exact and never bisect.
+
+    Build with from_price() (adaptive grid with error control, optionally cached to disk)
+    or from_points(). Supplies beyond x_max raise ValueError.
+    """
+
+    __slots__ = ("knots", "prices", "slopes", "cumulative", "x_max",
+                 "_knot_list", "_cumulative_list", "_coefficients", "_h", "_a", "_b", "_c", "_e")
+
+    def __init__(self, x, prices, slopes=None):
+        """
+        Parameters
+        ----------
+        x : array_like
+            Knots, strictly increasing from 0.
+        prices : array_like
+            Price at each knot: positive and non-decreasing.
+        slopes : array_like, optional
+            Price derivative at each knot. Defaults to five-point slopes, limited to
+            keep the price non-decreasing.
+        """
+        x = np.array(x, dtype=float).ravel()
+        prices = np.array(prices, dtype=float).ravel()
+        if len(x) < 2 or len(prices) != len(x):
+            raise ValueError("Need at least two knots, with one price per knot.")
+        if x[0] != 0.0 or np.any(np.diff(x) <= 0):
+            raise ValueError("Knots must start at 0 and be strictly increasing.")
+        if np.any(prices <= 0) or np.any(np.diff(prices) < 0):
+            raise ValueError("Prices must be positive and non-decreasing.")
+
+        self.knots = x
+        self.prices = prices
+        self.slopes = _monotone_slopes(x, prices) if slopes is None else np.array(slopes, dtype=float).ravel()
+        self.x_max = float(x[-1])
+
+        h = np.diff(x)
+        self._h = h
+        self._a = prices[:-1]
+        self._b = h * self.slopes[:-1]
+        self._c = 3.0 * np.diff(prices) - 2.0 * h * self.slopes[:-1] - h * self.slopes[1:]
+        self._e = -2.0 * np.diff(prices) + h * self.slopes[:-1] + h * self.slopes[1:]
+        segment_integrals = h * (self._a + self._b / 2 + self._c / 3 + self._e / 4)
+        self.cumulative = np.concatenate(([0.0], np.cumsum(segment_integrals)))
+
+        # Python lists for the scalar methods, which are faster to index than arrays
+        self._knot_list = x.tolist()
+        self._cumulative_list = self.cumulative.tolist()
+        self._coefficients = list(zip(h.tolist(), self._a.tolist(), self._b.tolist(),
+                                      self._c.tolist(), self._e.tolist()))
+
+    ###########################################################################
+    # Construction
+    ###########################################################################
+    @classmethod
+    def from_points(cls, x, prices):
+        """
+        A curve through sampled (x, price) points, which must start at x = 0.
+        """
+        return cls(x, prices)
+
+    @classmethod
+    def from_price(cls, price, x_max: float, rtol: float = 1e-10, initial_points: int = 17,
+                   max_points: int = 1_000_000, cache_path: str = None):
+        """
+        Tabulate a price(x) callable on [0, x_max].
+
+        Starting from `initial_points` evenly spaced knots, every segment whose integral
+        (against 5-point Gauss-Legendre on `price`) or midpoint price is out by more than
+        `rtol`, relatively, is split in two, until none are.
+
+        If `cache_path` names an existing file saved with the same x_max and rtol, the
+        table is loaded from it instead, and otherwise it is saved there after building.
+        The cache cannot tell whether `price` itself has changed.
+        """
+        if cache_path is not None and os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                if float(cached["x_max"]) == float(x_max) and float(cached["rtol"]) == float(rtol):
+                    return cls(cached["knots"], cached["prices"], cached["slopes"])
+
+        def evaluate(xs):
+            return np.fromiter((price(xi) for xi in xs.tolist()), dtype=float, count=len(xs))
+
+        x = np.linspace(0.0, float(x_max), initial_points)
+        p = evaluate(x)
+        error = np.full(len(x) - 1, np.inf)  # Each segment's error relative to rtol
+        dirty = np.ones(len(x) - 1, dtype=bool)
+        while True:
+            # Only segments whose end slopes moved since the last pass need checking again
+            curve = cls(x, p)
+            segments = np.flatnonzero(dirty)
+            h = curve._h[segments]
+            nodes = x[segments, None] + h[:, None] * _GL_NODES
+            exact = h * (evaluate(nodes.ravel()).reshape(nodes.shape) @ _GL_WEIGHTS)
+            tabulated = np.diff(curve.cumulative)[segments]
+            mid = x[segments] + 0.5 * h
+            p_mid = evaluate(mid)
+            error[segments] = np.maximum(np.abs(tabulated - exact) / np.abs(exact),
+                                         np.abs(curve.price_array(mid) - p_mid) / np.abs(p_mid)) / rtol
+            bad = error > 1.0
+            if not np.any(bad):
+                break
+
+            # Neighbours within a factor of two of rtol are split too. Otherwise the coarser
+            # segment beside each split one tips over rtol in turn, and the refinement creeps
+            # along one segment per pass.
+            beside_bad = np.zeros_like(bad)
+            beside_bad[1:] |= bad[:-1]
+            beside_bad[:-1] |= bad[1:]
+            split = bad | (beside_bad & (error > 0.5))
+            n_split = np.count_nonzero(split)
+            if len(x) + n_split > max_points:
+                raise RuntimeError(f"Tabulating the price to rtol={rtol} needs more than {max_points} points.")
+            mid = x[:-1][split] + 0.5 * curve._h[split]
+            order = np.argsort(np.concatenate((x, mid)), kind="stable")
+            x = np.concatenate((x, mid))[order]
+            p = np.concatenate((p, evaluate(mid)))[order]
+            error = np.repeat(error, np.where(split, 2, 1))
+
+            # New knots change the slopes at their neighbours, and so both segments beside those
+            changed = np.concatenate((np.zeros(len(x) - n_split, dtype=bool), np.ones(n_split, dtype=bool)))[order]
+            changed[1:] |= changed[:-1].copy()
+            changed[:-1] |= changed[1:].copy()
+            dirty = changed[:-1] | changed[1:]
+
+        if cache_path is not None:
+            curve.save(cache_path, rtol=rtol)
+        return curve
+
+    def save(self, path: str, rtol: float = float("nan")):
+        """
+        Save the table, as read by from_price(cache_path=...) or load().
+        """
+        with open(path, "wb") as f:
+            np.savez(f, knots=self.knots, prices=self.prices, slopes=self.slopes, x_max=self.x_max, rtol=rtol)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as cached:
+            return cls(cached["knots"], cached["prices"], cached["slopes"])
+
+    ###########################################################################
+    # Scalar methods
+    ###########################################################################
+    def _segment(self, x: float) -> int:
+        if not 0.0 <= x <= self.x_max:
+            raise ValueError(f"Supply {x} is outside the tabulated range [0, {self.x_max}].")
+        return min(bisect_right(self._knot_list, x) - 1, len(self._coefficients) - 1)
+
+    def price(self, x: float) -> float:
+        i = self._segment(x)
+        h, a, b, c, e = self._coefficients[i]
+        t = (x - self._knot_list[i]) / h
+        return a + t * (b + t * (c + t * e))
+
+    def _partial_integral(self, i: int, t: float) -> float:
+        # Integral over segment i from its left knot to fraction t of the way along
+        h, a, b, c, e = self._coefficients[i]
+        return h * t * (a + t * (b / 2 + t * (c / 3 + t * e / 4)))
+
+    def price_integral(self, x: float) -> float:
+        i = self._segment(x)
+        return self._cumulative_list[i] + self._partial_integral(i, (x - self._knot_list[i]) / self._coefficients[i][0])
+
+    def cost_to_move(self, x_start: float, x_end: float) -> float:
+        # Within a segment, difference the local integrals rather than the cumulative ones
+        if x_end < x_start:
+            return -self.cost_to_move(x_end, x_start)
+        i, j = self._segment(x_start), self._segment(x_end)
+        t_start = (x_start - self._knot_list[i]) / self._coefficients[i][0]
+        t_end = (x_end - self._knot_list[j]) / self._coefficients[j][0]
+        if i == j:
+            return self._partial_integral(i, t_end) - self._partial_integral(i, t_start)
+        return (self._cumulative_list[i + 1] - self._cumulative_list[i] - self._partial_integral(i, t_start)) + \
+            (self._cumulative_list[j] - self._cumulative_list[i + 1]) + self._partial_integral(j, t_end)
+
+    def _solve_in_segment(self, i: int, target: float) -> float:
+        # The x in segment i with _partial_integral(i, t) = target, by Newton from the linear guess
+        h, a, b, c, e = self._coefficients[i]
+        total = self._cumulative_list[i + 1] - self._cumulative_list[i]
+        t = min(max(target / total, 0.0), 1.0) if total > 0 else 0.0
+        for _ in range(50):
+            slope = h * (a + t * (b + t * (c + t * e)))
+            step = (self._partial_integral(i, t) - target) / slope
+            t_next = min(max(t - step, 0.0), 1.0)
+            if abs(t_next - t) <= 4 * _EPS * max(t, _EPS):
+                t = t_next
+                break
+            t = t_next
+        return self._knot_list[i] + h * t
+
+    def supply_after_cost(self, x_start: float, cost: float) -> float:
+        i = self._segment(x_start)
+        local = self._partial_integral(i, (x_start - self._knot_list[i]) / self._coefficients[i][0]) + cost
+        if 0.0 <= local <= self._cumulative_list[i + 1] - self._cumulative_list[i]:
+            return self._solve_in_segment(i, local)
+        target = self._cumulative_list[i] + local
+        if target < 0.0:
+            raise ValueError("Cannot sell below zero supply.")
+        if target > self._cumulative_list[-1]:
+            raise ValueError(f"Cost would take the supply beyond the tabulated range [0, {self.x_max}].")
+        j = min(bisect_right(self._cumulative_list, target) - 1, len(self._coefficients) - 1)
+        return self._solve_in_segment(j, target - self._cumulative_list[j])
+
+    ###########################################################################
+    # Array methods
+    ###########################################################################
+    def _segments_array(self, x: np.ndarray) -> np.ndarray:
+        if np.any((x < 0.0) | (x > self.x_max)):
+            raise ValueError(f"Supply outside the tabulated range [0, {self.x_max}].")
+        return np.minimum(np.searchsorted(self.knots, x, side="right") - 1, len(self._h) - 1)
+
+    def price_array(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        i = self._segments_array(x)
+        t = (x - self.knots[i]) / self._h[i]
+        return self._a[i] + t * (self._b[i] + t * (self._c[i] + t * self._e[i]))
+
+    def _partial_integral_array(self, i, t) -> np.ndarray:
+        return self._h[i] * t * (self._a[i] + t * (self._b[i] / 2 + t * (self._c[i] / 3 + t * self._e[i] / 4)))
+
+    def price_integral_array(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        i = self._segments_array(x)
+        return self.cumulative[i] + self._partial_integral_array(i, (x - self.knots[i]) / self._h[i])
+
+    def cost_to_move_array(self, x_start, x_end) -> np.ndarray:
+        # cost_to_move(), element by element: local integrals within a segment
+        x_start, x_end = np.broadcast_arrays(np.asarray(x_start, dtype=float), np.asarray(x_end, dtype=float))
+        lo, hi = np.minimum(x_start, x_end), np.maximum(x_start, x_end)
+        i, j = self._segments_array(lo), self._segments_array(hi)
+        local_start = self._partial_integral_array(i, (lo - self.knots[i]) / self._h[i])
+        local_end = self._partial_integral_array(j, (hi - self.knots[j]) / self._h[j])
+        across = (self.cumulative[i + 1] - self.cumulative[i] - local_start) + \
+            (self.cumulative[j] - self.cumulative[i + 1]) + local_end
+        cost = np.where(i == j, local_end - local_start, across)
+        return np.where(x_end < x_start, -cost, cost)
+
+    def supply_after_cost_array(self, x_start, cost) -> np.ndarray:
+        x_start, cost = np.broadcast_arrays(np.asarray(x_start, dtype=float), np.asarray(cost, dtype=float))
+        target = self.price_integral_array(x_start) + cost
+        if np.any(target < 0.0):
+            raise ValueError("Cannot sell below zero supply.")
+        if np.any(target > self.cumulative[-1]):
+            raise ValueError(f"Cost would take the supply beyond the tabulated range [0, {self.x_max}].")
+        j = np.minimum(np.searchsorted(self.cumulative, target, side="right") - 1, len(self._h) - 1)
+        local = target - self.cumulative[j]
+        total = self.cumulative[j + 1] - self.cumulative[j]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.clip(np.where(total > 0, local / total, 0.0), 0.0, 1.0)
+        for _ in range(50):
+            slope = self._h[j] * (self._a[j] + t * (self._b[j] + t * (self._c[j] + t * self._e[j])))
+            t_next = np.clip(t - (self._partial_integral_array(j, t) - local) / slope, 0.0, 1.0)
+            done = np.all(np.abs(t_next - t) <= 4 * _EPS * np.maximum(t, _EPS))
+            t = t_next
+            if done:
+                break
+        x_end = self.knots[j] + self._h[j] * t
+        return np.where(cost == 0, x_start, x_end)
+
+    def supply_at_price_array(self, prices) -> np.ndarray:
+        # Bisects within the one segment whose knot prices bracket each price; nan outside
+        # [price(0), price(x_max)]
+        prices = np.asarray(prices, dtype=float)
+        inside = (prices >= self.prices[0]) & (prices <= self.prices[-1])
+        target = np.where(inside, prices, self.prices[0])
+        j = np.clip(np.searchsorted(self.prices, target, side="left") - 1, 0, len(self._h) - 1)
+        lo, hi = np.zeros_like(target), np.ones_like(target)
+        for _ in range(60):
+            t = 0.5 * (lo + hi)
+            low = self._a[j] + t * (self._b[j] + t * (self._c[j] + t * self._e[j])) < target
+            lo = np.where(low, t, lo)
+            hi = np.where(low, hi, t)
+        return np.where(inside, self.knots[j] + self._h[j] * hi, np.nan)
+
+    def __repr__(self) -> str:
+        return f"TabulatedBondingCurve(knots={len(self.knots)}, x_max={self.x_max})"
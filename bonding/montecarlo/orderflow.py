@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class OrderFlow:
+    """
+    Stochastic order flow for simulate_paths(): in each step every path receives a Poisson
+    number of orders, each a buy with probability buy_probability and otherwise a sell, of
+    a lognormal currency value.
+
+    Buys spend their value (buy_value) and sells ask for theirs (sell_value), so a
+    buy_probability above 0.5 pushes supply up on average and one below it pulls supply
+    down. Subclasses may override arrivals(), sides() and sizes(), for instance to make
+    the imbalance depend on the step or the sizes heavier-tailed.
+
+    Attributes
+    ----------
+    arrival_rate : float
+        Mean orders per path per step.
+    median_size : float
+        Median currency value of an order.
+    size_sigma : float
+        Standard deviation of the log of the order value.
+    buy_probability : float
+        Chance that an order is a buy.
+    """
+
+    __slots__ = ("arrival_rate", "median_size", "size_sigma", "buy_probability")
+
+    def __init__(self, arrival_rate: float = 1.0, median_size: float = 10.0, size_sigma: float = 1.0,
+                 buy_probability: float = 0.5):
+        if arrival_rate < 0:
+            raise ValueError("Parameter 'arrival_rate' must be non-negative.")
+        if median_size <= 0:
+            raise ValueError("Parameter 'median_size' must be positive.")
+        if size_sigma < 0:
+            raise ValueError("Parameter 'size_sigma' must be non-negative.")
+        if not 0.0 <= buy_probability <= 1.0:
+            raise ValueError("Parameter 'buy_probability' must be between 0 and 1.")
+        self.arrival_rate = float(arrival_rate)
+        self.median_size = float(median_size)
+        self.size_sigma = float(size_sigma)
+        self.buy_probability = float(buy_probability)
+
+    def arrivals(self, rng: np.random.Generator, n_paths: int, step: int) -> np.ndarray:
+        """
+        Number of orders reaching each of `n_paths` paths in `step`.
+        """
+        return rng.poisson(self.arrival_rate, n_paths)
+
+    def sides(self, rng: np.random.Generator, n_orders: int, step: int) -> np.ndarray:
+        """
+        True for each of `n_orders` orders that is a buy.
+        """
+        return rng.random(n_orders) < self.buy_probability
+
+    def sizes(self, rng: np.random.Generator, n_orders: int, step: int, dtype=np.float64) -> np.ndarray:
+        """
+        Currency value of each of `n_orders` orders.
+        """
+        sizes = rng.standard_normal(n_orders, dtype=dtype)
+        sizes *= self.size_sigma
+        np.exp(sizes, out=sizes)
+        sizes *= self.median_size
+        return sizes
+
+    def __repr__(self) -> str:
+        return (f"OrderFlow(arrival_rate={self.arrival_rate}, median_size={self.median_size}, "
+                f"size_sigma={self.size_sigma}, buy_probability={self.buy_probability})")
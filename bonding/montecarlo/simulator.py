@@ -0,0 +1,124 @@
+import numpy as np
+
+# Reported by horizon_distributions()
+HORIZON_FIELDS = ("fees", "breakage", "price", "reserve", "supply")
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+def simulate_paths(amm, flow, n_paths: int, n_steps: int, seed=None, float32: bool = False) -> dict:
+    """
+    Evolve `n_paths` independent copies of `amm` through `n_steps` steps of order flow drawn
+    from `flow`, all paths at once.
+
+    Each step, path i receives flow.arrivals()[i] orders. They are executed in rounds: the
+    k-th round takes the k-th order of every path that has one, as two calls to the AMM's
+    simulate_buy_value_batch() and simulate_sell_value_batch() with each path's own supply.
+    Orders are therefore filled, quantized and charged exactly as the AMM would fill them
+    one at a time, but with one vectorized curve evaluation per round rather than one
+    scalar solve per order. A sell asking for more than the curve holds is rejected, as
+    the AMM would reject it.
+
+    Paths start from the AMM's current supply, with the curve's reserve at its price
+    integral there; the AMM itself is not changed.
+    For integer_ledger AMMs the fees are rounded to whole quanta, as the ledger rounds
+    them, but the balances are kept as floats.
+
+    Parameters
+    ----------
+    amm : BondingCurveAMM
+    flow : OrderFlow
+    n_paths : int
+    n_steps : int
+    seed : int or np.random.Generator, optional
+        For reproducible paths.
+    float32 : bool, optional
+        Keep the per-path state and order sizes in float32, halving their memory. The
+        curve is still evaluated in float64; sums are rounded to float32 as they are stored.
+
+    Returns
+    -------
+    dict
+        Per-path arrays at the horizon:
+        {
+            'supply': np.ndarray,     # shares outstanding
+            'price': np.ndarray,      # curve price at that supply
+            'reserve': np.ndarray,    # currency held by the curve: net of buys in, gross of sells out
+            'fees': np.ndarray,       # fee_rate fees collected over the horizon
+            'breakage': np.ndarray,   # quantization breakage collected over the horizon
+            'orders': np.ndarray,     # orders received
+            'rejected': np.ndarray,   # of which rejected
+        }
+    """
+    if n_paths < 1 or n_steps < 0:
+        raise ValueError("Need at least one path and a non-negative number of steps.")
+    dtype = np.float32 if float32 else np.float64
+    rng = np.random.default_rng(seed)
+    x = np.full(n_paths, amm.x, dtype=dtype)
+    reserve = np.full(n_paths, amm.curve.price_integral(amm.x), dtype=dtype)
+    fees = np.zeros(n_paths, dtype=dtype)
+    breakage = np.zeros(n_paths, dtype=dtype)
+    orders = np.zeros(n_paths, dtype=np.int64)
+    rejected = np.zeros(n_paths, dtype=np.int64)
+
+    for step in range(n_steps):
+        arrivals = flow.arrivals(rng, n_paths, step)
+        orders += arrivals
+        for k in range(int(arrivals.max(initial=0))):
+            paths = np.flatnonzero(arrivals > k)
+            buy = flow.sides(rng, len(paths), step)
+            sizes = flow.sizes(rng, len(paths), step, dtype=dtype)
+
+            buyers = paths[buy]
+            if len(buyers):
+                sim = amm.simulate_buy_value_batch(sizes[buy], x=x[buyers])
+                x[buyers] += sim.shares_received
+                reserve[buyers] += sim.net_currency
+                fees[buyers] += sim.fee_amount
+                breakage[buyers] += sim.breakage_fee
+
+            sellers, values = paths[~buy], sizes[~buy]
+            if len(sellers):
+                # Leave out sells the curve cannot pay, which would make the batch raise
+                held = amm.curve.price_integral_array(x[sellers])
+                payable = np.floor(values / amm.quanta) * amm.quanta <= held
+                rejected[sellers[~payable]] += 1
+                sellers, values = sellers[payable], values[payable]
+            if len(sellers):
+                sim = amm.simulate_sell_value_batch(values, x=x[sellers])
+                filled = x[sellers] + sim.shares_sold >= 0
+                rejected[sellers[~filled]] += 1
+                sellers = sellers[filled]
+                x[sellers] += sim.shares_sold[filled]
+                # The curve pays out the gross: the seller's net plus the fee
+                reserve[sellers] -= sim.gross_currency[filled]
+                fees[sellers] += sim.fee_amount[filled]
+                breakage[sellers] += sim.breakage_fee[filled]
+
+    return {
+        "supply": x,
+        "price": amm.curve.price_array(x).astype(dtype, copy=False),
+        "reserve": reserve,
+        "fees": fees,
+        "breakage": breakage,
+        "orders": orders,
+        "rejected": rejected,
+    }
+
+
+def horizon_distributions(paths: dict, percentiles=PERCENTILES) -> dict:
+    """
+    Summarize the output of simulate_paths() as, for each of HORIZON_FIELDS,
+
+        {'mean': float, 'std': float, 'min': float, 'max': float, 'p1': float, 'p5': float, ...}
+
+    with one 'p<q>' entry per percentile in `percentiles`.
+    """
+    summary = {}
+    for field in HORIZON_FIELDS:
+        values = np.asarray(paths[field], dtype=float)
+        stats = {"mean": float(values.mean()), "std": float(values.std()),
+                 "min": float(values.min()), "max": float(values.max())}
+        for q, value in zip(percentiles, np.percentile(values, percentiles)):
+            stats[f"p{q}"] = float(value)
+        summary[field] = stats
+    return summary
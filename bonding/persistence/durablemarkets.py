@@ -0,0 +1,252 @@
+import json
+import logging
+import os
+import threading
+import numpy as np
+from bonding.amms.bondingcurveamm import TRADE_OPERATIONS
+from bonding.persistence.tradelog import TradeLog, _fsync_directory
+
+# One row per market in a checkpoint, stored as a .npy file so it can be memory-mapped
+SNAPSHOT_DTYPE = np.dtype([("market", "<u4"), ("version", "<u8"), ("x", "<f8"), ("cash", "<f8"), ("fees", "<f8"),
+                           ("cash_quanta", "<i8"), ("fees_quanta", "<i8")])
+
+MANIFEST, SNAPSHOT, LOG = "markets.json", "snapshot.npy", "trades.wal"
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _state(amm) -> tuple:
+    # What a log record or snapshot row holds for one market
+    return (amm.version, amm.x, amm.total_cash_collected, amm.total_fees_collected, amm.cash_quanta, amm.fees_quanta)
+
+
+def _restore(amm, state: tuple):
+    (amm.version, amm.x, amm.total_cash_collected, amm.total_fees_collected, amm.cash_quanta, amm.fees_quanta) = state
+
+
+def _quanta_fit(state: tuple) -> bool:
+    # The int64 quanta fields of RECORD and SNAPSHOT_DTYPE
+    return all(INT64_MIN <= quanta <= INT64_MAX for quanta in state[4:])
+
+
+def _state(amm) -> tuple:
+    # What a log record or snapshot row holds for one market
+    return (amm.version, amm.x, amm.total_cash_collected, amm.total_fees_collected, amm.cash_quanta, amm.fees_quanta)
+
+
+def _restore(amm, state: tuple):
+    (amm.version, amm.x, amm.total_cash_collected, amm.total_fees_collected, amm.cash_quanta, amm.fees_quanta) = state
+
+
+def _quanta_fit(state: tuple) -> bool:
+    # The int64 quanta fields of RECORD and SNAPSHOT_DTYPE
+    return all(INT64_MIN <= quanta <= INT64_MAX for quanta in state[4:])
+
+
+def _fsync_directory(directory: str):
+    # Makes a rename in `directory` durable, where the platform allows it
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class DurableMarkets:
+    """
+    Crash-safe state for many BondingCurveAMMs, kept in one directory:
+
+        markets.json    market names, in the order of their ids
+        trades.wal      a TradeLog of every trade since the last checkpoint, each record
+                        holding the market's state after the trade
+        snapshot.npy    every market's state at the last checkpoint
+
+    Trades made through trade() are appended to the log and fsynced in groups (see
+    TradeLog), so thousands of markets need no database round trip per trade. Once the
+    log holds `checkpoint_every` trades the state of all markets is written to a new
+    snapshot, which atomically replaces the old one, and the log drops the records the
+    snapshot covers.
+
+    trade() is safe to call from many threads. Each market has its own lock, held while
+    its trade executes and is appended, so trades on different markets run concurrently.
+    A checkpoint takes each market's lock only long enough to read its state.
+
+    On opening, each AMM's x, balances and version are restored from the snapshot and
+    then from the log records after it. A record torn by a crash is dropped. Recovery
+    reads states rather than re-executing trades, so it is exact and does not depend on
+    the solver. Trades made on the AMMs directly, rather than through trade(), are not
+    logged.
+
+        with DurableMarkets("state/", {"sqrt": SqrtBondingCurveAMM(fee_rate=0.001)}) as markets:
+            markets.trade("sqrt", "buy_value", 10.0)
+
+    Attributes
+    ----------
+    directory : str
+    amms : dict
+        Market name -> BondingCurveAMM, restored to its last durable state.
+    log : TradeLog
+    checkpoint_every : int
+        Trades logged between automatic checkpoints.
+    recovered : int
+        Log records applied when opening.
+    logger : logging.Logger
+        Logger instance for logging events and errors.
+    """
+
+    def __init__(self, directory: str, amms: dict, group_size: int = 1024, commit_interval: float = 0.01,
+                 checkpoint_every: int = 1_000_000):
+        """
+        Parameters
+        ----------
+        directory : str
+            Where the state is kept. Created if missing.
+        amms : dict
+            Market name (str) -> BondingCurveAMM, configured as when the markets were
+            created (curve, fee_rate, quanta, integer_ledger). Markets already in the
+            directory but not passed keep their state in the store; new names are added.
+        group_size, commit_interval
+            Group commit policy, see TradeLog.
+        checkpoint_every : int
+            Trades between automatic checkpoints.
+        """
+        self.directory = directory
+        self.amms = dict(amms)
+        self.checkpoint_every = int(checkpoint_every)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        os.makedirs(directory, exist_ok=True)
+
+        self._names = self._load_manifest()
+        new_names = [name for name in self.amms if name not in self._names]
+        if new_names:
+            self._names += new_names
+            self._save_manifest()
+        self._ids = {name: i for i, name in enumerate(self._names)}
+
+        self.log = TradeLog(os.path.join(directory, LOG), group_size=group_size, commit_interval=commit_interval)
+        self._states = {}
+        self.recovered = self._recover()
+        self._market_locks = {name: threading.Lock() for name in self.amms}
+        self._lock = threading.Lock()  # one checkpoint at a time
+
+    ###########################################################################
+    # Trading
+    ###########################################################################
+    def trade(self, market: str, operation: str, amount: float):
+        """
+        amm.execute(operation, amount) on `market`, logged. A rejected trade (ValueError)
+        is not logged. Returns whatever the trade method returns.
+
+        A trade whose ledger balances no longer fit the log's int64 quanta fields is
+        undone, leaving the AMM as it was, and raises ValueError.
+        """
+        amm = self.amms[market]
+        market_id, code = self._ids[market], TRADE_OPERATIONS.index(operation)
+        with self._market_locks[market]:
+            before = _state(amm)
+            result = amm.execute(operation, amount)
+            after = _state(amm)
+            if not _quanta_fit(after):
+                _restore(amm, before)
+                raise ValueError(f"{operation} {amount} on {market} would take its ledger beyond int64 quanta")
+            version, x, cash, fees, cash_quanta, fees_quanta = after
+            self.log.append(market_id, code, version, amount, x, cash, fees, cash_quanta, fees_quanta)
+        # Whoever finds the log full checkpoints; other threads trade on rather than queue behind it
+        if len(self.log) >= self.checkpoint_every and self._lock.acquire(blocking=False):
+            try:
+                self._checkpoint()
+            finally:
+                self._lock.release()
+        return result
+
+    def commit(self):
+        """
+        Make every trade so far durable.
+        """
+        self.log.commit()
+
+    def checkpoint(self):
+        """
+        Write every market's state to a new snapshot and drop the log records it covers.
+        """
+        with self._lock:
+            self._checkpoint()
+
+    def close(self):
+        with self._lock:
+            self.log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    ###########################################################################
+    # Checkpoints and recovery
+    ###########################################################################
+    def _checkpoint(self):
+        # Every record counted here was appended, under its market's lock, before that
+        # market's state is read below, so the snapshot covers it
+        covered = len(self.log)
+        states = {}
+        for name, amm in self.amms.items():
+            with self._market_locks[name]:
+                states[self._ids[name]] = _state(amm)
+        for market_id, state in states.items():
+            if not _quanta_fit(state):
+                raise ValueError(f"{self._names[market_id]}'s ledger is beyond int64 quanta and cannot be snapshotted")
+        self._states.update(states)
+        path = os.path.join(self.directory, SNAPSHOT)
+        tmp = path + ".tmp"
+        rows = np.lib.format.open_memmap(tmp, mode="w+", dtype=SNAPSHOT_DTYPE, shape=(len(self._states),))
+        for row, (market_id, state) in enumerate(sorted(self._states.items())):
+            rows[row] = (market_id,) + state
+        rows.flush()
+        del rows
+        with open(tmp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        _fsync_directory(self.directory)
+        self.log.discard(covered)
+
+    def _recover(self) -> int:
+        path = os.path.join(self.directory, SNAPSHOT)
+        if os.path.exists(path):
+            rows = np.load(path, mmap_mode="r")
+            for row in rows.tolist():
+                self._states[row[0]] = tuple(row[1:])
+        applied = 0
+        for market_id, _, version, _, x, cash, fees, cash_quanta, fees_quanta in self.log.records():
+            state = self._states.get(market_id)
+            if state is None or version > state[0]:
+                self._states[market_id] = (version, x, cash, fees, cash_quanta, fees_quanta)
+                applied += 1
+        for name, amm in self.amms.items():
+            state = self._states.get(self._ids[name])
+            if state is not None:
+                _restore(amm, state)
+        if applied:
+            self.logger.info(f"Recovered {applied} trades from {self.log.path}")
+        return applied
+
+    def _load_manifest(self) -> list:
+        path = os.path.join(self.directory, MANIFEST)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + ".tmp", "w") as f:
+            json.dump(self._names, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        _fsync_directory(self.directory)
@@ -0,0 +1,194 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+# One executed trade and the market's state after it, little-endian and packed:
+#   market (uint32), operation (uint8, index into TRADE_OPERATIONS), version (uint64), amount,
+#   x, total_cash_collected, total_fees_collected (float64), cash_quanta, fees_quanta (int64),
+#   then a CRC-32 of everything before it
+RECORD = struct.Struct("<IBQddddqqI")
+_BODY = struct.Struct("<IBQddddqq")
+
+
+def _fsync_directory(directory: str):
+    # Makes a rename in `directory` durable, where the platform allows it
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class TradeLog:
+    """
+    An append-only write-ahead log of fixed-size trade records, with group commit.
+
+    append() only buffers a record. The buffer is written and fsynced by commit(), which
+    append() calls itself once `group_size` records are waiting, and a background thread
+    calls once the oldest of them has waited `commit_interval` seconds, so one fsync
+    covers a whole group of trades and an idle log does not hold on to its last group.
+    After a crash, the trades missing from the log are at most the last `group_size`, and
+    at most those of the last `commit_interval` seconds (plus the time an fsync takes).
+
+    Each record carries a CRC, so a record torn by a crash mid-write is detected by
+    records() and dropped by truncate_torn_tail().
+
+    Attributes
+    ----------
+    path : str
+        The log file.
+    group_size : int
+        Records buffered before a commit is forced.
+    commit_interval : float
+        Seconds a record may wait in the buffer before a commit is forced. With 0 or inf
+        there is no background thread, and only group_size and commit() bound the wait.
+    commits : int
+        fsyncs done so far.
+    """
+
+    def __init__(self, path: str, group_size: int = 1024, commit_interval: float = 0.01):
+        self.path = path
+        self.group_size = int(group_size)
+        self.commit_interval = float(commit_interval)
+        self.commits = 0
+        self._buffer = bytearray()
+        self._buffered = 0
+        self._oldest = 0.0
+        self._lock = threading.Lock()
+        self.truncate_torn_tail()
+        self._file = open(path, "ab")
+        self._closed = threading.Event()
+        self._flusher = None
+        if 0.0 < self.commit_interval < float("inf"):
+            self._flusher = threading.Thread(target=self._commit_when_due, name=f"TradeLog({path})", daemon=True)
+            self._flusher.start()
+
+    def __len__(self) -> int:
+        """
+        Records in the log, committed or not.
+        """
+        with self._lock:
+            return self._file.tell() // RECORD.size + self._buffered
+
+    def append(self, market: int, operation: int, version: int, amount: float, x: float, cash: float,
+               fees: float, cash_quanta: int = 0, fees_quanta: int = 0):
+        body = _BODY.pack(market, operation, version, amount, x, cash, fees, cash_quanta, fees_quanta)
+        with self._lock:
+            self._buffer += body
+            self._buffer += struct.pack("<I", zlib.crc32(body))
+            if not self._buffered:
+                self._oldest = time.monotonic()
+            self._buffered += 1
+            if self._buffered >= self.group_size or time.monotonic() - self._oldest >= self.commit_interval:
+                self._commit()
+
+    def commit(self):
+        """
+        Write the buffered records and fsync the log.
+        """
+        with self._lock:
+            self._commit()
+
+    def _commit_when_due(self):
+        # The background thread: commit whenever the oldest buffered record reaches commit_interval
+        timeout = self.commit_interval
+        while not self._closed.wait(timeout):
+            with self._lock:
+                waited = time.monotonic() - self._oldest if self._buffered else 0.0
+                if waited >= self.commit_interval:
+                    self._commit()
+                    waited = 0.0
+            timeout = self.commit_interval - waited
+
+    def _commit(self):
+        if not self._buffered:
+            return
+        self._file.write(self._buffer)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._buffer.clear()
+        self._buffered = 0
+        self.commits += 1
+
+    def reset(self):
+        """
+        Empty the log, e.g. once a checkpoint holds everything in it. Buffered records are dropped.
+        """
+        with self._lock:
+            self._buffer.clear()
+            self._buffered = 0
+            self._file.truncate(0)
+            self._file.seek(0)
+            os.fsync(self._file.fileno())
+
+    def discard(self, records: int):
+        """
+        Drop the first `records` records, e.g. once a checkpoint holds them, keeping any
+        appended since. The rest are committed and moved to a new file that atomically
+        replaces the log, so a crash leaves either the old log or the new one.
+        """
+        with self._lock:
+            self._commit()
+            start = records * RECORD.size
+            if start >= self._file.tell():
+                self._file.truncate(0)
+                self._file.seek(0)
+                os.fsync(self._file.fileno())
+                return
+            tmp = self.path + ".tmp"
+            with open(self.path, "rb") as f, open(tmp, "wb") as out:
+                f.seek(start)
+                out.write(f.read())
+                out.flush()
+                os.fsync(out.fileno())
+            self._file.close()
+            os.replace(tmp, self.path)
+            _fsync_directory(os.path.dirname(os.path.abspath(self.path)))
+            self._file = open(self.path, "ab")
+
+    def close(self):
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.commit()
+        self._file.close()
+
+    def records(self, chunk_records: int = 65_536):
+        """
+        The committed records, as tuples of RECORD's fields without the CRC, up to the first
+        torn or corrupt one. Reads `chunk_records` records at a time.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            while True:
+                block = f.read(chunk_records * RECORD.size)
+                for start in range(0, len(block) - RECORD.size + 1, RECORD.size):
+                    body = block[start:start + _BODY.size]
+                    record = RECORD.unpack_from(block, start)
+                    if zlib.crc32(body) != record[-1]:
+                        return
+                    yield record[:-1]
+                if len(block) < chunk_records * RECORD.size:
+                    return
+
+    def truncate_torn_tail(self) -> int:
+        """
+        Cut the log back to its last intact record. Returns the number of bytes removed.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        intact = sum(1 for _ in self.records()) * RECORD.size
+        size = os.path.getsize(self.path)
+        if size > intact:
+            with open(self.path, "r+b") as f:
+                f.truncate(intact)
+                os.fsync(f.fileno())
+        return size - intact
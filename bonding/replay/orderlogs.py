@@ -0,0 +1,151 @@
+import csv
+import json
+import os
+import numpy as np
+from bonding.amms.bondingcurveamm import TRADE_OPERATIONS
+
+# Orders are read in chunks of this many
+CHUNK_SIZE = 65_536
+
+# Operation name -> the code stored in binary order logs, its index in TRADE_OPERATIONS
+OPERATION_CODES = {operation: code for code, operation in enumerate(TRADE_OPERATIONS)}
+
+# One record of a binary order log: a packed operation code and a little-endian float64 amount
+ORDER_DTYPE = np.dtype([("operation", "u1"), ("amount", "<f8")])
+
+
+class OrderChunk:
+    """
+    Consecutive orders from an order log, as arrays.
+
+    Attributes
+    ----------
+    operations : np.ndarray of uint8
+        Operation codes, indexes into TRADE_OPERATIONS.
+    amounts : np.ndarray of float
+        The amount passed to each trade method.
+    """
+
+    __slots__ = ("operations", "amounts")
+
+    def __init__(self, operations, amounts):
+        self.operations = np.asarray(operations, dtype=np.uint8)
+        self.amounts = np.asarray(amounts, dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def __iter__(self):
+        # (operation name, amount) pairs
+        return zip((TRADE_OPERATIONS[code] for code in self.operations.tolist()), self.amounts.tolist())
+
+
+def _operation_code(operation: str, where: str) -> int:
+    try:
+        return OPERATION_CODES[operation]
+    except KeyError:
+        raise ValueError(f"Unknown operation {operation!r} at {where}; expected one of {TRADE_OPERATIONS}.") from None
+
+
+def _chunked(records, chunk_size: int):
+    # OrderChunks from an iterable of (code, amount), holding one chunk at a time
+    operations, amounts = [], []
+    for code, amount in records:
+        operations.append(code)
+        amounts.append(amount)
+        if len(amounts) == chunk_size:
+            yield OrderChunk(operations, amounts)
+            operations, amounts = [], []
+    if amounts:
+        yield OrderChunk(operations, amounts)
+
+
+def read_csv_orders(path: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Orders from a CSV file with a header row naming (at least) the columns `operation`
+    and `amount`, as OrderChunks of up to `chunk_size` orders.
+    """
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        yield from _chunked(((_operation_code(row["operation"], f"{path}:{reader.line_num}"), float(row["amount"]))
+                             for row in reader), chunk_size)
+
+
+def read_jsonl_orders(path: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Orders from a JSON-lines file, one {"operation": ..., "amount": ...} object per line,
+    as OrderChunks of up to `chunk_size` orders. Blank lines are skipped.
+    """
+    def records(f):
+        for line_num, line in enumerate(f, start=1):
+            if line.strip():
+                order = json.loads(line)
+                yield _operation_code(order["operation"], f"{path}:{line_num}"), float(order["amount"])
+
+    with open(path) as f:
+        yield from _chunked(records(f), chunk_size)
+
+
+def read_binary_orders(path: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Orders from a binary order log of ORDER_DTYPE records (see write_binary_orders()),
+    memory-mapped and copied out `chunk_size` records at a time. An empty file has no orders.
+    """
+    size = os.path.getsize(path)
+    if size % ORDER_DTYPE.itemsize:
+        raise ValueError(f"{path} is {size} bytes, not a whole number of {ORDER_DTYPE.itemsize}-byte order records.")
+    if not size:
+        return
+    records = np.memmap(path, dtype=ORDER_DTYPE, mode="r")
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        operations = np.array(chunk["operation"])
+        if np.any(operations >= len(TRADE_OPERATIONS)):
+            bad = start + int(np.argmax(operations >= len(TRADE_OPERATIONS)))
+            raise ValueError(f"Unknown operation code {records[bad]['operation']} at record {bad} of {path}.")
+        yield OrderChunk(operations, np.array(chunk["amount"]))
+
+
+def write_binary_orders(path: str, orders, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Write (operation, amount) pairs, or OrderChunks, to a binary order log that
+    read_binary_orders() can memory-map. `orders` may be a generator of any length; it is
+    written `chunk_size` orders at a time. Returns the number of orders written.
+    """
+    def records():
+        for order in orders:
+            if isinstance(order, OrderChunk):
+                yield from zip(order.operations.tolist(), order.amounts.tolist())
+            else:
+                operation, amount = order
+                yield _operation_code(operation, path), amount
+
+    n = 0
+    with open(path, "wb") as f:
+        for chunk in _chunked(records(), chunk_size):
+            block = np.empty(len(chunk), dtype=ORDER_DTYPE)
+            block["operation"] = chunk.operations
+            block["amount"] = chunk.amounts
+            f.write(block.tobytes())
+            n += len(chunk)
+    return n
+
+
+# File extension -> reader, for read_orders()
+READERS = {
+    ".csv": read_csv_orders,
+    ".jsonl": read_jsonl_orders,
+    ".ndjson": read_jsonl_orders,
+    ".orders": read_binary_orders,
+    ".bin": read_binary_orders,
+}
+
+
+def read_orders(path: str, chunk_size: int = CHUNK_SIZE):
+    """
+    OrderChunks from an order log, read with the reader in READERS for its extension.
+    """
+    for extension, reader in READERS.items():
+        if path.endswith(extension):
+            return reader(path, chunk_size)
+    raise ValueError(f"Cannot tell the format of {path!r}; expected one of {', '.join(READERS)}.")
@@ -0,0 +1,85 @@
+import numpy as np
+from bonding.amms.bondingcurveamm import TRADE_OPERATIONS
+from bonding.replay.orderlogs import OPERATION_CODES, CHUNK_SIZE, OrderChunk, read_orders
+
+BUY_SHARES, SELL_SHARES = OPERATION_CODES["buy_shares"], OPERATION_CODES["sell_shares"]
+
+
+def replay(amm, chunks):
+    """
+    Execute orders against `amm` a chunk at a time, yielding the fills of each chunk as it
+    is done. Nothing is kept between chunks, so memory use depends on the chunk size and
+    not on the length of the log.
+
+    A chunk of only buy_shares and sell_shares orders runs through
+    amm.execute_shares_batch(), which fills them as executing them one by one would, up to
+    the last bits of each cost (see there). Other chunks, and share chunks with a negative
+    or non-finite amount or that would take the supply below zero somewhere, are executed
+    one order at a time. An order rejected with ValueError is skipped and marked as such;
+    any other exception propagates.
+
+    Parameters
+    ----------
+    amm : BondingCurveAMM
+    chunks : iterable of OrderChunk
+        e.g. from read_orders().
+
+    Yields
+    ------
+    dict, for each chunk
+        {
+            'operation': np.ndarray,   # operation codes, indexes into TRADE_OPERATIONS
+            'amount': np.ndarray,
+            'result': np.ndarray,      # what the trade method returned, nan where rejected
+            'rejected': np.ndarray,    # bool
+            'supply': np.ndarray,      # supply after each order
+            'vectorized': bool,        # whether the chunk ran through execute_shares_batch()
+            'state': dict,             # amm.snapshot() after the chunk
+        }
+    """
+    for chunk in chunks:
+        operations, amounts = chunk.operations, chunk.amounts
+        fills = None
+        shares_only = np.all((operations == BUY_SHARES) | (operations == SELL_SHARES))
+        if shares_only and np.all(np.isfinite(amounts) & (amounts >= 0)):
+            try:
+                fills = amm.execute_shares_batch(np.where(operations == BUY_SHARES, amounts, -amounts))
+            except ValueError:
+                pass
+        if fills is not None:
+            result = np.where(operations == BUY_SHARES, fills["paid"], fills["received"])
+            rejected = np.zeros(len(chunk), dtype=bool)
+            supply = fills["supply"]
+        else:
+            result, rejected, supply = _execute_one_by_one(amm, chunk)
+        yield {
+            "operation": operations,
+            "amount": amounts,
+            "result": result,
+            "rejected": rejected,
+            "supply": supply,
+            "vectorized": fills is not None,
+            "state": amm.snapshot(),
+        }
+
+
+def _execute_one_by_one(amm, chunk: OrderChunk) -> tuple:
+    n = len(chunk)
+    result = np.full(n, np.nan)
+    rejected = np.zeros(n, dtype=bool)
+    supply = np.empty(n)
+    trades = [getattr(amm, operation) for operation in TRADE_OPERATIONS]
+    for i, (code, amount) in enumerate(zip(chunk.operations.tolist(), chunk.amounts.tolist())):
+        try:
+            result[i] = trades[code](amount)
+        except ValueError:
+            rejected[i] = True
+        supply[i] = amm.x
+    return result, rejected, supply
+
+
+def replay_file(amm, path: str, chunk_size: int = CHUNK_SIZE):
+    """
+    replay() of the order log at `path`, in CSV, JSON-lines or binary format (see read_orders()).
+    """
+    return replay(amm, read_orders(path, chunk_size))
@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import json
+import sys
+from bonding.server.client import run_load
+from bonding.server.server import AMMServer
+
+
+def market_name(amm_cls) -> str:
+    # SqrtBondingCurveAMM -> 'sqrt'
+    return amm_cls.__name__.replace("BondingCurveAMM", "").lower()
+
+
+async def serve(host: str, port: int, scale: float, fee_rate: float):
+    from bonding.amms.allamms import all_amm_cls
+    server = AMMServer({market_name(amm_cls): amm_cls(scale=scale, fee_rate=fee_rate, quote_cache=1024)
+                        for amm_cls in all_amm_cls()})
+    port = await server.start(host, port)
+    print(f"Serving {', '.join(server.amms)} on {host}:{port}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main(argv=None) -> int:
+    """
+    Run an AMMServer with one market per AMM class, or a load generator against one.
+
+        python -m bonding.server serve --port 8765
+        python -m bonding.server load --port 8765 --market sqrt --connections 16 --requests 50000
+    """
+    parser = argparse.ArgumentParser(prog="python -m bonding.server", description="JSON-over-TCP AMM server.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("serve", "load"):
+        command = commands.add_parser(name)
+        command.add_argument("--host", default="127.0.0.1")
+        command.add_argument("--port", type=int, default=8765)
+    serve_parser = commands.choices["serve"]
+    serve_parser.add_argument("--scale", type=float, default=500_000.0)
+    serve_parser.add_argument("--fee-rate", type=float, default=0.001)
+    load_parser = commands.choices["load"]
+    load_parser.add_argument("--market", default="sqrt")
+    load_parser.add_argument("--connections", type=int, default=8)
+    load_parser.add_argument("--requests", type=int, default=10_000)
+    load_parser.add_argument("--trade-fraction", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port, args.scale, args.fee_rate))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    results = asyncio.run(run_load(args.host, args.port, args.market, connections=args.connections,
+                                   requests=args.requests, trade_fraction=args.trade_fraction))
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
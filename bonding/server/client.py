@@ -0,0 +1,153 @@
+import asyncio
+import itertools
+import json
+import math
+import time
+import numpy as np
+
+
+class AMMServerError(Exception):
+    """
+    An error response from an AMMServer, with the server-side exception's type name.
+    """
+
+    def __init__(self, error_type: str, message: str):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+
+
+class AMMClient:
+    """
+    An asyncio client for AMMServer. Requests may be issued concurrently on one
+    connection; each response is matched to its request by id.
+
+        client = await AMMClient.connect("127.0.0.1", port)
+        quote = await client.quote("sqrt", "buy_value", 10.0)
+        shares = await client.trade("sqrt", "buy_value", 10.0, expected_version=quote["version"])
+        await client.close()
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._waiting = {}
+        self._reading = asyncio.create_task(self._read_responses())
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 8765):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, method: str, **params):
+        """
+        Send one request and return its result, raising AMMServerError for an error response.
+        """
+        request_id = next(self._ids)
+        future = self._waiting[request_id] = asyncio.get_running_loop().create_future()
+        self._writer.write(json.dumps({"id": request_id, "method": method, **params}).encode() + b"\n")
+        await self._writer.drain()
+        response = await future
+        if "error" in response:
+            raise AMMServerError(response["error"]["type"], response["error"]["message"])
+        return response["result"]
+
+    async def quote(self, market: str, operation: str, amount: float) -> dict:
+        return await self.request("quote", market=market, operation=operation, amount=amount)
+
+    async def trade(self, market: str, operation: str, amount: float, expected_version: int = None):
+        return await self.request("trade", market=market, operation=operation, amount=amount,
+                                  expected_version=expected_version)
+
+    async def state(self, market: str) -> dict:
+        return await self.request("state", market=market)
+
+    async def _read_responses(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._waiting.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to the AMM server closed."))
+            self._waiting.clear()
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        await asyncio.gather(self._reading, return_exceptions=True)
+
+
+async def run_load(host: str, port: int, market: str, connections: int = 8, requests: int = 10_000,
+                   trade_fraction: float = 0.1, sizes=(1.0, 10.0, 100.0), seed: int = 0) -> dict:
+    """
+    Drive an AMMServer with `requests` requests spread over `connections` connections, each
+    sending its next request as soon as the previous one is answered. A `trade_fraction` of
+    them buy or sell value (sells only up to what was bought on that connection); the rest
+    quote buy_value, buy_shares, sell_shares or sell_value at one of `sizes`.
+
+    Returns
+    -------
+    dict
+        {
+            'requests': int,
+            'errors': int,            # error responses, e.g. quotes to sell more than the supply
+            'seconds': float,
+            'requests_per_second': float,
+            'p50_us': float,
+            'p99_us': float,
+            'max_us': float,
+        }
+    """
+    rng = np.random.default_rng(seed)
+    per_connection = [requests // connections + (i < requests % connections) for i in range(connections)]
+    latencies = []
+    errors = 0
+
+    async def drive(client: AMMClient, n: int, rng):
+        nonlocal errors
+        operations = ("buy_value", "buy_shares", "sell_shares", "sell_value")
+        bought = 0.0
+        for _ in range(n):
+            amount = float(sizes[rng.integers(len(sizes))])
+            start = time.perf_counter_ns()
+            try:
+                if rng.random() < trade_fraction:
+                    if bought >= amount and rng.random() < 0.5:
+                        await client.trade(market, "sell_value", amount)
+                        bought -= amount
+                    else:
+                        await client.trade(market, "buy_value", amount)
+                        bought += amount
+                else:
+                    await client.quote(market, operations[rng.integers(4)], amount)
+            except AMMServerError:
+                errors += 1
+            latencies.append(time.perf_counter_ns() - start)
+
+    clients = [await AMMClient.connect(host, port) for _ in range(connections)]
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(drive(client, n, np.random.default_rng(rng.integers(2 ** 32)))
+                               for client, n in zip(clients, per_connection)))
+        seconds = time.perf_counter() - start
+    finally:
+        for client in clients:
+            await client.close()
+
+    latencies_us = np.array(latencies) / 1e3
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": seconds,
+        "requests_per_second": len(latencies) / seconds if seconds > 0 else math.inf,
+        "p50_us": float(np.percentile(latencies_us, 50)) if len(latencies) else 0.0,
+        "p99_us": float(np.percentile(latencies_us, 99)) if len(latencies) else 0.0,
+        "max_us": float(latencies_us.max()) if len(latencies) else 0.0,
+    }
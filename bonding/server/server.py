@@ -0,0 +1,195 @@
+import asyncio
+import json
+import logging
+from bonding.amms.asyncammgateway import AsyncAMMGateway
+from bonding.amms.bondingcurveamm import TRADE_OPERATIONS
+
+# Requests a connection may have in flight before the server stops reading from it
+MAX_IN_FLIGHT = 256
+
+
+class AMMServer:
+    """
+    Serves quotes, trades and state for many BondingCurveAMMs over TCP, one JSON object
+    per line in each direction:
+
+        {"id": 1, "method": "quote", "market": "sqrt", "operation": "buy_value", "amount": 10.0}
+        {"id": 1, "result": {"version": 3, "quanta_used": 1000000000, ...}}
+
+        {"id": 2, "method": "trade", "market": "sqrt", "operation": "buy_value", "amount": 10.0,
+         "expected_version": 3}
+        {"id": 2, "result": 0.0989...}
+
+        {"id": 3, "method": "state", "market": "sqrt"}
+        {"id": 3, "result": {"version": 4, "x": 0.0989..., "price": 1.0000..., ...}}
+
+        {"id": 4, "method": "trade", "market": "nope", ...}
+        {"id": 4, "error": {"type": "KeyError", "message": "Unknown market 'nope'."}}
+
+    Requests on a connection are handled concurrently and answered as they complete, so
+    responses carry the request's id. Trades go through an AsyncAMMGateway, so each
+    market executes them one at a time in arrival order. Identical quotes (same market,
+    operation and amount, at the same version) that arrive while one is waiting to be
+    computed share its simulation.
+
+    Attributes
+    ----------
+    gateway : AsyncAMMGateway
+        The markets, and their trade queues.
+    stats : dict
+        Counts of 'requests', 'errors', 'quotes' simulated and 'coalesced' quotes that
+        shared another's simulation.
+    logger : logging.Logger
+        Logger instance for logging events and errors.
+    """
+
+    def __init__(self, amms: dict = None):
+        """
+        Parameters
+        ----------
+        amms : dict, optional
+            Markets to serve, as market name -> BondingCurveAMM. Names must be strings.
+        """
+        self.gateway = AsyncAMMGateway(amms)
+        self.stats = dict.fromkeys(("requests", "errors", "quotes", "coalesced"), 0)
+        self._pending_quotes = {}
+        self._server = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def amms(self) -> dict:
+        return self.gateway.amms
+
+    def add_market(self, market: str, amm):
+        self.gateway.add_market(market, amm)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """
+        Start listening, and return the port (useful with port=0, which picks a free one).
+        """
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """
+        Stop accepting connections, then execute every trade already queued.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.gateway.close()
+
+    ###########################################################################
+    # Requests
+    ###########################################################################
+    async def handle(self, request: dict) -> dict:
+        """
+        The response to one decoded request, as sent back to the client.
+        """
+        self.stats["requests"] += 1
+        response = {"id": request.get("id")}
+        try:
+            method = request.get("method")
+            if method == "quote":
+                response["result"] = await self.quote(request["market"], request["operation"], request["amount"])
+            elif method == "trade":
+                response["result"] = await self.gateway.submit(request["market"], request["operation"],
+                                                               request["amount"], request.get("expected_version"))
+            elif method == "state":
+                response["result"] = self.state(request["market"])
+            else:
+                raise ValueError(f"Unknown method {method!r}; expected quote, trade or state.")
+        except Exception as e:
+            if not isinstance(e, (ValueError, KeyError, TypeError, RuntimeError)):
+                self.logger.exception("Unexpected error handling %r", request)
+            self.stats["errors"] += 1
+            message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+            response["error"] = {"type": type(e).__name__, "message": str(message)}
+        return response
+
+    async def quote(self, market: str, operation: str, amount: float) -> dict:
+        """
+        simulate_<operation>(amount) on `market`, with the version it was computed at.
+        """
+        amm = self._amm(market)
+        if operation not in TRADE_OPERATIONS:
+            raise ValueError(f"Unknown operation {operation!r}; expected one of {TRADE_OPERATIONS}.")
+        key = (market, operation, float(amount), amm.version)
+        future = self._pending_quotes.get(key)
+        if future is None:
+            # Simulate on the next turn of the event loop, so identical quotes read in the
+            # meantime wait on the same result
+            future = self._pending_quotes[key] = asyncio.get_running_loop().create_future()
+            asyncio.get_running_loop().call_soon(self._simulate, key, future)
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(future)
+
+    def _simulate(self, key, future):
+        del self._pending_quotes[key]
+        market, operation, amount, _ = key
+        amm = self.amms[market]
+        self.stats["quotes"] += 1
+        try:
+            version = amm.version
+            result = getattr(amm, "simulate_" + operation)(amount)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result({"version": version, **result})
+
+    def state(self, market: str) -> dict:
+        """
+        The market's snapshot() and current price.
+        """
+        amm = self._amm(market)
+        return {**amm.snapshot(), "price": amm.current_price()}
+
+    def _amm(self, market: str):
+        try:
+            return self.amms[market]
+        except (KeyError, TypeError):
+            raise KeyError(f"Unknown market {market!r}.") from None
+
+    ###########################################################################
+    # Connections
+    ###########################################################################
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+        tasks = set()
+
+        async def respond(line: bytes):
+            try:
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Requests must be JSON objects.")
+                except ValueError as e:
+                    self.stats["requests"] += 1
+                    self.stats["errors"] += 1
+                    response = {"id": None, "error": {"type": "ValueError", "message": str(e)}}
+                else:
+                    response = await self.handle(request)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+            finally:
+                in_flight.release()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await in_flight.acquire()
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
@@ -24,6 +24,11 @@ setup(
               "bonding.amms",
               "bonding.curves",
               "bonding.curveplots",
+              "bonding.bench",
+              "bonding.replay",
+              "bonding.server",
+              "bonding.persistence",
+              "bonding.montecarlo",
               "bonding.using"
               ],
     test_suite='pytest',
@@ -33,6 +38,7 @@ setup(
     entry_points={
         "console_scripts": [
             "bonding=bonding.__main__:main",
+            "bonding-bench=bonding.bench.__main__:main",
         ]
     },
 )
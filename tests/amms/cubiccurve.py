@@ -0,0 +1,19 @@
+from bonding.curves.bondingcurve import BondingCurve
+
+
+class CubicBondingCurve(BondingCurve):
+    """
+    price(x) = 1 + (x/scale)^2, whose integral is cubic, with no supply_after_cost() so the
+    AMM must solve numerically. Counts its price_integral calls in `calls`.
+    """
+
+    def __init__(self, scale: float = 10.0):
+        self.scale = scale
+        self.calls = 0
+
+    def price(self, x: float) -> float:
+        return 1.0 + (x / self.scale) ** 2
+
+    def price_integral(self, x: float) -> float:
+        self.calls += 1
+        return x + x ** 3 / (3 * self.scale ** 2)
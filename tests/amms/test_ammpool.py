@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from bonding.amms.ammpool import AMMPool
+from bonding.amms.bondingcurveamm import BondingCurveAMM
+from bonding.curves.allcurves import all_curves_cls
+
+
+def test_pool_matches_individual_amms():
+    scales = np.array([10.0, 100.0, 1_000.0, 50_000.0])
+    fee_rates = np.array([0.0, 0.001, 0.003, 0.01])
+    for curve_cls in all_curves_cls():
+        pool = AMMPool(curve_cls, scales=scales, fee_rates=fee_rates)
+        amms = [BondingCurveAMM(curve=curve_cls(scale=s), fee_rate=f) for s, f in zip(scales, fee_rates)]
+        ids = np.arange(len(scales))
+
+        shares = pool.buy_value(ids, [500.0, 200.0, 100.0, 10.0])
+        assert np.allclose(shares, [amm.buy_value(v) for amm, v in zip(amms, [500.0, 200.0, 100.0, 10.0])],
+                           rtol=1e-9)
+        paid = pool.buy_shares(ids[::2], [3.0, 1.5])
+        assert np.allclose(paid, [amms[0].buy_shares(3.0), amms[2].buy_shares(1.5)], rtol=1e-9)
+        received = pool.sell_shares(ids[1:], 1.0)
+        assert np.allclose(received, [amm.sell_shares(1.0) for amm in amms[1:]], rtol=1e-9)
+        sold = pool.sell_value([3, 0], [2.0, 50.0])
+        assert np.allclose(sold, [amms[3].sell_value(2.0), amms[0].sell_value(50.0)], rtol=1e-9)
+
+        assert np.allclose(pool.x, [amm.x for amm in amms], rtol=1e-9)
+        assert np.allclose(pool.total_cash_collected, [amm.total_cash_collected for amm in amms], rtol=1e-9)
+        assert np.allclose(pool.total_fees_collected, [amm.total_fees_collected for amm in amms], rtol=1e-6)
+        assert np.allclose(pool.current_price(), [amm.current_price() for amm in amms], rtol=1e-12)
+        assert np.isclose(pool.to_amm(2).current_price(), amms[2].current_price(), rtol=1e-12)
+
+
+def test_pool_rejects_duplicate_ids_and_oversells():
+    pool = AMMPool(all_curves_cls()[0], scales=np.full(3, 10.0))
+    with pytest.raises(ValueError):
+        pool.buy_shares([0, 0], 1.0)
+    with pytest.raises(ValueError):
+        pool.sell_shares([1], 1.0)
+    assert np.all(pool.x == 0.0)
+
+
+def test_pool_value_trades_round_against_the_trader():
+    # Far up the exponential curve one ulp of supply is worth many quanta
+    from bonding.curves.expbondingcurve import ExpBondingCurve
+    pool = AMMPool(ExpBondingCurve, scales=np.full(200, 10.0), fee_rates=0.001)
+    ids = np.arange(200)
+    pool.buy_shares(ids, 250.0)
+    values = np.exp(np.random.default_rng(0).normal(10.0, 2.0, 200))
+    x_start = pool.x.copy()
+    net = pool.simulate_buy_value(ids, values).net_currency
+    pool.buy_value(ids, values)
+    assert np.all(pool.cost_to_move(ids, x_start, pool.x) <= net)
+
+    x_start = pool.x.copy()
+    gross = pool.simulate_sell_value(ids, values).gross_currency
+    pool.sell_value(ids, values)
+    assert np.all(-pool.cost_to_move(ids, x_start, pool.x) >= gross)
+
+
+def test_pool_needs_a_scale_family():
+    from bonding.curves.piecewisebondingcurve import PiecewiseBondingCurve
+    with pytest.raises(ValueError, match="scale family"):
+        AMMPool(PiecewiseBondingCurve, scales=[1.0])
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from bonding.amms.allamms import all_amm_cls
+from bonding.amms.arbitragescanner import (round_trip_grid, scan_round_trip_arbitrage,
+                                           assert_no_round_trip_arbitrage_on_grid)
+from bonding.amms.linearbondingcurveamm import LinearBondingCurveAMM
+
+
+def test_round_trip_grid_matches_scalar_round_trips():
+    supplies, sizes = [0.0, 1.0, 20.0], [0.5, 1.0, 10.0]
+    for amm_cls in all_amm_cls():
+        amm = amm_cls(scale=10, fee_rate=0.001)
+        grid = round_trip_grid(amm, supplies, sizes)
+        for i, x in enumerate(supplies):
+            for j, size in enumerate(sizes):
+                assert grid["buy_value_then_sell_shares"][i, j] == pytest.approx(
+                    amm.simulate_buy_value_then_sell_shares(size, x=x)["net_delta"], abs=2e-8)
+                assert grid["buy_shares_then_sell_shares"][i, j] == pytest.approx(
+                    amm.simulate_buy_shares_then_sell_shares(size, x=x)["net_delta"], abs=2e-8)
+                if amm.get_maximum_sell_value(x=x) >= size:
+                    assert grid["sell_value_then_buy_shares"][i, j] == pytest.approx(
+                        amm.simulate_sell_value_then_buy_shares(size, x=x)["shares_delta"], abs=1e-7)
+                else:
+                    assert np.isnan(grid["sell_value_then_buy_shares"][i, j])
+                if size <= x:
+                    assert grid["sell_shares_then_buy_value"][i, j] == pytest.approx(
+                        amm.simulate_sell_shares_then_buy_value(size, x=x)["shares_delta"], abs=1e-7)
+                else:
+                    assert np.isnan(grid["sell_shares_then_buy_value"][i, j])
+
+
+def test_no_arbitrage_with_fees_on_grid():
+    for amm_cls in all_amm_cls():
+        amm = amm_cls(scale=10, fee_rate=0.001)
+        report = assert_no_round_trip_arbitrage_on_grid(amm, np.linspace(0, 50, 101), np.geomspace(0.01, 20, 40),
+                                                        fee_rates=[0.001, 0.01])
+        assert report["buy_value_then_sell_shares"]["cells"] == 2 * 101 * 40
+        assert amm.x == 0.0
+
+
+def test_scan_reports_worst_cell_and_pool_agrees():
+    amm = LinearBondingCurveAMM(scale=10)
+    supplies, sizes = np.linspace(0, 30, 61), np.geomspace(0.01, 10, 20)
+    serial = scan_round_trip_arbitrage(amm, supplies, sizes, fee_rates=[0.0, 0.01], chunk_size=16)
+    pooled = scan_round_trip_arbitrage(amm, supplies, sizes, fee_rates=[0.0, 0.01], chunk_size=16, max_workers=2)
+    assert serial == pooled
+
+    # Zero fees give the largest (least negative) round trip losses
+    worst = serial["buy_shares_then_sell_shares"]
+    assert worst["fee_rate"] == 0.0
+    assert worst["net_delta"] == np.nanmax(round_trip_grid(amm, supplies, sizes)["buy_shares_then_sell_shares"])
+
+
+def test_scan_raises_on_arbitrage():
+    amm = LinearBondingCurveAMM(scale=10, fee_rate=0.01)
+    with pytest.raises(RuntimeError):
+        # A negative tolerance makes every break-even or losing cell count
+        assert_no_round_trip_arbitrage_on_grid(amm, [5.0], [1.0], tolerance=-1e6)
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from bonding.amms.allamms import all_amm_cls
+from bonding.amms.batchauction import BatchAuction
+from bonding.amms.linearbondingcurveamm import LinearBondingCurveAMM
+from bonding.amms.sqrtbondingcurveamm import SqrtBondingCurveAMM
+
+
+def random_orders(rng, n):
+    operations = rng.choice(["buy_value", "buy_shares", "sell_shares"], size=n)
+    return [(str(operation), float(amount)) for operation, amount in zip(operations, np.exp(rng.normal(0.0, 2.0, n)))]
+
+
+def test_one_sided_auction_costs_the_same_as_one_trade():
+    amm = SqrtBondingCurveAMM(scale=100.0)
+    single = SqrtBondingCurveAMM(scale=100.0)
+    fills = amm.execute_auction([("buy_shares", 10.0)] * 10)
+    assert abs(fills["paid"].sum() - single.buy_shares(100.0)) < 1e-6
+    assert np.all(fills["paid"] == fills["paid"][0])
+    assert amm.x == single.x == fills["supply"] == fills["net_shares"] == 100.0
+    assert fills["clearing_price"] == amm.curve.cost_to_move(0.0, 100.0) / 100.0
+
+    fills = amm.execute_auction([("buy_value", 10.0)] * 10)
+    shares = single.buy_value(100.0)
+    assert abs(fills["shares"].sum() - shares) < 1e-9
+    assert np.all(fills["shares"] * fills["clearing_price"] <= 10.0)
+
+
+def test_offsetting_orders_do_not_move_the_curve():
+    amm = SqrtBondingCurveAMM(scale=100.0, fee_rate=0.01)
+    amm.buy_value(50.0)
+    x, cash, price = amm.x, amm.total_cash_collected, amm.current_price()
+    fills = amm.execute_auction([("buy_shares", 3.0), ("sell_shares", 3.0)])
+    assert fills["clearing_price"] == price and amm.x == x
+    assert fills["shares"].tolist() == [3.0, -3.0]
+    assert fills["paid"][0] > fills["received"][1]
+    assert amm.total_cash_collected >= cash
+
+
+def test_fills_do_not_depend_on_order_within_the_block():
+    rng = np.random.default_rng(0)
+    orders = random_orders(rng, 200)
+    permutation = rng.permutation(len(orders))
+    a = SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001)
+    b = SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001)
+    for amm in (a, b):
+        amm.buy_value(1000.0)
+    fills_a = a.execute_auction(orders)
+    fills_b = b.execute_auction([orders[i] for i in permutation])
+    for name in ("shares", "paid", "received", "fee_amount"):
+        assert np.array_equal(fills_a[name][permutation], fills_b[name])
+    assert a.x == b.x and a.total_cash_collected == b.total_cash_collected
+
+
+def test_auctions_keep_the_cash_invariant():
+    rng = np.random.default_rng(1)
+    for amm_cls in all_amm_cls():
+        for integer_ledger in (False, True):
+            amm = amm_cls(scale=100.0, fee_rate=0.001, integer_ledger=integer_ledger)
+            amm.buy_value(500.0)
+            for _ in range(20):
+                try:
+                    fills = amm.execute_auction(random_orders(rng, 30))
+                except ValueError:
+                    continue
+                assert np.all(fills["shares"][fills["paid"] > 0] >= 0)
+                integral = amm.curve.price_integral(amm.x)
+                slack = 1e-9 * (1.0 + integral)
+                assert integral - slack <= amm.total_cash_collected <= integral + amm.total_fees_collected + slack
+            if integer_ledger:
+                before = amm.total_quanta_collected()
+                fills = amm.execute_auction(random_orders(rng, 30)[:5] + [("buy_value", 1.0)])
+                bought = fills["shares"] >= 0
+                quanta = int(fills["quanta_used"][bought].sum()) - int(round(fills["received"].sum() / amm.quanta)) \
+                    + int(round(fills["fee_amount"][~bought].sum() / amm.quanta))
+                assert amm.total_quanta_collected() - before == quanta
+
+
+def test_rejected_auctions_change_nothing():
+    amm = SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001)
+    amm.buy_shares(5.0)
+    auction = BatchAuction(amm)
+    with pytest.raises(ValueError):
+        auction.submit("sell_value", 1.0)
+    assert auction.submit("buy_shares", 1.0) == 0
+    assert auction.submit("sell_shares", 7.0) == 1
+    before = amm.snapshot()
+    with pytest.raises(ValueError):
+        auction.clear()
+    assert amm.snapshot() == before and len(auction) == 2
+
+    auction.orders.pop()
+    fills = auction.clear()
+    assert len(auction) == 0 and amm.x == 6.0 and amm.version == before["version"] + 1
+    assert fills["paid"][0] > 0
+
+
+def test_ledger_auctions_too_large_for_int64_are_rejected():
+    amm = LinearBondingCurveAMM(scale=1e6, integer_ledger=True)
+    amm.buy_shares(10.0)
+    before = amm.snapshot()
+    for orders in ([("buy_shares", 1e9)], [("buy_value", 1.0), ("buy_value", 1e11)]):
+        with pytest.raises(ValueError):
+            amm.execute_auction(orders)
+        assert amm.snapshot() == before
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from bonding.amms.allamms import all_amm_cls
+
+
+def _assert_matches(batch, sims):
+    for key, column in batch.items():
+        expected = np.array([sim[key] for sim in sims])
+        assert np.allclose(column, expected, rtol=1e-10, atol=1e-9), key
+
+
+def test_batch_simulations_match_scalar():
+    values = np.array([0.0, 1e-9, 0.5, 1.0, 10.0, 123.456, 1e4])
+    shares = np.array([0.0, 1e-6, 0.5, 1.0, 10.0, 50.0])
+    for amm_cls in all_amm_cls():
+        amm = amm_cls(scale=10, fee_rate=0.001)
+        amm.buy_value(20_000.0)
+        _assert_matches(amm.simulate_buy_value_batch(values), [amm.simulate_buy_value(v) for v in values])
+        _assert_matches(amm.simulate_sell_value_batch(values), [amm.simulate_sell_value(v) for v in values])
+        _assert_matches(amm.simulate_buy_shares_batch(shares), [amm.simulate_buy_shares(s) for s in shares])
+        _assert_matches(amm.simulate_sell_shares_batch(shares), [amm.simulate_sell_shares(s) for s in shares])
+
+
+def test_batch_simulations_validate():
+    amm = all_amm_cls()[0](scale=10)
+    amm.buy_shares(5.0)
+    with pytest.raises(ValueError):
+        amm.simulate_buy_value_batch([1.0, -1.0])
+    with pytest.raises(ValueError):
+        amm.simulate_sell_shares_batch([1.0, 6.0])
+    with pytest.raises(ValueError):
+        amm.simulate_sell_value_batch([1e6])
+
+
+def test_batch_solver_without_curve_inverse():
+    from bonding.amms.bondingcurveamm import BondingCurveAMM
+    from tests.amms.cubiccurve import CubicBondingCurve
+    amm = BondingCurveAMM(curve=CubicBondingCurve(scale=10.0), fee_rate=0.001)
+    amm.buy_value(500.0)
+    values = np.array([0.0, 0.01, 1.0, 100.0, 400.0])
+    _assert_matches(amm.simulate_buy_value_batch(values), [amm.simulate_buy_value(v) for v in values])
+    _assert_matches(amm.simulate_sell_value_batch(values), [amm.simulate_sell_value(v) for v in values])
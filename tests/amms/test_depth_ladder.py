@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from bonding.amms.allamms import all_amm_cls
+
+
+def test_depth_ladder_by_size_matches_simulations():
+    for amm_cls in all_amm_cls():
+        amm = amm_cls(scale=10, fee_rate=0.001)
+        amm.buy_shares(25.0)
+        ladder = amm.depth_ladder(num_levels=5, size_step=10.0)
+        asks, bids = ladder["asks"], ladder["bids"]
+        assert np.allclose(asks["shares"], [10, 20, 30, 40, 50])
+        assert np.allclose(bids["shares"], [10, 20])
+        for shares, paid in zip(asks["shares"], asks["currency"]):
+            assert np.isclose(paid, amm.simulate_buy_shares(shares)["total_paid"], rtol=1e-12)
+        for shares, received in zip(bids["shares"], bids["currency"]):
+            assert np.isclose(received, amm.simulate_sell_shares(shares)["net_currency"], rtol=1e-12)
+        # Deeper rungs trade at worse average prices
+        assert np.all(np.diff(asks["average_price"]) > 0)
+        assert np.all(np.diff(bids["average_price"]) < 0)
+        assert bids["average_price"][0] < amm.current_price() < asks["average_price"][0]
+
+
+def test_depth_ladder_by_price():
+    for amm_cls in all_amm_cls():
+        amm = amm_cls(scale=10)
+        amm.buy_shares(25.0)
+        p0 = amm.current_price()
+        ladder = amm.depth_ladder(num_levels=4, price_step=0.25)
+        assert np.allclose(ladder["asks"]["marginal_price"], p0 + 0.25 * np.arange(1, 5))
+        bid_prices = ladder["bids"]["marginal_price"]
+        assert np.allclose(bid_prices, p0 - 0.25 * np.arange(1, len(bid_prices) + 1))
+        assert np.all(bid_prices >= 1.0)
+
+
+def test_depth_ladder_requires_one_spacing():
+    amm = all_amm_cls()[0](scale=10)
+    with pytest.raises(ValueError):
+        amm.depth_ladder()
+    with pytest.raises(ValueError):
+        amm.depth_ladder(size_step=1.0, price_step=1.0)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from bonding.amms.allamms import all_amm_cls
+from bonding.amms.linearbondingcurveamm import LinearBondingCurveAMM
+
+
+def _replay(amm, signed_shares):
+    paid, received = [], []
+    for n in signed_shares:
+        if n >= 0:
+            paid.append(amm.buy_shares(n))
+            received.append(0.0)
+        else:
+            paid.append(0.0)
+            received.append(amm.sell_shares(-n))
+    return np.array(paid), np.array(received)
+
+
+def _trades(seed=0, n=500):
+    rng = np.random.default_rng(seed)
+    shares = rng.lognormal(0.0, 1.5, n) * np.where(rng.random(n) < 0.55, 1.0, -1.0)
+    shares[0] = 100.0
+    # Keep the running supply non-negative
+    return np.where(np.cumsum(shares) < 0, np.abs(shares), shares)
+
+
+def _within_a_quanta_or_rtol(batch, scalar, quanta, rtol=1e-14):
+    # The documented bound: one quanta or about 1e-14 of the fill, whichever is larger
+    return np.all(np.abs(batch - scalar) <= np.maximum(quanta, rtol * np.abs(scalar)))
+
+
+def test_execute_shares_batch_matches_scalar():
+    signed_shares = _trades()
+    for amm_cls in all_amm_cls():
+        scalar, batch = amm_cls(scale=10, fee_rate=0.001), amm_cls(scale=10, fee_rate=0.001)
+        paid, received = _replay(scalar, signed_shares)
+        result = batch.execute_shares_batch(signed_shares)
+        assert _within_a_quanta_or_rtol(result["paid"], paid, batch.quanta)
+        assert _within_a_quanta_or_rtol(result["received"], received, batch.quanta)
+        assert batch.x == scalar.x
+        fills = np.abs(result["paid"] - paid).sum() + np.abs(result["received"] - received).sum()
+        for total in ("total_cash_collected", "total_fees_collected"):
+            assert abs(getattr(batch, total) - getattr(scalar, total)) <= fills + 1e-9 + 1e-15 * abs(getattr(scalar, total))
+
+
+def test_execute_shares_batch_exact_for_linear():
+    signed_shares = _trades(seed=1)
+    scalar, batch = LinearBondingCurveAMM(scale=10, fee_rate=0.001), LinearBondingCurveAMM(scale=10, fee_rate=0.001)
+    paid, received = _replay(scalar, signed_shares)
+    result = batch.execute_shares_batch(signed_shares)
+    assert np.array_equal(result["paid"], paid) and np.array_equal(result["received"], received)
+    assert (batch.x, batch.total_cash_collected, batch.total_fees_collected) == \
+           (scalar.x, scalar.total_cash_collected, scalar.total_fees_collected)
+
+
+def test_execute_shares_batch_is_all_or_nothing():
+    amm = LinearBondingCurveAMM(scale=10)
+    amm.buy_shares(5.0)
+    with pytest.raises(ValueError):
+        amm.execute_shares_batch([1.0, -3.0, -4.0])
+    assert amm.x == 5.0
@@ -0,0 +1,51 @@
+from functools import partial
+from bonding.amms.ammfuzzer import fuzz, check_orders, random_orders, all_curve_amm_factories
+from bonding.amms.linearbondingcurveamm import LinearBondingCurveAMM
+
+
+class ForgetfulAMM(LinearBondingCurveAMM):
+    """
+    Forgets to pay out of the curve's cash on large sells.
+    """
+    __slots__ = ()
+
+    def sell_shares(self, num_shares: float) -> float:
+        net_currency = super().sell_shares(num_shares)
+        if num_shares > 5.0:
+            self.total_cash_collected += net_currency
+        return net_currency
+
+
+def test_fuzz_all_amms():
+    assert fuzz(n_sequences=4, n_steps=300) == []
+
+
+def test_fuzz_curve_amms_in_process_pool():
+    assert fuzz(all_curve_amm_factories(), n_sequences=2, n_steps=200, max_workers=2) == []
+
+
+def test_random_orders_are_reproducible():
+    assert random_orders(7, 50) == random_orders(7, 50)
+    assert random_orders(7, 50) != random_orders(8, 50)
+
+
+def test_failure_is_shrunk_to_a_reproducer():
+    factory = partial(ForgetfulAMM, scale=100.0, fee_rate=0.001)
+    failures = fuzz([factory], n_sequences=1, n_steps=300, seed=3)
+    assert len(failures) == 1
+    failure = failures[0]
+    assert failure["invariant"] == "cash"
+    assert failure["amm"] == "ForgetfulAMM(LinearBondingCurve)"
+    assert failure["seed"] == 3
+    assert len(failure["orders"]) <= 2
+    assert failure["orders"][-1][0] == "sell_shares"
+
+    replay = check_orders(factory(), failure["orders"])
+    assert replay["invariant"] == "cash"
+
+
+def test_fuzz_exp_amm_far_up_the_curve():
+    # Small scale, so the random walk reaches supplies where the price is many orders of magnitude up
+    from bonding.amms.expbondingcurveamm import ExpBondingCurveAMM
+    assert fuzz([partial(ExpBondingCurveAMM, scale=100.0, fee_rate=0.001)], n_sequences=4, n_steps=150,
+                unit=10.0) == []
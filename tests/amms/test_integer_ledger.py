@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+from bonding.amms.allamms import all_amm_cls
+from bonding.amms.linearbondingcurveamm import LinearBondingCurveAMM
+
+
+def _trade(amm, rng, n=2000):
+    # Random mix of all four trade types; returns the quanta paid in by traders less those paid out,
+    # plus the fees on sells
+    net_in = 0
+    for _ in range(n):
+        size = float(rng.lognormal(0.0, 1.0))
+        kind = rng.integers(4) if amm.x > 10 * size else rng.integers(2)
+        if kind == 0:
+            net_in += int(np.floor(size / amm.quanta))
+            amm.buy_value(size)
+        elif kind == 1:
+            net_in += round(amm.buy_shares(size) / amm.quanta)
+        else:
+            fees_before = amm.fees_quanta
+            if kind == 2:
+                received = round(amm.sell_shares(size) / amm.quanta)
+            else:
+                amm.sell_value(size)
+                received = int(np.floor(size / amm.quanta)) - (amm.fees_quanta - fees_before)
+            net_in += (amm.fees_quanta - fees_before) - received
+    return net_in
+
+
+def test_ledger_reconciles_exactly():
+    for amm_cls in all_amm_cls():
+        amm = amm_cls(scale=100, fee_rate=0.003, integer_ledger=True)
+        net_in = _trade(amm, np.random.default_rng(0))
+        assert amm.total_quanta_collected() == net_in
+        assert isinstance(amm.cash_quanta, int) and isinstance(amm.fees_quanta, int)
+        assert amm.total_cash_collected == amm.cash_quanta * amm.quanta
+        assert amm.total_fees_collected == amm.fees_quanta * amm.quanta
+        # The curve's booked cash never exceeds what the curve has taken in
+        assert amm.total_cash_collected >= amm.curve.price_integral(amm.x) * (1 - 1e-9)
+
+
+def test_ledger_matches_float_mode_closely():
+    for amm_cls in all_amm_cls():
+        ledger = amm_cls(scale=100, fee_rate=0.003, integer_ledger=True)
+        floats = amm_cls(scale=100, fee_rate=0.003)
+        for amm in (ledger, floats):
+            amm.buy_value(50.0)
+        assert np.isclose(ledger.x, floats.x, rtol=1e-9)
+        assert ledger.buy_shares(3.0) == pytest.approx(floats.buy_shares(3.0), abs=1e-7)
+        assert ledger.sell_shares(2.0) == pytest.approx(floats.sell_shares(2.0), abs=1e-7)
+
+
+def test_ledger_books_like_float_mode():
+    for amm_cls in all_amm_cls():
+        ledger = amm_cls(scale=100, fee_rate=0.01, integer_ledger=True)
+        floats = amm_cls(scale=100, fee_rate=0.01)
+        for amm in (ledger, floats):
+            amm.buy_value(50.0)
+            amm.buy_shares(10.0)
+            amm.sell_shares(10.0)
+            amm.sell_value(5.0)
+        assert ledger.total_cash_collected == pytest.approx(floats.total_cash_collected, abs=1e-7)
+        assert ledger.total_fees_collected == pytest.approx(floats.total_fees_collected, abs=1e-7)
+
+
+def test_ledger_quotes_match_fills():
+    for amm_cls in all_amm_cls():
+        amm = amm_cls(scale=100, fee_rate=0.003, integer_ledger=True)
+        amm.buy_value(50.0)
+        for amount in (3.3333333, 7.77777777, 0.123456789):
+            quotes = [amm.simulate_buy_value(amount), amm.simulate_buy_shares(amount),
+                      amm.simulate_sell_shares(amount), amm.simulate_sell_value(amount)]
+            batches = [amm.simulate_buy_value_batch([amount]), amm.simulate_buy_shares_batch([amount]),
+                       amm.simulate_sell_shares_batch([amount]), amm.simulate_sell_value_batch([amount])]
+            for quote, batch in zip(quotes, batches):
+                for field in ("quanta_used", "fee_amount"):
+                    assert batch[field][0] == pytest.approx(quote[field], rel=1e-12, abs=1e-12)
+            assert amm.buy_value(amount) == quotes[0]["shares_received"]
+            quote = amm.simulate_buy_shares(amount)
+            assert amm.buy_shares(amount) == quote["total_paid"]
+            quote = amm.simulate_sell_shares(amount)
+            assert amm.sell_shares(amount) == quote["net_currency"]
+            quote = amm.simulate_sell_value(amount)
+            assert amm.sell_value(amount) == -quote["shares_sold"]
+
+
+def test_ledger_execute_shares_batch_matches_scalar():
+    rng = np.random.default_rng(1)
+    signed_shares = rng.lognormal(0.0, 1.5, 500) * np.where(rng.random(500) < 0.55, 1.0, -1.0)
+    signed_shares[0] = 100.0
+    signed_shares = np.where(np.cumsum(signed_shares) < 0, np.abs(signed_shares), signed_shares)
+
+    scalar = LinearBondingCurveAMM(scale=10, fee_rate=0.001, integer_ledger=True)
+    batch = LinearBondingCurveAMM(scale=10, fee_rate=0.001, integer_ledger=True)
+    for n in signed_shares:
+        if n >= 0:
+            scalar.buy_shares(n)
+        else:
+            scalar.sell_shares(-n)
+    result = batch.execute_shares_batch(signed_shares)
+    assert result["quanta_used"].dtype == np.int64
+    assert batch.snapshot() == scalar.snapshot()
+
+
+def test_ledger_batch_too_large_for_int64_is_rejected():
+    amm = LinearBondingCurveAMM(scale=1e6, integer_ledger=True)
+    amm.buy_shares(10.0)
+    before = amm.snapshot()
+    with pytest.raises(ValueError):
+        amm.execute_shares_batch([1.0, 1e9])
+    assert amm.snapshot() == before
+
+    # One at a time, the same trade is counted exactly in Python ints
+    assert amm.buy_shares(1e9) == pytest.approx(5.01e11, rel=1e-6)
+    assert amm.cash_quanta > 2 ** 63
+
+
+def test_total_quanta_collected_needs_ledger_mode():
+    with pytest.raises(RuntimeError):
+        LinearBondingCurveAMM().total_quanta_collected()
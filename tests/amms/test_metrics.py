@@ -0,0 +1,77 @@
+import copy
+import pickle
+from bonding.amms.bondingcurveamm import BondingCurveAMM
+from bonding.amms.sqrtbondingcurveamm import SqrtBondingCurveAMM
+from tests.amms.cubiccurve import CubicBondingCurve
+
+
+def test_metrics_are_off_by_default():
+    amm = SqrtBondingCurveAMM(scale=100.0)
+    amm.buy_value(10.0)
+    assert amm.metrics is None and amm.metrics_snapshot() is None
+    assert not hasattr(amm.curve, "calls")
+
+
+def test_metrics_count_solver_work_and_curve_calls():
+    amm = BondingCurveAMM(CubicBondingCurve(), fee_rate=0.001, metrics=True)
+    for _ in range(10):
+        amm.sell_shares(amm.buy_value(10.0) / 2)
+    snapshot = amm.metrics_snapshot()
+
+    counters = snapshot["counters"]
+    assert counters["solves"] == counters["newton_solves"] == 10
+    assert counters["closed_form_solves"] == 0
+    assert counters["newton_steps"] + counters["bisection_steps"] > 0
+    assert counters["max_iter_hits"] == 0
+
+    assert snapshot["curve_calls"]["supply_after_cost"] == 10
+    assert snapshot["curve_calls"]["price_integral"] > 10
+    for operation in ("buy_value", "sell_shares"):
+        latency = snapshot["latency"][operation]
+        assert latency["count"] == 10
+        assert sum(latency["buckets"].values()) == 10
+        assert 0 < latency["p50_ns"] <= latency["p99_ns"]
+
+
+def test_metrics_record_max_iter_hits():
+    amm = BondingCurveAMM(CubicBondingCurve(), metrics=True)
+    amm._newton_solve_for_dx(0.0, 1000.0, max_iter=1)
+    assert amm.metrics_snapshot()["counters"]["max_iter_hits"] == 1
+
+
+def test_closed_form_solves_and_quote_latency():
+    amm = SqrtBondingCurveAMM(scale=100.0, metrics=True)
+    amm.buy_value(10.0)
+    amm.simulate_sell_shares(1.0)
+    snapshot = amm.metrics_snapshot()
+    assert snapshot["counters"]["closed_form_solves"] == 1
+    assert snapshot["latency"]["simulate_sell_shares"]["count"] == 1
+
+
+def test_enable_and_disable_metrics():
+    amm = SqrtBondingCurveAMM(scale=100.0)
+    curve = amm.curve
+    amm.enable_metrics()
+    amm.buy_value(10.0)
+    assert amm.metrics_snapshot()["latency"]["buy_value"]["count"] == 1
+    deep, pickled = copy.deepcopy(amm), pickle.loads(pickle.dumps(amm))
+    assert deep.metrics_snapshot()["counters"] == pickled.metrics_snapshot()["counters"] == \
+           amm.metrics_snapshot()["counters"]
+    assert deep.buy_value(1.0) == pickled.buy_value(1.0) == amm.buy_value(1.0)
+    amm.disable_metrics()
+    assert amm.curve is curve and amm.metrics_snapshot() is None
+
+
+def test_metrics_leave_the_curve_alone():
+    amm = SqrtBondingCurveAMM(scale=100.0)
+    curve, text = amm.curve, repr(amm)
+    amm.enable_metrics()
+    assert amm.curve is curve and type(amm.curve) is type(curve) and repr(amm) == text
+    amm.buy_value(10.0)
+    assert amm.metrics_snapshot()["curve_calls"]["supply_after_cost"] == 1
+
+    # A curve set while metrics are on is counted too, from zero
+    replacement = type(curve)(scale=200.0)
+    amm.curve = replacement
+    amm.simulate_buy_value(5.0)
+    assert amm.curve is replacement and amm.metrics_snapshot()["curve_calls"]["supply_after_cost"] == 1
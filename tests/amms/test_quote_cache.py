@@ -0,0 +1,80 @@
+import copy
+import pickle
+import pytest
+from bonding.amms.sqrtbondingcurveamm import SqrtBondingCurveAMM
+
+
+def test_quote_cache_is_off_by_default():
+    amm = SqrtBondingCurveAMM(scale=100.0)
+    amm.simulate_buy_value(10.0)
+    assert amm.quotes is None and amm.quote_cache_stats() is None
+
+
+def test_repeated_quotes_are_served_from_cache():
+    amm = SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001, quote_cache=64)
+    plain = SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001)
+    for a in (amm, plain):
+        a.buy_value(50.0)
+    sizes = (1.0, 5.0, 25.0)
+    for _ in range(10):
+        for size in sizes:
+            assert amm.simulate_buy_value(size) == plain.simulate_buy_value(size)
+            assert amm.simulate_sell_value(size) == plain.simulate_sell_value(size)
+            assert amm.simulate_buy_shares(size) == plain.simulate_buy_shares(size)
+            assert amm.simulate_sell_shares(size) == plain.simulate_sell_shares(size)
+    stats = amm.quote_cache_stats()
+    assert stats["misses"] == 12 and stats["hits"] == 108 and stats["size"] == 12
+    assert stats["hit_rate"] == 0.9
+
+    # Quotes at another supply bypass the cache
+    amm.simulate_buy_value(1.0, x=3.0)
+    assert amm.quote_cache_stats()["misses"] == 12
+
+    # Results are fresh objects, so changing one does not change the cache
+    sim = amm.simulate_buy_value(1.0)
+    sim.shares_received = -1.0
+    assert amm.simulate_buy_value(1.0).shares_received > 0
+
+
+def test_state_changes_invalidate_quotes():
+    amm = SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001, quote_cache=64)
+    before = amm.simulate_buy_value(10.0).shares_received
+    amm.buy_value(10.0)
+    after = amm.simulate_buy_value(10.0).shares_received
+    assert after < before
+    assert amm.quote_cache_stats()["hits"] == 0
+
+    amm.x = 0.0
+    assert amm.simulate_buy_value(10.0).shares_received == before
+    with pytest.raises(ValueError):
+        amm.simulate_sell_shares(1.0)
+    assert amm.quote_cache_stats()["misses"] == 3
+
+
+def test_quote_cache_is_bounded_and_least_recently_used():
+    amm = SqrtBondingCurveAMM(scale=100.0)
+    amm.enable_quote_cache(3)
+    for size in (1.0, 2.0, 3.0, 1.0, 4.0):
+        amm.simulate_buy_value(size)
+    assert [key[-1] for key in amm.quotes.entries] == [3.0, 1.0, 4.0]
+    amm.disable_quote_cache()
+    assert amm.quote_cache_stats() is None
+
+
+def test_read_heavy_traffic_hit_rate():
+    amm = SqrtBondingCurveAMM(scale=1000.0, fee_rate=0.001, quote_cache=256, metrics=True)
+    amm.buy_value(1000.0)
+    sizes = [1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0]
+    for trade in range(20):
+        for _ in range(20):
+            for size in sizes:
+                amm.simulate_buy_value(size)
+                amm.simulate_sell_value(size / 10)
+        amm.buy_value(100.0)
+    assert amm.quote_cache_stats()["hit_rate"] == 0.95
+    # Hits skip the solver
+    assert amm.metrics_snapshot()["counters"]["solves"] == 1 + 20 * 2 * len(sizes) + 20
+
+    restored = pickle.loads(pickle.dumps(amm))
+    assert restored.quote_cache_stats() == copy.deepcopy(amm).quote_cache_stats() == amm.quote_cache_stats()
+    assert restored.simulate_buy_value(1.0) == amm.simulate_buy_value(1.0)
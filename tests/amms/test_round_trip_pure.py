@@ -0,0 +1,45 @@
+import copy
+from bonding.amms.allamms import all_amm_cls
+
+
+def _state(amm):
+    return amm.x, amm.total_cash_collected, amm.total_fees_collected
+
+
+def test_round_trips_do_not_touch_state():
+    for amm_cls in all_amm_cls():
+        amm = amm_cls(scale=10, fee_rate=0.001)
+        amm.buy_value(100.0)
+        before = _state(amm)
+        amm.simulate_buy_value_then_sell_shares(5.0)
+        amm.simulate_buy_shares_then_sell_shares(5.0)
+        amm.simulate_sell_value_then_buy_shares(5.0)
+        amm.simulate_sell_shares_then_buy_value(5.0)
+        assert amm.assert_no_round_trip_arbitrage()
+        assert _state(amm) == before
+
+
+def test_round_trips_match_actual_trades():
+    for amm_cls in all_amm_cls():
+        amm = amm_cls(scale=10, fee_rate=0.001)
+        amm.buy_value(100.0)
+
+        live = copy.deepcopy(amm)
+        shares = live.buy_value(5.0)
+        assert amm.simulate_buy_value_then_sell_shares(5.0)["final_currency"] == live.sell_shares(shares)
+
+        live = copy.deepcopy(amm)
+        shares_sold = live.sell_value(5.0)
+        result = amm.simulate_sell_value_then_buy_shares(5.0)
+        assert result["shares_sold"] == shares_sold
+        assert result["buy_shares_received"] == live.buy_value(5.0)
+
+
+def test_round_trips_from_explicit_supply():
+    for amm_cls in all_amm_cls():
+        amm = amm_cls(scale=10, fee_rate=0.001)
+        other = amm_cls(scale=10, fee_rate=0.001)
+        other.buy_shares(30.0)
+        assert amm.simulate_sell_shares_then_buy_value(3.0, x=30.0) == other.simulate_sell_shares_then_buy_value(3.0)
+        assert amm.assert_no_round_trip_arbitrage(x=30.0)
+        assert amm.x == 0.0
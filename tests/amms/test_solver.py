@@ -0,0 +1,56 @@
+import math
+from bonding.amms.bondingcurveamm import BondingCurveAMM
+from tests.amms.cubiccurve import CubicBondingCurve
+
+
+def test_newton_solver_matches_cost():
+    amm = BondingCurveAMM(curve=CubicBondingCurve(scale=10.0))
+    for x_start in [0.0, 3.0, 100.0]:
+        for cost in [1e-6, 1.0, 1e3, 1e9]:
+            dx = amm._solve_for_dx(x_start, cost)
+            assert math.isclose(amm.curve.cost_to_move(x_start, x_start + dx), cost, rel_tol=1e-9,
+                                abs_tol=1e-12 * amm.curve.price_integral(x_start + dx))
+            if amm.curve.price_integral(x_start) > cost:
+                dx = amm._solve_for_dx(x_start, -cost)
+                assert math.isclose(amm.curve.cost_to_move(x_start, x_start + dx), -cost, rel_tol=1e-9,
+                                    abs_tol=1e-12 * amm.curve.price_integral(x_start))
+
+
+def test_newton_solver_is_fast_and_warm_starts():
+    amm = BondingCurveAMM(curve=CubicBondingCurve(scale=10.0))
+    amm.buy_value(1_000_000.0)
+    amm.curve.calls = 0
+    amm.buy_value(1_000.0)
+    cold = amm.curve.calls
+    assert cold <= 20
+    amm.curve.calls = 0
+    amm.buy_value(1_100.0)
+    assert amm.curve.calls <= cold
+
+
+def test_integral_at_supply_is_cached_between_trades():
+    amm = BondingCurveAMM(curve=CubicBondingCurve(scale=10.0), fee_rate=0.001)
+    amm.buy_value(1_000.0)
+    amm.curve.calls = 0
+    assert amm.total_cost_at_supply() == amm.x + amm.x ** 3 / 300
+    assert amm.curve.calls == 0
+
+    # Each trade pays for the integral at its far end only
+    amm.buy_shares(5.0)
+    amm.sell_shares(2.0)
+    assert amm.curve.calls == 2
+    assert amm.get_maximum_sell_value() > 0 and amm.curve.calls == 3
+
+    amm.x = 1.0
+    assert amm.total_cost_at_supply() == 1.0 + 1.0 / 300
+    assert amm.curve.calls == 4
+
+
+def test_shares_batch_matches_trades_with_cached_integrals():
+    batched = BondingCurveAMM(curve=CubicBondingCurve(scale=10.0), fee_rate=0.001)
+    scalar = BondingCurveAMM(curve=CubicBondingCurve(scale=10.0), fee_rate=0.001)
+    shares = [10.0, -3.0, 7.5, -14.5, 2.0]
+    result = batched.execute_shares_batch(shares)
+    paid = [scalar.buy_shares(n) if n >= 0 else -scalar.sell_shares(-n) for n in shares]
+    assert list(result["paid"] - result["received"]) == paid
+    assert batched.total_cost_at_supply() == scalar.total_cost_at_supply()
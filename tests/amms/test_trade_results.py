@@ -0,0 +1,35 @@
+import copy
+import pickle
+from bonding.amms.allamms import all_amm_cls
+
+
+def test_results_read_like_dicts():
+    for amm_cls in all_amm_cls():
+        amm = amm_cls(scale=10, fee_rate=0.001)
+        amm.buy_value(100.0)
+        for sim in (amm.simulate_buy_value(5.0), amm.simulate_buy_shares(5.0),
+                    amm.simulate_sell_shares(5.0), amm.simulate_sell_value(5.0)):
+            as_dict = dict(sim)
+            assert sim == as_dict
+            assert list(sim.keys()) == list(as_dict)
+            for key, value in as_dict.items():
+                assert sim[key] == getattr(sim, key) == value
+            assert sim.get("no_such_key") is None
+
+
+def test_no_instance_dict():
+    for amm_cls in all_amm_cls():
+        amm = amm_cls(scale=10, fee_rate=0.001)
+        assert not hasattr(amm, "__dict__")
+        assert not hasattr(amm.curve, "__dict__")
+        assert not hasattr(amm.simulate_buy_value(1.0), "__dict__")
+
+
+def test_slotted_amm_copies_and_pickles():
+    for amm_cls in all_amm_cls():
+        for thread_safe in (False, True):
+            amm = amm_cls(scale=10, fee_rate=0.001, thread_safe=thread_safe)
+            amm.buy_value(100.0)
+            deep, pickled = copy.deepcopy(amm), pickle.loads(pickle.dumps(amm))
+            assert deep.snapshot() == pickled.snapshot() == amm.snapshot()
+            assert deep.buy_value(5.0) == pickled.buy_value(5.0) == amm.buy_value(5.0)
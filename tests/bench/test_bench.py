@@ -0,0 +1,45 @@
+import json
+from bonding.bench.__main__ import main
+from bonding.bench.baseline import compare, load_baseline
+from bonding.bench.benchmarks import bench_large_supply, bench_solver
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = {"a_ns": 100.0, "b_ns": 100.0, "c_evaluations": 4.0, "gone_ns": 1.0}
+    results = {"a_ns": 120.0, "b_ns": 200.0, "c_evaluations": 6.0, "new_ns": 5.0}
+    regressions = compare(results, baseline, threshold=0.25)
+    assert [r["name"] for r in regressions] == ["b_ns", "c_evaluations"]
+    assert regressions[0]["ratio"] == 2.0
+
+
+def test_save_then_compare_against_baseline(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    assert main(["curves", "--quick", "--save-baseline", path]) == 0
+    results = load_baseline(path)
+    assert "curve/LinearBondingCurve/typical/cost_to_move_ns" in results
+    assert all(value > 0 for value in results.values())
+
+    # Against itself, with a generous threshold for timing noise
+    assert main(["curves", "--quick", "--baseline", path, "--output", str(tmp_path / "out.json"),
+                 "--threshold", "5"]) == 0
+
+    # Against a baseline ten times faster
+    with open(path) as f:
+        stored = json.load(f)
+    stored["results"] = {name: value / 10 for name, value in stored["results"].items()}
+    with open(path, "w") as f:
+        json.dump(stored, f)
+    assert main(["curves", "--quick", "--baseline", path, "--output", str(tmp_path / "out.json")]) == 1
+
+
+def test_solver_counts_newton_evaluations():
+    results = bench_solver(mode="quick")
+    counts = [value for name, value in results.items() if name.endswith("/newton_evaluations")]
+    assert counts and all(1 <= count < 50 for count in counts)
+
+
+def test_large_supply_costs_keep_their_digits():
+    results = bench_large_supply(mode="quick")
+    errors = [value for name, value in results.items() if name.endswith("/cost_error")]
+    assert errors and all(error < 1e-6 for error in errors)
+    assert any(name.startswith("large_supply/") and "/1e+15/" in name for name in results)
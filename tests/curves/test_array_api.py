@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from bonding.curves.allcurves import all_curves_cls
+from bonding.curves.bondingcurve import BondingCurve
+
+
+class QuadraticBondingCurve(BondingCurve):
+    """ A user curve with no array methods of its own """
+
+    def __init__(self, scale: float = 10.0):
+        self.scale = scale
+
+    def price(self, x: float) -> float:
+        return 1.0 + x / self.scale
+
+    def price_integral(self, x: float) -> float:
+        return x + x ** 2 / (2 * self.scale)
+
+
+def test_array_methods_match_scalar():
+    x = np.linspace(0.0, 50.0, 101).reshape(1, 101)
+    for curve_cls in all_curves_cls() + [QuadraticBondingCurve]:
+        curve = curve_cls(scale=10)
+        prices = curve.price_array(x)
+        integrals = curve.price_integral_array(x)
+        assert prices.shape == x.shape and integrals.shape == x.shape
+        assert np.allclose(prices, [curve.price(xi) for xi in x.ravel()], rtol=1e-14, atol=0)
+        assert np.allclose(integrals, [curve.price_integral(xi) for xi in x.ravel()], rtol=1e-14, atol=0)
+        costs = curve.cost_to_move_array(5.0, x)
+        assert np.allclose(costs, [curve.cost_to_move(5.0, xi) for xi in x.ravel()], rtol=1e-12, atol=1e-12)
+
+
+def test_array_methods_reject_negative_supply():
+    for curve_cls in all_curves_cls():
+        curve = curve_cls(scale=10)
+        try:
+            curve.price(-1.0)
+        except ValueError:
+            with pytest.raises(ValueError):
+                curve.price_array([1.0, -1.0])
+
+
+def test_supply_at_price_inverts_price():
+    prices = np.array([0.5, 1.0, 1.5, 2.0, 7.0])
+    for curve_cls in all_curves_cls() + [QuadraticBondingCurve]:
+        curve = curve_cls(scale=10)
+        x = curve.supply_at_price_array(prices)
+        assert np.isnan(x[0])
+        assert np.allclose(curve.price_array(x[1:]), prices[1:], rtol=1e-12)
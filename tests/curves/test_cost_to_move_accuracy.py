@@ -0,0 +1,47 @@
+from decimal import Decimal, localcontext
+import numpy as np
+from bonding.curves.allcurves import all_curves_cls
+
+
+def exact_cost_to_move(curve, x_start, x_end):
+    # cost_to_move in 60-digit decimal arithmetic, from the curves' closed-form integrals
+    with localcontext() as ctx:
+        ctx.prec = 60
+        e = Decimal(1).exp()
+
+        def integral(x):
+            x = Decimal(x)
+            name = type(curve).__name__
+            if name == "LinearBondingCurve":
+                return Decimal(curve.m) / 2 * x * x + Decimal(curve.b) * x
+            s = Decimal(curve.scale)
+            if name == "ExpBondingCurve":
+                return s / (e - 1) * ((x / s).exp() - 1) + (e - 2) / (e - 1) * x
+            if name == "LogBondingCurve":
+                k = (e * e - e) / s
+                z = e + k * x
+                return z * (z.ln() - 1) / k
+            if name == "SqrtBondingCurve":
+                y = x / s
+                q = (1 + y * y).sqrt()
+                return (x * q + s * (y + q).ln()) / 2
+            if name == "GrowthBondingCurve":
+                return x + x * (x / s) ** Decimal(curve.p) / (Decimal(curve.p) + 1) if x else Decimal(0)
+            raise NotImplementedError(name)
+
+        return float(integral(x_end) - integral(x_start))
+
+
+def test_cost_to_move_keeps_its_digits_at_large_supplies():
+    for curve_cls in all_curves_cls():
+        curve = curve_cls(scale=1000.0)
+        supplies = [0.0, 1.0, 1e3, 1e5] if curve_cls.__name__ == "ExpBondingCurve" else \
+            [0.0, 1.0, 1e3, 1e6, 1e9, 1e12, 1e15]
+        for x in supplies:
+            for dx in (1e-9 * x, 1e-3 * x, 1.0, -1.0, -x, 1e-12):
+                x_end = x + dx
+                if x_end < 0 or x_end == x:
+                    continue
+                exact = exact_cost_to_move(curve, x, x_end)
+                assert abs(curve.cost_to_move(x, x_end) / exact - 1) < 1e-14, (curve, x, dx)
+                assert abs(curve.cost_to_move_array([x], [x_end])[0] / exact - 1) < 1e-14, (curve, x, dx)
@@ -0,0 +1,19 @@
+import numpy as np
+from bonding.curves.allcurves import all_curves_cls
+
+
+def test_instrumented_curve_prices_identically_and_counts_calls():
+    for curve_cls in all_curves_cls():
+        curve = curve_cls(scale=10.0)
+        instrumented = curve.instrumented()
+        for name in curve_cls.__slots__:
+            assert getattr(instrumented, name) == getattr(curve, name)
+        assert instrumented.price(3.0) == curve.price(3.0)
+        assert instrumented.price_integral(3.0) == curve.price_integral(3.0)
+        assert instrumented.cost_to_move(1.0, 4.0) == curve.cost_to_move(1.0, 4.0)
+        assert instrumented.supply_after_cost(1.0, 2.0) == curve.supply_after_cost(1.0, 2.0)
+        assert np.array_equal(instrumented.price_array([1.0, 2.0]), curve.price_array([1.0, 2.0]))
+        assert instrumented.calls["price"] == instrumented.calls["price_integral"] == 1
+        assert instrumented.calls["cost_to_move"] == instrumented.calls["supply_after_cost"] == 1
+        assert instrumented.calls["price_array"] == 1
+        assert instrumented.instrumented() is instrumented
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from bonding.curves.linearbondingcurve import LinearBondingCurve
+from bonding.curves.piecewisebondingcurve import PiecewiseBondingCurve
+from bonding.amms.bondingcurveamm import BondingCurveAMM
+from bonding.amms.arbitragescanner import assert_no_round_trip_arbitrage_on_grid
+
+MIXED = [(0.0, "linear", 1.0, 0.01), (100.0, "exp", 2.5, 100.0),
+         (300.0, "power", 20.0, 20.0, 0.5), (400.0, "power", 50.0, 5.0, 0.25), (450.0, "linear", 100.0, 0.0)]
+
+
+def quadrature(curve, lo, hi, breaks=(100.0, 300.0, 400.0, 450.0)):
+    # 40-point Gauss-Legendre on each piece between segment starts
+    nodes, weights = np.polynomial.legendre.leggauss(40)
+    edges = [lo] + [b for b in breaks if lo < b < hi] + [hi]
+    return sum(0.5 * (b - a) * np.dot(weights, curve.price_array(0.5 * (b - a) * nodes + 0.5 * (a + b)))
+               for a, b in zip(edges, edges[1:]))
+
+
+def test_single_linear_segment_matches_linear_curve():
+    linear = LinearBondingCurve(scale=10.0)
+    curve = PiecewiseBondingCurve([(0.0, "linear", 1.0, 0.1)])
+    for x in (0.0, 0.5, 3.0, 40.0):
+        assert abs(curve.price(x) - linear.price(x)) < 1e-12
+        assert abs(curve.price_integral(x) - linear.price_integral(x)) < 1e-10
+        assert abs(curve.supply_after_cost(x, 7.0) - linear.supply_after_cost(x, 7.0)) < 1e-10
+
+
+def test_integrals_and_inverses_across_segments():
+    curve = PiecewiseBondingCurve(MIXED)
+    for x in (0.0, 50.0, 100.0, 150.0, 299.0, 350.0, 420.0, 500.0):
+        expected = quadrature(curve, 0.0, x)
+        assert abs(curve.price_integral(x) - expected) < 1e-8 * max(1.0, expected)
+
+    xs = np.linspace(0.0, 500.0, 51)
+    for x_start in xs:
+        for x_end in (0.0, x_start * 0.9, x_start + 1e-6, x_start + 25.0, x_start + 250.0):
+            x = curve.supply_after_cost(x_start, curve.cost_to_move(x_start, x_end))
+            assert abs(x - x_end) < 1e-10 * max(1.0, x_end)
+
+    assert np.allclose(curve.price_array(xs), [curve.price(x) for x in xs], rtol=1e-14)
+    assert np.allclose(curve.price_integral_array(xs), [curve.price_integral(x) for x in xs], rtol=1e-14)
+    costs = np.linspace(-200.0, 5000.0, 51)
+    x_start = np.full(51, 450.0)
+    assert np.allclose(curve.supply_after_cost_array(x_start, costs),
+                       [curve.supply_after_cost(450.0, c) for c in costs], rtol=1e-13)
+    with pytest.raises(ValueError):
+        curve.supply_after_cost(10.0, -1e6)
+
+
+def test_array_methods_match_scalar_ones():
+    curve = PiecewiseBondingCurve(MIXED)
+    rng = np.random.default_rng(0)
+    x_start = rng.uniform(0.0, 600.0, 2000)
+    x_end = np.clip(x_start + rng.normal(0.0, 1.0, 2000) * np.where(rng.random(2000) < 0.5, 1e-3, 200.0), 0.0, None)
+    expected = np.array([curve.cost_to_move(a, b) for a, b in zip(x_start, x_end)])
+    error = np.abs(curve.cost_to_move_array(x_start, x_end) - expected)
+    assert np.all(error <= 4 * np.spacing(curve.price_integral_array(np.maximum(x_start, x_end))))
+
+    # Linear tranches involve no transcendental functions, and match exactly far up the curve
+    tranches = PiecewiseBondingCurve.from_tranches([1000.0] * 1000, np.linspace(1.0, 2.0, 1000))
+    x_start = rng.uniform(9e5, 9.9e5, 2000)
+    x_end = x_start + rng.normal(0.0, 1e-3, 2000)
+    expected = [tranches.cost_to_move(a, b) for a, b in zip(x_start, x_end)]
+    assert np.array_equal(tranches.cost_to_move_array(x_start, x_end), expected)
+
+    # Prices never fall, so supply_at_price_array finds every price the curve passes through
+    xs = np.linspace(0.0, 600.0, 61)
+    prices = curve.price_array(xs)
+    assert np.all(np.diff(prices) >= 0)
+    assert np.allclose(curve.price_array(curve.supply_at_price_array(prices)), prices, rtol=1e-10)
+
+
+def test_tranches_price_each_share_at_its_tier():
+    curve = PiecewiseBondingCurve.from_tranches([100.0] * 300, np.linspace(1.0, 4.0, 300))
+    assert len(curve.segments) == 300
+    assert curve.price(150.0) == curve.price(199.0) == curve.segments[1][2]
+    assert abs(curve.cost_to_move(50.0, 250.0) - 100.0 * sum(curve.segments[i][2] for i in range(3)) + 50.0 * (
+        curve.segments[0][2] + curve.segments[2][2])) < 1e-9
+
+    amm = BondingCurveAMM(curve, fee_rate=0.001)
+    amm.buy_value(10_000.0)
+    assert amm.x > 0
+    assert_no_round_trip_arbitrage_on_grid(BondingCurveAMM(curve, fee_rate=0.001),
+                                           np.linspace(0.0, 25_000.0, 11), np.linspace(1.0, 5_000.0, 11))
+
+
+def test_invalid_segments_raise():
+    for segments in ([], [(1.0, "linear", 1.0, 0.0)], [(0.0, "cubic", 1.0, 1.0)],
+                     [(0.0, "linear", 1.0, 0.0), (0.0, "exp", 1.0, 1.0)], [(0.0, "power", 1.0, 1.0)],
+                     [(0.0, "exp", 1.0, -1.0)], [(0.0, "linear", 1.0, -0.1)], [(0.0, "linear", -1.0, 0.1)],
+                     [(0.0, "power", 1.0, 1.0, -0.5)], [(0.0, "linear", 5.0, 0.0), (10.0, "linear", 1.0, 0.1)],
+                     [(0.0, "exp", 1.0, 10.0), (10.0, "linear", 2.0, 1.0)]):
+        with pytest.raises(ValueError):
+            PiecewiseBondingCurve(segments)
@@ -0,0 +1,28 @@
+import math
+import pytest
+from bonding.curves.allcurves import all_curves_cls
+
+
+def test_supply_after_cost_inverts_cost_to_move():
+    for curve_cls in all_curves_cls():
+        curve = curve_cls(scale=10)
+        for x_start in [0.0, 0.3, 7.0, 250.0]:
+            for cost in [1e-6, 0.5, 10.0, 1e4, 1e7]:
+                x_end = curve.supply_after_cost(x_start, cost)
+                assert math.isclose(curve.cost_to_move(x_start, x_end), cost, rel_tol=1e-9,
+                                    abs_tol=1e-12 * curve.price_integral(x_end)), \
+                    f"{curve_cls.__name__} buy x_start={x_start} cost={cost}"
+                if x_start > 0:
+                    sale = -0.5 * curve.price_integral(x_start)
+                    x_end = curve.supply_after_cost(x_start, sale)
+                    assert math.isclose(curve.cost_to_move(x_start, x_end), sale, rel_tol=1e-9), \
+                        f"{curve_cls.__name__} sell x_start={x_start}"
+
+
+def test_supply_after_cost_sell_everything():
+    for curve_cls in all_curves_cls():
+        curve = curve_cls(scale=10)
+        x_end = curve.supply_after_cost(5.0, -curve.price_integral(5.0))
+        assert x_end >= 0.0 and math.isclose(x_end, 0.0, abs_tol=1e-9)
+        with pytest.raises(ValueError):
+            curve.supply_after_cost(5.0, -1.01 * curve.price_integral(5.0))
@@ -0,0 +1,103 @@
+import pickle
+import numpy as np
+import pytest
+from bonding.curves.allcurves import all_curves_cls
+from bonding.curves.tabulatedbondingcurve import TabulatedBondingCurve
+from bonding.amms.bondingcurveamm import BondingCurveAMM
+from bonding.amms.arbitragescanner import assert_no_round_trip_arbitrage_on_grid
+
+
+def test_tabulated_curve_matches_closed_form_curves():
+    xs = np.linspace(0.0, 50.0, 501)
+    for curve_cls in all_curves_cls():
+        curve = curve_cls(scale=10.0)
+        tabulated = TabulatedBondingCurve.from_price(curve.price, 60.0, rtol=1e-10)
+        assert np.allclose(tabulated.price_array(xs), curve.price_array(xs), rtol=1e-9, atol=0)
+        assert np.allclose(tabulated.price_integral_array(xs), curve.price_integral_array(xs), rtol=1e-9, atol=1e-12)
+        assert abs(tabulated.cost_to_move(3.0, 7.0) - curve.cost_to_move(3.0, 7.0)) < 1e-9
+        assert abs(tabulated.supply_after_cost(3.0, 5.0) - curve.supply_after_cost(3.0, 5.0)) < 1e-8
+
+
+def test_supply_after_cost_inverts_cost_to_move_exactly():
+    curve = TabulatedBondingCurve.from_price(lambda x: 1.0 + np.sqrt(x), 100.0)
+    for x_start in np.linspace(0.0, 90.0, 37):
+        for x_end in (x_start * 0.5, x_start + 1e-7, x_start + 0.3, x_start + 9.0):
+            x = curve.supply_after_cost(x_start, curve.cost_to_move(x_start, x_end))
+            assert abs(x - x_end) < 1e-12 * max(1.0, x_end)
+
+    x_start = np.linspace(0.0, 90.0, 37)
+    cost = np.linspace(-1.0, 30.0, 37)
+    x_end = curve.supply_after_cost_array(np.maximum(x_start, 5.0), cost)
+    assert np.allclose(x_end, [curve.supply_after_cost(max(x, 5.0), c) for x, c in zip(x_start, cost)],
+                       rtol=1e-13, atol=0)
+
+    prices = np.array([0.5, 1.0, 4.0, 10.0, 12.0])
+    supply = curve.supply_at_price_array(prices)
+    assert np.isnan(supply[0]) and np.isnan(supply[-1])
+    assert np.allclose(curve.price_array(supply[1:-1]), prices[1:-1], rtol=1e-12)
+
+
+def test_cost_to_move_array_matches_scalar_at_large_supplies():
+    curve = TabulatedBondingCurve.from_price(lambda x: 1.0 + np.sqrt(x), 1e6, rtol=1e-8)
+    rng = np.random.default_rng(0)
+    x_start = rng.uniform(0.0, 1e6, 2000)
+    x_end = np.clip(x_start + rng.normal(0.0, 1.0, 2000) * np.where(rng.random(2000) < 0.5, 1.0, 1e4), 0.0, 1e6)
+    expected = [curve.cost_to_move(a, b) for a, b in zip(x_start, x_end)]
+    assert np.array_equal(curve.cost_to_move_array(x_start, x_end), expected)
+
+
+def test_from_points_is_monotone_between_points():
+    x = [0.0, 1.0, 2.0, 3.0, 10.0, 11.0]
+    prices = [1.0, 1.0, 1.5, 5.0, 5.0, 9.0]
+    curve = TabulatedBondingCurve.from_points(x, prices)
+    assert np.allclose(curve.price_array(x), prices)
+    assert np.all(np.diff(curve.price_array(np.linspace(0.0, 11.0, 10001))) >= 0)
+
+    with pytest.raises(ValueError):
+        TabulatedBondingCurve.from_points([0.0, 1.0, 2.0], [1.0, 2.0, 1.5])
+    with pytest.raises(ValueError):
+        TabulatedBondingCurve.from_points([1.0, 2.0], [1.0, 2.0])
+
+
+def test_supplies_beyond_the_table_raise():
+    curve = TabulatedBondingCurve.from_price(lambda x: 1.0 + x, 10.0)
+    for call in (lambda: curve.price(10.5), lambda: curve.price_integral(-1.0),
+                 lambda: curve.supply_after_cost(9.0, 100.0), lambda: curve.supply_after_cost(1.0, -5.0),
+                 lambda: curve.price_array([1.0, 11.0])):
+        with pytest.raises(ValueError):
+            call()
+
+    amm = BondingCurveAMM(curve, fee_rate=0.01)
+    with pytest.raises(ValueError):
+        amm.buy_value(1e6)
+    assert amm.x == 0.0 and amm.total_cash_collected == 0.0
+
+
+def test_cache_round_trip(tmp_path):
+    path = str(tmp_path / "curve.npz")
+    calls = []
+
+    def price(x):
+        calls.append(x)
+        return np.exp(x / 10.0)
+
+    built = TabulatedBondingCurve.from_price(price, 50.0, cache_path=path)
+    n_calls = len(calls)
+    cached = TabulatedBondingCurve.from_price(price, 50.0, cache_path=path)
+    assert len(calls) == n_calls
+    assert np.array_equal(cached.knots, built.knots) and cached.price(17.3) == built.price(17.3)
+    assert TabulatedBondingCurve.load(path).price_integral(17.3) == built.price_integral(17.3)
+
+    # A different tolerance rebuilds
+    TabulatedBondingCurve.from_price(price, 50.0, rtol=1e-6, cache_path=path)
+    assert len(calls) > n_calls
+
+
+def test_tabulated_curve_trades_without_round_trip_arbitrage():
+    curve = TabulatedBondingCurve.from_price(lambda x: 1.0 + 0.1 * x + 0.01 * x ** 2, 200.0)
+    amm = BondingCurveAMM(curve, fee_rate=0.001)
+    amm.buy_value(50.0)
+    clone = pickle.loads(pickle.dumps(amm))
+    assert clone.sell_shares(clone.x) == amm.sell_shares(amm.x)
+    assert_no_round_trip_arbitrage_on_grid(BondingCurveAMM(curve, fee_rate=0.001),
+                                           np.linspace(0.0, 100.0, 11), np.linspace(0.1, 20.0, 11))
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from bonding.amms.sqrtbondingcurveamm import SqrtBondingCurveAMM
+from bonding.amms.expbondingcurveamm import ExpBondingCurveAMM
+from bonding.montecarlo.orderflow import OrderFlow
+from bonding.montecarlo.simulator import HORIZON_FIELDS, simulate_paths, horizon_distributions
+
+
+class RecordingFlow(OrderFlow):
+    __slots__ = ("draws",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.draws = []
+
+    def arrivals(self, rng, n_paths, step):
+        arrivals = super().arrivals(rng, n_paths, step)
+        self.draws.append(("arrivals", arrivals.copy()))
+        return arrivals
+
+    def sides(self, rng, n_orders, step):
+        sides = super().sides(rng, n_orders, step)
+        self.draws.append(("sides", sides.copy()))
+        return sides
+
+    def sizes(self, rng, n_orders, step, dtype=np.float64):
+        sizes = super().sizes(rng, n_orders, step, dtype)
+        self.draws.append(("sizes", sizes.copy()))
+        return sizes
+
+
+@pytest.mark.parametrize("amm_cls", [SqrtBondingCurveAMM, ExpBondingCurveAMM])
+def test_paths_match_the_amm_one_order_at_a_time(amm_cls):
+    def fresh():
+        amm = amm_cls(scale=100.0, fee_rate=0.003)
+        amm.buy_value(20.0)
+        return amm
+
+    # Sells outweigh buys, so some paths run dry and reject orders
+    flow = RecordingFlow(arrival_rate=1.5, median_size=3.0, size_sigma=1.0, buy_probability=0.4)
+    paths = simulate_paths(fresh(), flow, 25, 40, seed=7)
+
+    amms = [fresh() for _ in range(25)]
+    start_fees = amms[0].total_fees_collected
+    reserve = np.full(25, amms[0].curve.price_integral(amms[0].x))
+    rejected = np.zeros(25, dtype=int)
+    draws = iter(flow.draws)
+    for _ in range(40):
+        arrivals = next(draws)[1]
+        for k in range(arrivals.max(initial=0)):
+            sides, sizes = next(draws)[1], next(draws)[1]
+            for i, buy, size in zip(np.flatnonzero(arrivals > k), sides, sizes):
+                cash = amms[i].total_cash_collected
+                try:
+                    if buy:
+                        amms[i].buy_value(size)
+                        reserve[i] += amms[i].total_cash_collected - cash
+                    else:
+                        gross = amms[i].simulate_sell_value(size).gross_currency
+                        amms[i].sell_value(size)
+                        reserve[i] -= gross
+                except ValueError:
+                    rejected[i] += 1
+
+    assert rejected.sum() > 0
+    assert np.array_equal(paths["rejected"], rejected)
+    assert np.array_equal(paths["orders"], sum(draw[1] for draw in flow.draws if draw[0] == "arrivals"))
+    assert np.allclose(paths["supply"], [amm.x for amm in amms], rtol=1e-12, atol=1e-12)
+    assert np.allclose(paths["reserve"], reserve, rtol=1e-12, atol=1e-9)
+    # What the curve holds is what it owes at its supply, less than a quanta per order apart
+    integral = amms[0].curve.price_integral_array(paths["supply"])
+    assert np.all(np.abs(paths["reserve"] - integral) <= 1e-8 * paths["orders"] + 1e-9 * (1.0 + integral))
+    assert np.allclose(paths["fees"] + paths["breakage"],
+                       [amm.total_fees_collected - start_fees for amm in amms], rtol=1e-12, atol=1e-12)
+    assert np.allclose(paths["price"], [amm.current_price() for amm in amms], rtol=1e-12)
+
+
+def test_float32_halves_memory_and_keeps_the_distributions():
+    amm = SqrtBondingCurveAMM(scale=1000.0, fee_rate=0.001)
+    amm.buy_value(1000.0)
+    flow = OrderFlow(arrival_rate=2.0, median_size=5.0, buy_probability=0.6)
+    before = amm.snapshot()
+    wide = simulate_paths(amm, flow, 20_000, 5, seed=1)
+    narrow = simulate_paths(amm, flow, 20_000, 5, seed=1, float32=True)
+    assert amm.snapshot() == before
+    for field in HORIZON_FIELDS:
+        assert narrow[field].dtype == np.float32
+        assert narrow[field].nbytes * 2 == wide[field].nbytes
+
+    a, b = horizon_distributions(wide), horizon_distributions(narrow)
+    for field in ("fees", "price", "reserve", "supply"):
+        assert abs(a[field]["mean"] - b[field]["mean"]) < 0.05 * a[field]["std"] + 1e-6
+    assert a["supply"]["p1"] <= a["supply"]["p50"] <= a["supply"]["p99"]
+    assert a["supply"]["mean"] > amm.x
+
+
+def test_degenerate_flows():
+    amm = ExpBondingCurveAMM(scale=100.0, fee_rate=0.01)
+    amm.buy_value(50.0)
+    idle = simulate_paths(amm, OrderFlow(arrival_rate=0.0), 10, 5, seed=0)
+    assert np.all(idle["supply"] == amm.x) and np.all(idle["fees"] == 0) and np.all(idle["orders"] == 0)
+
+    buying = simulate_paths(amm, OrderFlow(buy_probability=1.0), 100, 5, seed=0)
+    assert np.all(buying["supply"] >= amm.x) and np.all(buying["rejected"] == 0)
+    assert np.all(buying["fees"] >= 0.01 * (buying["reserve"] - amm.curve.price_integral(amm.x)) - 1e-9)
+
+    for kwargs in ({"arrival_rate": -1.0}, {"median_size": 0.0}, {"size_sigma": -0.1}, {"buy_probability": 1.5}):
+        with pytest.raises(ValueError):
+            OrderFlow(**kwargs)
+    with pytest.raises(ValueError):
+        simulate_paths(amm, OrderFlow(), 0, 5)
@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+import pytest
+from bonding.amms.sqrtbondingcurveamm import SqrtBondingCurveAMM
+from bonding.amms.linearbondingcurveamm import LinearBondingCurveAMM
+from bonding.persistence.durablemarkets import DurableMarkets, LOG, SNAPSHOT
+from bonding.persistence.tradelog import TradeLog, RECORD
+
+
+def markets():
+    return {"sqrt": SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001),
+            "ledger": LinearBondingCurveAMM(scale=100.0, fee_rate=0.001, integer_ledger=True)}
+
+
+def trade_some(store, n, seed=0):
+    for i in range(n):
+        market = "sqrt" if i % 3 else "ledger"
+        operation = ("buy_value", "buy_shares", "sell_shares", "sell_value")[(i + seed) % 4]
+        try:
+            store.trade(market, operation, 1.0 + i % 5)
+        except ValueError:
+            pass
+
+
+def test_state_survives_reopening(tmp_path):
+    directory = str(tmp_path)
+    with DurableMarkets(directory, markets()) as store:
+        trade_some(store, 200)
+        expected = {name: amm.snapshot() for name, amm in store.amms.items()}
+    reopened = DurableMarkets(directory, markets())
+    assert reopened.recovered == len(reopened.log) > 0
+    assert {name: amm.snapshot() for name, amm in reopened.amms.items()} == expected
+
+    # Trading carries on from the recovered state
+    reopened.trade("sqrt", "buy_value", 5.0)
+    reopened.close()
+    assert DurableMarkets(directory, markets()).amms["sqrt"].version == expected["sqrt"]["version"] + 1
+
+
+def test_checkpoints_replace_the_log(tmp_path):
+    directory = str(tmp_path)
+    store = DurableMarkets(directory, markets(), checkpoint_every=50)
+    trade_some(store, 180)
+    assert os.path.exists(os.path.join(directory, SNAPSHOT)) and len(store.log) < 50
+    store.trade("sqrt", "buy_value", 2.0)
+    store.close()
+    expected = {name: amm.snapshot() for name, amm in store.amms.items()}
+
+    reopened = DurableMarkets(directory, {"sqrt": SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001)})
+    assert reopened.amms["sqrt"].snapshot() == expected["sqrt"]
+    # A market left out keeps its state, in the next checkpoint too
+    reopened.checkpoint()
+    reopened.close()
+    assert DurableMarkets(directory, markets()).amms["ledger"].snapshot() == expected["ledger"]
+
+
+def test_concurrent_trades_survive_checkpoints(tmp_path):
+    directory = str(tmp_path)
+    amms = {f"m{i}": SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001) for i in range(8)}
+    store = DurableMarkets(directory, amms, group_size=16, checkpoint_every=40)
+
+    def trade(market):
+        for _ in range(100):
+            store.trade(market, "buy_value", 1.0)
+            store.trade(market, "sell_shares", 0.001)
+
+    threads = [threading.Thread(target=trade, args=(market,)) for market in amms for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.close()
+    expected = {name: amm.snapshot() for name, amm in store.amms.items()}
+    assert all(state["version"] == 400 for state in expected.values())
+    reopened = DurableMarkets(directory, {f"m{i}": SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001) for i in range(8)})
+    assert {name: amm.snapshot() for name, amm in reopened.amms.items()} == expected
+    assert os.path.exists(os.path.join(directory, SNAPSHOT)) and len(reopened.log) < 3200
+
+
+def test_crash_loses_at_most_the_uncommitted_group(tmp_path):
+    directory = str(tmp_path)
+    store = DurableMarkets(directory, markets(), group_size=10, commit_interval=3600.0)
+    trade_some(store, 25)
+    durable = {name: amm.snapshot() for name, amm in store.amms.items()}
+    assert store.log.commits >= 1
+    store.commit()
+    durable = {name: amm.snapshot() for name, amm in store.amms.items()}
+    trade_some(store, 7, seed=1)
+    # Crash: the last 7 trades were never committed, and a partial record was written
+    del store
+    with open(os.path.join(directory, LOG), "ab") as f:
+        f.write(b"\x01" * (RECORD.size // 2))
+
+    recovered = DurableMarkets(directory, markets())
+    assert {name: amm.snapshot() for name, amm in recovered.amms.items()} == durable
+    assert os.path.getsize(os.path.join(directory, LOG)) % RECORD.size == 0
+
+
+def test_trades_beyond_int64_quanta_are_undone(tmp_path):
+    directory = str(tmp_path)
+    store = DurableMarkets(directory, markets())
+    store.trade("ledger", "buy_value", 5.0)
+    before = store.amms["ledger"].snapshot()
+    with pytest.raises(ValueError):
+        store.trade("ledger", "buy_value", 1e11)
+    assert store.amms["ledger"].snapshot() == before and len(store.log) == 1
+    store.close()
+    assert DurableMarkets(directory, markets()).amms["ledger"].snapshot() == before
+
+    # Nor can a ledger pushed that far directly be snapshotted
+    store = DurableMarkets(directory, markets())
+    store.amms["ledger"].buy_value(1e11)
+    with pytest.raises(ValueError):
+        store.checkpoint()
+    assert not os.path.exists(os.path.join(directory, SNAPSHOT))
+    store.close()
+
+
+def test_idle_markets_commit_after_the_interval(tmp_path):
+    directory = str(tmp_path)
+    store = DurableMarkets(directory, markets(), group_size=1024, commit_interval=0.01)
+    store.trade("sqrt", "buy_value", 10.0)
+    expected = store.amms["sqrt"].snapshot()
+    time.sleep(0.5)
+    # Crash without closing: the background commit has already made the trade durable
+    assert os.path.getsize(os.path.join(directory, LOG)) == RECORD.size
+    assert DurableMarkets(directory, markets()).amms["sqrt"].snapshot() == expected
+    store.close()
+
+
+def test_corrupt_records_end_the_log(tmp_path):
+    path = str(tmp_path / "trades.wal")
+    log = TradeLog(path, group_size=1)
+    for version in range(1, 6):
+        log.append(0, 0, version, 1.0, float(version), 2.0, 0.0)
+    log.close()
+    with open(path, "r+b") as f:
+        f.seek(3 * RECORD.size + 20)
+        f.write(b"\xff")
+    assert [record[2] for record in TradeLog(path).records()] == [1, 2, 3]
+    assert os.path.getsize(path) == 3 * RECORD.size
+
+    with pytest.raises(KeyError):
+        DurableMarkets(str(tmp_path / "store"), markets()).trade("nope", "buy_value", 1.0)
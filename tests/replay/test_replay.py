@@ -0,0 +1,118 @@
+import csv
+import json
+import tracemalloc
+import numpy as np
+import pytest
+from bonding.amms.sqrtbondingcurveamm import SqrtBondingCurveAMM
+from bonding.amms.bondingcurveamm import TRADE_OPERATIONS
+from bonding.replay.orderlogs import read_orders, write_binary_orders, read_binary_orders
+from bonding.replay.replay import replay, replay_file
+
+
+def mixed_orders(n, seed=0):
+    rng = np.random.default_rng(seed)
+    operations = rng.choice(TRADE_OPERATIONS, size=n)
+    return [(str(operation), float(amount)) for operation, amount in zip(operations, np.exp(rng.normal(0.0, 2.0, n)))]
+
+
+def write_logs(tmp_path, orders) -> list:
+    paths = [str(tmp_path / name) for name in ("orders.csv", "orders.jsonl", "orders.orders")]
+    with open(paths[0], "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "operation", "amount"])
+        writer.writerows((i, operation, repr(amount)) for i, (operation, amount) in enumerate(orders))
+    with open(paths[1], "w") as f:
+        f.writelines(json.dumps({"operation": operation, "amount": amount}) + "\n" for operation, amount in orders)
+    assert write_binary_orders(paths[2], iter(orders)) == len(orders)
+    return paths
+
+
+def test_every_format_replays_like_a_python_loop(tmp_path):
+    orders = mixed_orders(500)
+    expected = SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001)
+    results = []
+    for operation, amount in orders:
+        try:
+            results.append(getattr(expected, operation)(amount))
+        except ValueError:
+            results.append(np.nan)
+
+    for path in write_logs(tmp_path, orders):
+        amm = SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001)
+        fills = list(replay_file(amm, path, chunk_size=64))
+        assert [len(f["result"]) for f in fills] == [64] * 7 + [52]
+        assert np.array_equal(np.concatenate([f["result"] for f in fills]), results, equal_nan=True)
+        assert np.array_equal(np.concatenate([f["rejected"] for f in fills]), np.isnan(results))
+        assert fills[-1]["state"] == expected.snapshot()
+        assert fills[-1]["supply"][-1] == expected.x
+
+
+def test_share_chunks_are_vectorized(tmp_path):
+    rng = np.random.default_rng(1)
+    orders = [("buy_shares", float(a)) if a > 0 else ("sell_shares", float(-a)) for a in rng.normal(0.5, 1.0, 1000)]
+    path = str(tmp_path / "shares.orders")
+    write_binary_orders(path, orders)
+    amm = SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001)
+    amm.buy_shares(100.0)
+    scalar = SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001)
+    scalar.buy_shares(100.0)
+    fills = list(replay_file(amm, path, chunk_size=250))
+    assert all(f["vectorized"] for f in fills)
+    expected = [getattr(scalar, operation)(amount) for operation, amount in orders]
+    assert np.allclose(np.concatenate([f["result"] for f in fills]), expected, rtol=1e-12)
+    assert abs(amm.x - scalar.x) < 1e-9
+
+    # A chunk that would oversell falls back to one order at a time, rejecting only the oversell
+    fills = list(replay(amm, read_binary_orders(path, chunk_size=2000)))
+    assert [f["vectorized"] for f in fills] == [True]
+    write_binary_orders(path, [("sell_shares", 1e9), ("buy_shares", 1.0)])
+    fills = list(replay_file(amm, path))
+    assert not fills[0]["vectorized"] and fills[0]["rejected"].tolist() == [True, False]
+
+    # Negative amounts are rejected as the scalar methods reject them, not traded with the sign flipped
+    x = amm.x
+    write_binary_orders(path, [("buy_shares", -1.0), ("sell_shares", -2.0)])
+    fills = list(replay_file(amm, path))
+    assert not fills[0]["vectorized"] and fills[0]["rejected"].tolist() == [True, True]
+    assert amm.x == x
+
+
+def test_memory_does_not_grow_with_log_length(tmp_path):
+    path = str(tmp_path / "long.orders")
+    n = 400_000
+    write_binary_orders(path, (("buy_shares" if i % 3 else "sell_shares", 0.01) for i in range(n)))
+    amm = SqrtBondingCurveAMM(scale=100.0)
+    amm.buy_shares(10.0)
+    tracemalloc.start()
+    chunks = 0
+    for fills in replay_file(amm, path, chunk_size=5_000):
+        chunks += 1
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    sells = len(range(0, n, 3))
+    assert chunks == 80 and abs(amm.x - 10.0 - (n - 2 * sells) * 0.01) < 1e-6
+    assert peak < 2_000_000
+
+
+def test_bad_logs_raise(tmp_path):
+    path = str(tmp_path / "bad.csv")
+    with open(path, "w") as f:
+        f.write("operation,amount\nbuy_value,1\nmint,2\n")
+    with pytest.raises(ValueError, match="bad.csv:3"):
+        list(read_orders(path))
+    with pytest.raises(ValueError):
+        read_orders(str(tmp_path / "orders.parquet"))
+
+
+def test_empty_logs_have_no_orders(tmp_path):
+    for name in ("empty.csv", "empty.jsonl", "empty.orders"):
+        path = str(tmp_path / name)
+        open(path, "w").close()
+        assert list(read_orders(path)) == []
+
+    path = str(tmp_path / "torn.orders")
+    write_binary_orders(path, [("buy_shares", 1.0), ("sell_shares", 1.0)])
+    with open(path, "ab") as f:
+        f.write(b"\x00\x01\x02")
+    with pytest.raises(ValueError, match="whole number"):
+        list(read_binary_orders(path))
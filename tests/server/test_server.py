@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from bonding.amms.sqrtbondingcurveamm import SqrtBondingCurveAMM
+from bonding.amms.linearbondingcurveamm import LinearBondingCurveAMM
+from bonding.server.client import AMMClient, AMMServerError, run_load
+from bonding.server.server import AMMServer
+
+
+def serve(test):
+    # Run test(server, port) against a fresh server on a free port
+    async def run():
+        server = AMMServer({"sqrt": SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001),
+                            "linear": LinearBondingCurveAMM(scale=100.0)})
+        port = await server.start()
+        try:
+            return await test(server, port)
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+
+def test_quote_trade_and_state():
+    async def test(server, port):
+        client = await AMMClient.connect(port=port)
+        quote = await client.quote("sqrt", "buy_value", 10.0)
+        assert quote["version"] == 0
+        shares = await client.trade("sqrt", "buy_value", 10.0, expected_version=quote["version"])
+        assert shares == quote["shares_received"]
+        state = await client.state("sqrt")
+        assert state["version"] == 1 and state["x"] == shares and state["price"] > 1.0
+
+        for call, error_type in ((client.trade("nope", "buy_value", 1.0), "KeyError"),
+                                 (client.quote("sqrt", "mint", 1.0), "ValueError"),
+                                 (client.trade("sqrt", "sell_shares", 1e6), "ValueError"),
+                                 (client.trade("sqrt", "buy_value", 1.0, expected_version=0), "StaleStateError"),
+                                 (client.request("delete", market="sqrt"), "ValueError")):
+            with pytest.raises(AMMServerError) as info:
+                await call
+            assert info.value.error_type == error_type
+        assert (await client.state("sqrt"))["version"] == 1
+
+        # A line that is not JSON gets an error response, and the connection stays usable
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"not json\n")
+        assert b'"error"' in await reader.readline()
+        writer.close()
+        await client.close()
+        return server.stats
+
+    stats = serve(test)
+    assert stats["errors"] == 6
+
+
+def test_identical_concurrent_quotes_share_one_simulation():
+    async def test(server, port):
+        clients = [await AMMClient.connect(port=port) for _ in range(4)]
+        quotes = await asyncio.gather(*(client.quote("sqrt", "buy_value", 25.0) for client in clients for _ in range(50)))
+        assert all(quote == quotes[0] for quote in quotes)
+        await clients[0].trade("sqrt", "buy_value", 25.0)
+        after = await clients[1].quote("sqrt", "buy_value", 25.0)
+        assert after["version"] == 1 and after["shares_received"] < quotes[0]["shares_received"]
+        for client in clients:
+            await client.close()
+        return server.stats
+
+    stats = serve(test)
+    assert stats["quotes"] + stats["coalesced"] == 201
+    assert stats["quotes"] < 20
+
+
+def test_trades_are_serialised_per_market():
+    async def test(server, port):
+        clients = [await AMMClient.connect(port=port) for _ in range(8)]
+        paid = await asyncio.gather(*(client.trade(market, "buy_shares", 1.0)
+                                      for client in clients for market in ("sqrt", "linear") for _ in range(10)))
+        for client in clients:
+            await client.close()
+        return paid
+
+    paid = serve(test)
+    expected = SqrtBondingCurveAMM(scale=100.0, fee_rate=0.001)
+    assert sorted(p for i, p in enumerate(paid) if i // 10 % 2 == 0) == [expected.buy_shares(1.0) for _ in range(80)]
+
+
+def test_load_generator_reports_throughput_and_latency():
+    async def test(server, port):
+        return await run_load("127.0.0.1", port, "sqrt", connections=4, requests=400, trade_fraction=0.2)
+
+    results = serve(test)
+    assert results["requests"] == 400 and results["requests_per_second"] > 0
+    assert 0 < results["p50_us"] <= results["p99_us"] <= results["max_us"]